@@ -1,65 +1,405 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Literal, Optional, Union
+import asyncio
+import base64
+import logging
+import os
 from datetime import datetime
 import json
 
-from app.models.database import get_db, Analysis
+from app.models.database import get_db, Analysis, Job, JobOpening, SessionLocal
 from app.services.ai_service import AIService
 from app.services.file_service import FileService
+from app.services.analysis_pipeline import build_analysis_scheduler, run_analysis
+from app.services.stage_scheduler import StageResults
+from app.services.search_index import SearchIndex, catch_up, open_search_index
+from app.services.job_queue import JobQueue, QueueFullError
+from app.services.document_store import intern_documents, load_texts, storage_report
+from app.services.job_openings import find_job_opening, get_or_create_job_opening
+from app.core.config import settings
 from app.api.schemas import (
-    AnalysisRequest, AnalysisResponse, ResumeSummaryRequest,
+    AnalysisRequest, AnalysisResponse, AnalysisSummary, BatchAnalysisRequest, BatchAnalysisResponse,
+    RankedAnalysis, RankedScore, RankResponse, MatrixRankRequest, MatrixRankResponse,
+    JDMatches, JobOpeningRequest, JobOpeningResponse, JobRequest, JobStatusResponse, OpeningAnalysisRequest, RescoreResponse, SearchCandidatesRequest, SearchCandidatesResponse, CandidateMatch,
+    ResumeSummaryRequest,
     ResumeSummaryResponse, InterviewInsightsRequest, InterviewInsightsResponse,
     HealthResponse, ErrorResponse
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 ai_service = AIService()
 
+# Loaded on first use; until then new analyses are picked up on load, and
+# those saved while it loads are held in _loading_docs
+search_index: Optional[SearchIndex] = None
+_search_index_lock = asyncio.Lock()
+_loading_docs: Optional[List[tuple]] = None
+
+async def get_search_index() -> SearchIndex:
+    global search_index, _loading_docs
+    if search_index is None:
+        async with _search_index_lock:
+            if search_index is None:
+                _loading_docs = []
+                try:
+                    index = await open_search_index(ai_service.tokenize, ai_service.tokenizer_version)
+                    loaded_up_to = index.max_doc_id
+                    search_index = index
+                    held = _loading_docs
+                finally:
+                    _loading_docs = None
+                await asyncio.to_thread(index.add_many, held)
+                # Other workers may have committed analyses after the load query ran
+                await catch_up(index, loaded_up_to)
+    return search_index
+
+async def index_resumes(docs: List[tuple]) -> None:
+    """Add (analysis id, resume text) pairs to the candidate index"""
+    if search_index is None:
+        if _loading_docs is not None:
+            _loading_docs.extend(docs)
+        return
+    search_index.add_many(docs)
+    if search_index.pending >= settings.search_index_flush_every:
+        await asyncio.to_thread(search_index.flush)
+
+async def flush_search_index() -> None:
+    if search_index is not None:
+        await asyncio.to_thread(search_index.flush)
+
+def _analysis_row(resume_document_id: int, jd_document_id: int, results: StageResults, job_opening_id: Optional[int] = None) -> Analysis:
+    """Build the Analysis row for a finished stage run"""
+    return Analysis(
+        job_opening_id=job_opening_id,
+        resume_document_id=resume_document_id,
+        jd_document_id=jd_document_id,
+        matching_score=results["score"],
+        resume_summary=results["summary"],
+        interview_insights=results["insights"],
+        skills_match=results["skills"],
+        experience_match=results["experience"],
+        scorer_version=ai_service.scorer_version
+    )
+
+async def _new_analysis(db: AsyncSession, resume_text: str, job_description: str, results: StageResults, job_opening_id: Optional[int] = None) -> Analysis:
+    """Store both texts as documents and build the Analysis row"""
+    resume_document_id, jd_document_id = await intern_documents(db, [resume_text, job_description])
+    return _analysis_row(resume_document_id, jd_document_id, results, job_opening_id)
+
+async def _known_opening(job_description: str) -> Optional[JobOpening]:
+    """The job opening already parsed for a JD, so its requirements are reused"""
+    async with SessionLocal() as db:
+        return await find_job_opening(db, job_description)
+
+def _sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
 @router.post("/analyze-match", response_model=AnalysisResponse)
 async def analyze_match(
     request: AnalysisRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Analyze matching between resume and job description"""
     try:
-        # Calculate matching score
-        matching_score = await ai_service.calculate_matching_score(
-            request.resume_text, request.job_description
+        # Run the analysis stages concurrently; insights wait for the score
+        # Looked up in its own session so no pooled connection is held during the LLM calls
+        opening = await _known_opening(request.job_description)
+        results = await run_analysis(
+            ai_service, request.resume_text, request.job_description,
+            jd_requirements=opening.requirements if opening else None
         )
         
-        # Generate resume summary
-        resume_summary = await ai_service.generate_resume_summary(request.resume_text)
-        
-        # Generate interview insights
-        interview_insights = await ai_service.generate_interview_insights(
-            request.resume_text, request.job_description, matching_score
+        # Save to database
+        analysis = await _new_analysis(
+            db, request.resume_text, request.job_description, results, opening.id if opening else None
         )
         
-        # Analyze skills match
-        skills_match = await ai_service.analyze_skills_match(
-            request.resume_text, request.job_description
+        db.add(analysis)
+        await db.commit()
+        await index_resumes([(analysis.id, request.resume_text)])
+        
+        return AnalysisResponse(
+            id=analysis.id,
+            matching_score=analysis.matching_score,
+            resume_summary=analysis.resume_summary,
+            interview_insights=analysis.interview_insights,
+            skills_match=analysis.skills_match,
+            experience_match=analysis.experience_match,
+            created_at=analysis.created_at,
+            scorer_version=analysis.scorer_version,
+            job_opening_id=analysis.job_opening_id,
+            stage_errors=results.errors or None
         )
         
-        # Analyze experience match
-        experience_match = await ai_service.analyze_experience_match(
-            request.resume_text, request.job_description
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+@router.post("/analyze-match/stream")
+async def analyze_match_stream(request: AnalysisRequest):
+    """Analyze matching as Server-Sent Events, one event per finished stage.
+    
+    Emits ``score`` right away, ``summary_delta`` events while the summary is
+    generated, then ``summary``, ``skills``, ``experience`` and ``insights``
+    in completion order, and finally ``done`` with the persisted analysis id.
+    """
+    events: asyncio.Queue = asyncio.Queue()
+    
+    async def on_stage(name: str, value: Any, error: Optional[str]) -> None:
+        if name == "fused":
+            return  # its sections arrive as their own stage events
+        await events.put((name, {"value": value, "error": error}))
+    
+    async def on_summary_delta(delta: str) -> None:
+        await events.put(("summary_delta", {"delta": delta}))
+    
+    opening = await _known_opening(request.job_description)
+    scheduler = build_analysis_scheduler(
+        ai_service, request.resume_text, request.job_description,
+        jd_requirements=opening.requirements if opening else None,
+        on_summary_delta=on_summary_delta
+    )
+    
+    async def event_stream():
+        task = asyncio.ensure_future(scheduler.run(on_complete=on_stage))
+        # Every stage callback has been queued by the time the task finishes
+        task.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while True:
+                item = await events.get()
+                if item is None:
+                    break
+                yield _sse(*item)
+            results = task.result()
+            
+            async with SessionLocal() as db:
+                analysis = await _new_analysis(
+                    db, request.resume_text, request.job_description, results, opening.id if opening else None
+                )
+                db.add(analysis)
+                await db.commit()
+            done = {
+                "id": analysis.id,
+                "created_at": analysis.created_at,
+                "scorer_version": analysis.scorer_version,
+                "stage_errors": results.errors or None,
+            }
+            await index_resumes([(done["id"], request.resume_text)])
+            yield _sse("done", done)
+        except Exception as e:
+            yield _sse("error", {"detail": f"Analysis failed: {str(e)}"})
+        finally:
+            # Client went away before the analysis finished
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _process_job(payload: Dict[str, Any]):
+    """Run a queued analysis and persist it"""
+    opening = await _known_opening(payload["job_description"])
+    results = await run_analysis(
+        ai_service, payload["resume_text"], payload["job_description"],
+        jd_requirements=opening.requirements if opening else None
+    )
+    async with SessionLocal() as db:
+        analysis = await _new_analysis(
+            db, payload["resume_text"], payload["job_description"], results, opening.id if opening else None
+        )
+        db.add(analysis)
+        await db.commit()
+    await index_resumes([(analysis.id, payload["resume_text"])])
+    return analysis.id, results.errors or None
+
+job_queue = JobQueue.from_settings(_process_job)
+
+async def _job_response(job: Job, db: AsyncSession) -> JobStatusResponse:
+    result = None
+    if job.analysis_id is not None:
+        analysis = await db.get(Analysis, job.analysis_id)
+        if analysis:
+            result = AnalysisResponse(
+                id=analysis.id,
+                matching_score=analysis.matching_score,
+                resume_summary=analysis.resume_summary,
+                interview_insights=analysis.interview_insights,
+                skills_match=analysis.skills_match,
+                experience_match=analysis.experience_match,
+                created_at=analysis.created_at,
+                scorer_version=analysis.scorer_version,
+                job_opening_id=analysis.job_opening_id,
+                stage_errors=job.stage_errors
+            )
+    return JobStatusResponse(
+        id=job.id,
+        status=job.status,
+        priority=job.priority,
+        attempts=job.attempts,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        result=result
+    )
+
+@router.post("/jobs", response_model=JobStatusResponse, status_code=202)
+async def submit_job(request: JobRequest, db: AsyncSession = Depends(get_db)):
+    """Queue an analysis and return its job id immediately"""
+    try:
+        job = await job_queue.submit(
+            {"resume_text": request.resume_text, "job_description": request.job_description},
+            priority=request.priority
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    return await _job_response(job, db)
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, db: AsyncSession = Depends(get_db)):
+    """Job status, with the analysis once it has succeeded"""
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return await _job_response(job, db)
+
+def _rank_order(scores: List[float], top_k: Optional[int]) -> List[int]:
+    """Indices sorted by descending score, ties keep request order"""
+    order = sorted(range(len(scores)), key=lambda i: -scores[i])
+    return order[:top_k] if top_k else order
+
+def _check_batch_size(request: BatchAnalysisRequest) -> None:
+    size = max(len(request.resume_texts), len(request.job_descriptions))
+    if size > settings.max_batch_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch size {size} exceeds maximum of {settings.max_batch_size}"
         )
+
+@router.post("/analyze-match/batch", response_model=BatchAnalysisResponse)
+async def analyze_match_batch(
+    request: BatchAnalysisRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Analyze one JD against many resumes (or one resume against many JDs)"""
+    _check_batch_size(request)
+    try:
+        resume_texts, job_descriptions = request.pairs()
         
-        # Save to database
-        analysis = Analysis(
-            resume_text=request.resume_text,
-            job_description=request.job_description,
-            matching_score=matching_score,
-            resume_summary=resume_summary,
-            interview_insights=interview_insights,
-            skills_match=skills_match,
-            experience_match=experience_match
+        # Shared-side work happens once: each distinct text is preprocessed
+        # once for scoring, and a shared JD becomes a job opening whose
+        # requirements are parsed once and reused by later batches too
+        scores = await ai_service.calculate_matching_scores(resume_texts, job_descriptions)
+        jd_requirements = None
+        opening_id = None
+        if request.job_description is not None:
+            opening = await get_or_create_job_opening(db, ai_service, request.job_description)
+            jd_requirements, opening_id = opening.requirements, opening.id
+        
+        # Only analyze the pairs that will be returned
+        order = _rank_order(scores, request.top_k)
+        semaphore = asyncio.Semaphore(settings.batch_concurrency)
+        
+        async def analyze(i: int):
+            async with semaphore:
+                return await run_analysis(
+                    ai_service, resume_texts[i], job_descriptions[i],
+                    matching_score=scores[i], jd_requirements=jd_requirements
+                )
+        
+        stage_results = await asyncio.gather(*[analyze(i) for i in order])
+        
+        # The shared side is stored once for the whole batch
+        document_ids = await intern_documents(
+            db, [resume_texts[i] for i in order] + [job_descriptions[i] for i in order]
         )
+        analyses = [
+            _analysis_row(document_ids[n], document_ids[len(order) + n], results, opening_id)
+            for n, results in enumerate(stage_results)
+        ]
+        
+        # One bulk insert and a single commit for the whole batch
+        db.add_all(analyses)
+        await db.flush()
+        ranked = [
+            RankedAnalysis(
+                rank=rank,
+                index=i,
+                analysis=AnalysisResponse(
+                    id=analysis.id,
+                    matching_score=analysis.matching_score,
+                    resume_summary=analysis.resume_summary,
+                    interview_insights=analysis.interview_insights,
+                    skills_match=analysis.skills_match,
+                    experience_match=analysis.experience_match,
+                    created_at=analysis.created_at,
+                    scorer_version=analysis.scorer_version,
+                    job_opening_id=analysis.job_opening_id,
+                    stage_errors=results.errors or None
+                )
+            )
+            for rank, (i, analysis, results) in enumerate(zip(order, analyses, stage_results), start=1)
+        ]
+        await db.commit()
+        await index_resumes([(item.analysis.id, resume_texts[item.index]) for item in ranked])
         
+        return BatchAnalysisResponse(results=ranked, jd_requirements=jd_requirements)
+        
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Batch analysis failed: {str(e)}")
+
+def _opening_response(opening: JobOpening) -> JobOpeningResponse:
+    return JobOpeningResponse(
+        id=opening.id,
+        title=opening.title,
+        requirements=opening.requirements,
+        requirements_version=opening.requirements_version,
+        created_at=opening.created_at
+    )
+
+@router.post("/openings", response_model=JobOpeningResponse)
+async def create_opening(request: JobOpeningRequest, db: AsyncSession = Depends(get_db)):
+    """Parse a JD into structured requirements once; the same JD text returns the same opening"""
+    try:
+        opening = await get_or_create_job_opening(db, ai_service, request.job_description, request.title)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job opening creation failed: {str(e)}")
+    return _opening_response(opening)
+
+@router.get("/openings/{opening_id}", response_model=JobOpeningResponse)
+async def get_opening(opening_id: int, db: AsyncSession = Depends(get_db)):
+    """Get a job opening and its parsed requirements"""
+    opening = await db.get(JobOpening, opening_id)
+    if not opening:
+        raise HTTPException(status_code=404, detail="Job opening not found")
+    return _opening_response(opening)
+
+@router.post("/openings/{opening_id}/analyze", response_model=AnalysisResponse)
+async def analyze_for_opening(opening_id: int, request: OpeningAnalysisRequest, db: AsyncSession = Depends(get_db)):
+    """Analyze a resume against a job opening, reusing its parsed requirements"""
+    opening = await db.get(JobOpening, opening_id)
+    if not opening:
+        raise HTTPException(status_code=404, detail="Job opening not found")
+    try:
+        job_description = (await load_texts(db, [opening.jd_document_id]))[opening.jd_document_id]
+        # End the read transaction so no pooled connection is held during the LLM calls
+        await db.commit()
+        results = await run_analysis(
+            ai_service, request.resume_text, job_description, jd_requirements=opening.requirements
+        )
+        analysis = await _new_analysis(db, request.resume_text, job_description, results, opening.id)
         db.add(analysis)
-        db.commit()
-        db.refresh(analysis)
+        await db.commit()
+        await index_resumes([(analysis.id, request.resume_text)])
         
         return AnalysisResponse(
             id=analysis.id,
@@ -68,28 +408,119 @@ async def analyze_match(
             interview_insights=analysis.interview_insights,
             skills_match=analysis.skills_match,
             experience_match=analysis.experience_match,
-            created_at=analysis.created_at
+            created_at=analysis.created_at,
+            scorer_version=analysis.scorer_version,
+            job_opening_id=analysis.job_opening_id,
+            stage_errors=results.errors or None
         )
-        
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@router.post("/rank", response_model=RankResponse)
+async def rank(request: BatchAnalysisRequest):
+    """Rank resumes for a JD (or JDs for a resume) by matching score only"""
+    _check_batch_size(request)
+    resume_texts, job_descriptions = request.pairs()
+    scores = await ai_service.calculate_matching_scores(resume_texts, job_descriptions)
+    return RankResponse(results=[
+        RankedScore(rank=rank, index=i, matching_score=scores[i])
+        for rank, i in enumerate(_rank_order(scores, request.top_k), start=1)
+    ])
+
+@router.post("/rank/matrix", response_model=MatrixRankResponse)
+async def rank_matrix(request: MatrixRankRequest):
+    """Top-k resumes for each of many JDs, scored as one sparse matrix"""
+    size = len(request.resume_texts) * len(request.job_descriptions)
+    if size > settings.max_batch_size * settings.max_batch_size:
+        raise HTTPException(status_code=400, detail=f"Matrix of {size} pairs is too large")
+    # Sparse scoring of up to max_batch_size² pairs would stall the event loop
+    matches = await asyncio.to_thread(
+        ai_service.top_matches, request.resume_texts, request.job_descriptions, request.top_k, request.metric
+    )
+    return MatrixRankResponse(results=[
+        JDMatches(
+            jd_index=j,
+            matches=[
+                RankedScore(rank=rank, index=i, matching_score=score)
+                for rank, (i, score) in enumerate(jd_matches, start=1)
+            ]
+        )
+        for j, jd_matches in enumerate(matches)
+    ])
+
+@router.post("/search-candidates", response_model=SearchCandidatesResponse)
+async def search_candidates(request: SearchCandidatesRequest, db: AsyncSession = Depends(get_db)):
+    """Find previously analyzed resumes that best fit a JD"""
+    index = await get_search_index()
+    hits = await asyncio.to_thread(index.search, request.job_description, request.top_k)
+    rows = await db.execute(
+        select(Analysis.id, Analysis.resume_summary)
+        .where(Analysis.id.in_([analysis_id for analysis_id, _ in hits]))
+    )
+    summaries = dict(rows.all())
+    return SearchCandidatesResponse(
+        results=[
+            CandidateMatch(analysis_id=analysis_id, score=round(score, 4), resume_summary=summaries.get(analysis_id, ""))
+            for analysis_id, score in hits
+        ],
+        indexed_documents=index.n_docs
+    )
+
 @router.post("/upload-resume")
 async def upload_resume(file: UploadFile = File(...)):
     """Upload and extract text from resume file"""
-    print(f"Upload resume called with file: {file.filename}")
     try:
-        print("About to call FileService.extract_text_from_file")
         resume_text = await FileService.extract_text_from_file(file)
-        print(f"Successfully extracted text: {len(resume_text)} characters")
+        logger.debug("Extracted resume text", extra={"upload": file.filename, "characters": len(resume_text)})
         return {"resume_text": resume_text}
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error in upload_resume: {e}")
-        print(f"Error type: {type(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Resume upload failed", extra={"upload": file.filename})
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/upload-resumes")
+async def upload_resumes(files: List[UploadFile] = File(...)):
+    """Extract text from many resumes, or zip archives of resumes, at once.
+    
+    Streams newline-delimited JSON with one object per file as it finishes:
+    ``status`` is ``ok`` (with ``resume_text``), ``duplicate`` (same content
+    as ``duplicate_of``) or ``error``.
+    """
+    if len(files) > settings.bulk_max_files:
+        raise HTTPException(status_code=400, detail=f"At most {settings.bulk_max_files} files per upload")
+    
+    # Save everything before responding; upload files are closed once the
+    # handler returns
+    uploads, failed = [], []
+    try:
+        for file in files:
+            extension = os.path.splitext(file.filename or "")[1].lower()
+            if extension != ".zip" and extension not in settings.allowed_file_types:
+                failed.append({"filename": file.filename, "status": "error", "error": "File type not allowed"})
+                continue
+            max_size = settings.bulk_max_archive_size if extension == ".zip" else settings.max_file_size
+            try:
+                path, digest = await FileService.save_upload(file, max_size=max_size)
+            except HTTPException as e:
+                failed.append({"filename": file.filename, "status": "error", "error": e.detail})
+                continue
+            uploads.append((file.filename, path, digest))
+    except BaseException:
+        # ingest never runs, so nothing else will remove the files saved so far
+        for _, path, _ in uploads:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    
+    async def results():
+        for item in failed:
+            yield json.dumps(item) + "\n"
+        async for item in FileService.ingest(uploads):
+            yield json.dumps(item) + "\n"
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 @router.post("/summarize-resume", response_model=ResumeSummaryResponse)
 async def summarize_resume(request: ResumeSummaryRequest):
     """Generate summary of resume"""
@@ -119,10 +550,76 @@ async def health_check():
         timestamp=datetime.utcnow()
     )
 
+@router.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the result caches"""
+    return {
+        "llm": ai_service.cache.stats() if ai_service.cache else None,
+        "single_flight": ai_service.flight.stats() if ai_service.flight else None,
+        "extraction": FileService.cache().stats() if FileService.cache() else None,
+        "embeddings": ai_service.embedding_stats(),
+        "tokens": ai_service.tokenizer.stats(),
+    }
+
+@router.get("/prompts/stats")
+async def prompt_stats():
+    """Prompt tokens sent per analysis stage, and the share saved by compaction"""
+    return {
+        **ai_service.prompts.stats(),
+        "analysis_mode": settings.analysis_mode,
+        "fused_fallbacks": dict(ai_service.fused_fallbacks),
+        "skills_match_methods": dict(ai_service.skills_match_methods),
+    }
+
+@router.get("/documents/stats")
+async def document_stats(db: AsyncSession = Depends(get_db)):
+    """Storage saved by deduplicating and compressing resume and JD texts"""
+    return await storage_report(db)
+
+@router.post("/analyses/rescore", response_model=RescoreResponse)
+async def rescore_analyses(batch_size: int = 1000, db: AsyncSession = Depends(get_db)):
+    """Recompute stored scores produced by a different scorer version.
+    
+    Rescores at most ``rescore_max_rows`` analyses per call, scoring in a
+    worker thread; ``done`` is false while older scores remain.
+    """
+    version = ai_service.scorer_version
+    stale = (Analysis.scorer_version != version) | (Analysis.scorer_version.is_(None))
+    max_rows = settings.rescore_max_rows
+    rescored = 0
+    last_id = 0
+    while rescored < max_rows:
+        rows = (await db.execute(
+            select(Analysis.id, Analysis.resume_document_id, Analysis.jd_document_id)
+            .where(Analysis.id > last_id)
+            .where(stale)
+            .order_by(Analysis.id)
+            .limit(max(1, min(batch_size, max_rows - rescored)))
+        )).all()
+        if not rows:
+            return RescoreResponse(rescored=rescored, scorer_version=version, done=True)
+        texts = await load_texts(db, [row.resume_document_id for row in rows] + [row.jd_document_id for row in rows])
+        # End the read transaction before the CPU-bound scoring
+        await db.commit()
+        scores = await asyncio.to_thread(
+            ai_service.score_pairs,
+            [texts[row.resume_document_id] for row in rows], [texts[row.jd_document_id] for row in rows]
+        )
+        # Bulk UPDATE by primary key, executed as one executemany
+        await db.execute(update(Analysis), [
+            {"id": row.id, "matching_score": score, "scorer_version": version}
+            for row, score in zip(rows, scores)
+        ])
+        await db.commit()
+        rescored += len(rows)
+        last_id = rows[-1].id
+    remaining = await db.scalar(select(Analysis.id).where(stale).limit(1))
+    return RescoreResponse(rescored=rescored, scorer_version=version, done=remaining is None)
+
 @router.get("/analyses/{analysis_id}", response_model=AnalysisResponse)
-async def get_analysis(analysis_id: int, db: Session = Depends(get_db)):
+async def get_analysis(analysis_id: int, db: AsyncSession = Depends(get_db)):
     """Get analysis by ID"""
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    analysis = await db.get(Analysis, analysis_id)
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
@@ -133,13 +630,92 @@ async def get_analysis(analysis_id: int, db: Session = Depends(get_db)):
         interview_insights=analysis.interview_insights,
         skills_match=analysis.skills_match,
         experience_match=analysis.experience_match,
-        created_at=analysis.created_at
+        created_at=analysis.created_at,
+        scorer_version=analysis.scorer_version,
+        job_opening_id=analysis.job_opening_id
     )
 
-@router.get("/analyses", response_model=list[AnalysisResponse])
-async def list_analyses(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    """List recent analyses"""
-    analyses = db.query(Analysis).offset(skip).limit(limit).all()
+SUMMARY_PREVIEW_CHARS = 200
+
+def _encode_cursor(created_at: datetime, analysis_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), analysis_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, analysis_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(analysis_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/analyses", response_model=Union[List[AnalysisSummary], List[AnalysisResponse]])
+async def list_analyses(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    opening_id: Optional[int] = None,
+    fields: Literal["summary", "full"] = "summary",
+    db: AsyncSession = Depends(get_db)
+):
+    """List recent analyses, newest first.
+    
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to get the
+    next page; ``skip`` still works but gets slower on deep pages. The
+    default ``summary`` projection leaves out the text and JSON columns.
+    """
+    if fields == "full":
+        query = select(Analysis)
+    else:
+        query = select(
+            Analysis.id,
+            Analysis.matching_score,
+            func.substr(Analysis.resume_summary, 1, SUMMARY_PREVIEW_CHARS).label("summary_preview"),
+            Analysis.created_at,
+            Analysis.scorer_version,
+        )
+    
+    if cursor:
+        created_at, analysis_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            Analysis.created_at < created_at,
+            and_(Analysis.created_at == created_at, Analysis.id < analysis_id)
+        ))
+    if min_score is not None:
+        query = query.where(Analysis.matching_score >= min_score)
+    if max_score is not None:
+        query = query.where(Analysis.matching_score <= max_score)
+    if created_after is not None:
+        query = query.where(Analysis.created_at >= created_after)
+    if created_before is not None:
+        query = query.where(Analysis.created_at < created_before)
+    if opening_id is not None:
+        query = query.where(Analysis.job_opening_id == opening_id)
+    
+    # One extra row tells us whether there is a next page
+    query = query.order_by(Analysis.created_at.desc(), Analysis.id.desc()).offset(skip).limit(limit + 1)
+    result = await db.execute(query)
+    rows = (result.scalars() if fields == "full" else result).all()
+    
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    if fields == "summary":
+        return [
+            AnalysisSummary(
+                id=row.id,
+                matching_score=row.matching_score,
+                summary_preview=row.summary_preview,
+                created_at=row.created_at,
+                scorer_version=row.scorer_version
+            )
+            for row in rows
+        ]
     return [
         AnalysisResponse(
             id=analysis.id,
@@ -148,7 +724,9 @@ async def list_analyses(skip: int = 0, limit: int = 10, db: Session = Depends(ge
             interview_insights=analysis.interview_insights,
             skills_match=analysis.skills_match,
             experience_match=analysis.experience_match,
-            created_at=analysis.created_at
+            created_at=analysis.created_at,
+            scorer_version=analysis.scorer_version,
+            job_opening_id=analysis.job_opening_id
         )
-        for analysis in analyses
+        for analysis in rows
     ]
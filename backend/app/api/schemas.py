@@ -1,11 +1,65 @@
-from pydantic import BaseModel
-from typing import Dict, List, Any, Optional
+from pydantic import BaseModel, model_validator
+from typing import Dict, List, Any, Literal, Optional
 from datetime import datetime
 
 class AnalysisRequest(BaseModel):
     resume_text: str
     job_description: str
 
+class BatchAnalysisRequest(BaseModel):
+    """One JD against many resumes, or one resume against many JDs"""
+    job_description: Optional[str] = None
+    resume_texts: List[str] = []
+    resume_text: Optional[str] = None
+    job_descriptions: List[str] = []
+    top_k: Optional[int] = None
+    
+    @model_validator(mode="after")
+    def check_orientation(self):
+        one_jd = self.job_description is not None and self.resume_texts
+        one_resume = self.resume_text is not None and self.job_descriptions
+        if bool(one_jd) == bool(one_resume):
+            raise ValueError(
+                "Provide either job_description with resume_texts, or resume_text with job_descriptions"
+            )
+        return self
+    
+    def pairs(self):
+        """Expand into parallel lists of resumes and job descriptions"""
+        if self.job_description is not None:
+            return self.resume_texts, [self.job_description] * len(self.resume_texts)
+        return [self.resume_text] * len(self.job_descriptions), self.job_descriptions
+
+class MatrixRankRequest(BaseModel):
+    """Many resumes against many JDs"""
+    resume_texts: List[str]
+    job_descriptions: List[str]
+    top_k: int = 10
+    metric: Literal["jaccard", "tfidf", "semantic"] = "jaccard"
+
+class SearchCandidatesRequest(BaseModel):
+    job_description: str
+    top_k: int = 10
+
+class JobRequest(BaseModel):
+    resume_text: str
+    job_description: str
+    priority: int = 0  # higher runs first
+
+class JobOpeningRequest(BaseModel):
+    job_description: str
+    title: Optional[str] = None
+
+class OpeningAnalysisRequest(BaseModel):
+    resume_text: str
+
+class JobOpeningResponse(BaseModel):
+    id: int
+    title: Optional[str] = None
+    requirements: Dict[str, Any]
+    requirements_version: str
+    created_at: datetime
+
 class ResumeSummaryRequest(BaseModel):
     resume_text: str
 
@@ -22,6 +76,66 @@ class AnalysisResponse(BaseModel):
     skills_match: Dict[str, Any]
     experience_match: Dict[str, Any]
     created_at: datetime
+    scorer_version: Optional[str] = None
+    job_opening_id: Optional[int] = None
+    stage_errors: Optional[Dict[str, str]] = None
+
+class AnalysisSummary(BaseModel):
+    """List-view projection without the large text and JSON columns"""
+    id: int
+    matching_score: float
+    summary_preview: str  # first characters of resume_summary
+    created_at: datetime
+    scorer_version: Optional[str] = None
+
+class RankedAnalysis(BaseModel):
+    rank: int
+    index: int  # position in the request list
+    analysis: AnalysisResponse
+
+class BatchAnalysisResponse(BaseModel):
+    results: List[RankedAnalysis]
+    jd_requirements: Optional[Dict[str, Any]] = None
+
+class RankedScore(BaseModel):
+    rank: int
+    index: int
+    matching_score: float
+
+class RankResponse(BaseModel):
+    results: List[RankedScore]
+
+class JDMatches(BaseModel):
+    jd_index: int
+    matches: List[RankedScore]  # index refers to resume_texts
+
+class MatrixRankResponse(BaseModel):
+    results: List[JDMatches]
+
+class CandidateMatch(BaseModel):
+    analysis_id: int
+    score: float  # BM25 relevance to the JD
+    resume_summary: str
+
+class SearchCandidatesResponse(BaseModel):
+    results: List[CandidateMatch]
+    indexed_documents: int
+
+class RescoreResponse(BaseModel):
+    rescored: int
+    scorer_version: str
+    done: bool  # False while older scores remain; call again
+
+class JobStatusResponse(BaseModel):
+    id: str
+    status: str  # queued, running, succeeded, failed
+    priority: int
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[AnalysisResponse] = None
 
 class ResumeSummaryResponse(BaseModel):
     summary: str
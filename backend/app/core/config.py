@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
@@ -12,20 +12,97 @@ class Settings(BaseSettings):
     project_name: str = "JD Profile Matching"
     
     # Database
-    database_url: str = "sqlite:///./jd_matching.db"
+    database_url: str = "sqlite:///./jd_matching.db"  # postgresql://... also works
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    document_compression: str = "zstd"  # resume/JD bodies: zstd (falls back to zlib), zlib or none
     
     # Groq Configuration
     groq_api_key: str = os.getenv("GROQ_API_KEY", "")
     groq_model: str = "llama3-8b-8192"
+    groq_base_url: Optional[str] = None  # override to point at a stub server
+    llm_max_concurrency: int = 8  # in-flight Groq calls per worker
+    llm_backoff_base: float = 0.5  # seconds, doubled on every retry
+    llm_backoff_max: float = 8.0
+    
+    # LLM result cache
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1024
+    llm_cache_ttl: float = 3600.0  # seconds in the in-process tier
+    llm_cache_path: str = "./llm_cache.db"  # empty to disable the SQLite tier
+    llm_cache_persistent_ttl: float = 7 * 24 * 3600.0
+    llm_single_flight: bool = True  # coalesce identical in-flight calls
+    
+    # Prompt compaction: approximate prompt tokens of document text per call
+    prompt_compaction: bool = True  # False sends full texts as before
+    prompt_budget_resume_info: int = 2500
+    prompt_budget_summary: int = 1200
+    prompt_budget_jd_requirements: int = 1500
+    prompt_budget_skills: int = 1500
+    prompt_budget_experience: int = 1500
+    prompt_budget_insights: int = 900
+    prompt_budget_fused: int = 2000
     
     # File Upload
     max_file_size: int = 10 * 1024 * 1024  # 10MB
     allowed_file_types: List[str] = Field(default=[".pdf", ".docx", ".doc", ".txt"], exclude=True)
+    upload_chunk_size: int = 1024 * 1024  # bytes read per chunk while streaming to disk
+    upload_tmp_dir: str = ""  # empty for the system temp directory
+    extract_workers: int = 2  # parser processes
+    extract_timeout: float = 30.0  # seconds per file
+    extract_memory_limit: int = 512 * 1024 * 1024  # address-space cap per parser process, 0 to disable
+    pdf_extractors: str = ""  # comma-separated backend order, default pymupdf,pypdfium2,pypdf2 (when installed)
+    extract_page_chunk: int = 16  # pages per parallel task for long PDFs, 0 to disable
+    extract_parallel_min_bytes: int = 256 * 1024  # smaller PDFs are parsed in one task
+    bulk_max_files: int = 1000  # files per bulk upload, counting zip members
+    bulk_max_archive_size: int = 200 * 1024 * 1024  # bytes per uploaded zip
+    bulk_max_unpacked_size: int = 500 * 1024 * 1024  # decompressed bytes written per zip
+    extraction_cache_enabled: bool = True
+    extraction_cache_path: str = "./extraction_cache.db"  # extracted text keyed by file SHA-256
+    extraction_cache_max_bytes: int = 256 * 1024 * 1024  # compressed bytes kept before LRU eviction
     
     # LangGraph Configuration
     max_retries: int = 3
     timeout: int = 30
     
+    # Scoring
+    scoring_jitter: bool = False  # legacy ±2 point random variation, disables score reuse
+    tokenizer_stopwords: bool = True  # drop common English words before matching and search
+    tokenizer_stemming: bool = False  # strip common suffixes ("developers" -> "developer")
+    tokenizer_cache_size: int = 4096  # documents whose token ids are memoized
+    scorer: str = "jaccard"  # "jaccard": word overlap, "semantic": cosine of local embeddings
+    rescore_max_rows: int = 20000  # analyses rescored per /analyses/rescore call
+    embedding_model: str = ""  # sentence-transformers model name; empty uses hashed n-gram vectors
+    embedding_dim: int = 512  # width of hashed n-gram vectors
+    embedding_store_dir: str = "./embedding_store"  # memory-mapped vectors by document hash; empty disables
+    
+    # Analysis pipeline
+    stage_timeout: float = 20.0  # seconds per analysis stage
+    stage_failure_policy: str = "partial"  # "partial" or "strict"
+    analysis_mode: str = "staged"  # "staged": one LLM call per stage, "fused": one call for all of them
+    local_skills_match: bool = True  # match skills against a job opening's parsed requirements without an LLM call
+    skill_taxonomy_match: bool = True  # match skills with the local skill dictionary before asking the LLM
+    skill_taxonomy_min_confidence: float = 0.6  # share of the JD's skill terms the dictionary must recognise
+    skill_taxonomy_min_skills: int = 3  # fewer recognised requirements than this goes to the LLM
+    max_batch_size: int = 500  # documents per batch/rank request
+    batch_concurrency: int = 4  # pairs analyzed at once per batch request
+    
+    # Background jobs
+    job_workers: int = 2  # concurrent jobs per API process
+    job_queue_max: int = 1000  # queued jobs before POST /api/jobs returns 429
+    job_max_attempts: int = 3
+    job_poll_interval: float = 1.0  # seconds
+    job_lease_seconds: float = 60.0  # running jobs not renewed for this long are re-queued
+    
+    # Candidate search index
+    search_index_dir: str = "./search_index"
+    search_index_flush_every: int = 1000  # new documents kept in memory before merging to disk
+    
+    # Observability
+    metrics_enabled: bool = True  # serve Prometheus metrics at /metrics
+    log_level: str = "INFO"
+    log_format: str = "text"  # "text" or "json" (one object per line)
+    
     class Config:
         env_file = ".env"
         extra = "ignore"
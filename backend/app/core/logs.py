@@ -0,0 +1,65 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+
+# Attributes every LogRecord has; anything else came in through ``extra=``
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with ``extra=`` fields as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RESERVED})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Human-readable lines with ``extra=`` fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = " ".join(f"{key}={value}" for key, value in vars(record).items() if key not in _RESERVED)
+        return f"{line} {extra}" if extra else line
+
+
+def configure_logging() -> None:
+    """Route the app's logs through a queue so request handlers never block on stderr.
+
+    Records are formatted and written by a background listener thread. Safe
+    to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JSONFormatter() if settings.log_format == "json" else KeyValueFormatter())
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    logger = logging.getLogger("app")
+    logger.setLevel(settings.log_level.upper())
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    logger.propagate = False
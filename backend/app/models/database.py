@@ -1,35 +1,260 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, JSON
+import logging
+from sqlalchemy import event, func, inspect, insert, select, text, Column, MetaData, Table, ForeignKey, Integer, LargeBinary, String, Text, DateTime, Float, JSON, Index
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 from datetime import datetime
 from app.core.config import settings
+from app.core.metrics import DB_COMMIT_DURATION
 
-engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = logging.getLogger(__name__)
+
+# Plain driver URLs from settings are mapped to their async drivers, so the
+# same DATABASE_URL works for SQLite and Postgres
+ASYNC_DRIVERS = {
+    "sqlite://": "sqlite+aiosqlite://",
+    "postgresql://": "postgresql+asyncpg://",
+    "postgres://": "postgresql+asyncpg://",
+}
+
+# Applied to every new SQLite connection. WAL lets readers run alongside the
+# single writer; NORMAL sync is durable across app crashes in WAL mode.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+def async_database_url(url: str) -> str:
+    for prefix, driver in ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return driver + url[len(prefix):]
+    return url
+
+def _create_engine(url: str):
+    url = async_database_url(url)
+    if url.startswith("sqlite"):
+        if ":memory:" in url or url.endswith("://"):
+            # Every connection would get its own empty in-memory database
+            return create_async_engine(url, poolclass=StaticPool)
+        # aiosqlite defaults to NullPool (a new connection per session)
+        return create_async_engine(
+            url,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+        )
+    return create_async_engine(
+        url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_pre_ping=True,
+    )
+
+engine = _create_engine(settings.database_url)
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+class TimedSession(AsyncSession):
+    """AsyncSession that records how long each commit takes"""
+
+    async def commit(self) -> None:
+        with DB_COMMIT_DURATION.time():
+            await super().commit()
+
+SessionLocal = async_sessionmaker(engine, class_=TimedSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+class Document(Base):
+    """A resume or JD text, stored once per distinct content"""
+    __tablename__ = "documents"
+    
+    id = Column(Integer, primary_key=True)
+    content_hash = Column(String(64), nullable=False, unique=True)  # sha256 of the UTF-8 text
+    codec = Column(String, nullable=False)  # zstd, zlib or none
+    body = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)  # uncompressed bytes
+    stored_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<Document(id={self.id}, size={self.size})>"
+
+class JobOpening(Base):
+    """A JD parsed once into structured requirements, shared by every candidate matched against it"""
+    __tablename__ = "job_openings"
+    
+    id = Column(Integer, primary_key=True)
+    jd_document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, unique=True)
+    title = Column(String(255), nullable=True)
+    requirements = Column(JSON, nullable=False)  # required/preferred skills, min years, level
+    requirements_version = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<JobOpening(id={self.id}, title={self.title})>"
+
 class Analysis(Base):
     __tablename__ = "analyses"
     
     id = Column(Integer, primary_key=True, index=True)
-    resume_text = Column(Text, nullable=False)
-    job_description = Column(Text, nullable=False)
+    resume_document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
+    jd_document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
     matching_score = Column(Float, nullable=False)
     resume_summary = Column(Text, nullable=False)
     interview_insights = Column(JSON, nullable=False)
     skills_match = Column(JSON, nullable=False)
     experience_match = Column(JSON, nullable=False)
+    scorer_version = Column(String, nullable=True, index=True)  # NULL for legacy rows
+    job_opening_id = Column(Integer, ForeignKey("job_openings.id"), nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Keyset pagination of the newest-first list view
+    __table_args__ = (Index("ix_analyses_created_at_id", "created_at", "id"),)
+    
     def __repr__(self):
         return f"<Analysis(id={self.id}, score={self.matching_score})>"
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(String, primary_key=True)  # uuid4 hex
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed
+    priority = Column(Integer, nullable=False, default=0)  # higher runs first
+    payload = Column(JSON, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    analysis_id = Column(Integer, nullable=True)
+    stage_errors = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    worker_id = Column(String, nullable=True)  # process running the job
+    lease_expires_at = Column(DateTime, nullable=True)  # renewed while running; stale leases get re-queued
+    
+    # Covers the worker's "next queued job by priority" lookup
+    __table_args__ = (Index("ix_jobs_status_priority", "status", "priority", "created_at"),)
+    
+    def __repr__(self):
+        return f"<Job(id={self.id}, status={self.status})>"
+
+# Columns added after the first release; create_all() does not alter existing tables
+ADDED_COLUMNS = {
+    "analyses": {
+        "scorer_version": "VARCHAR",
+        "job_opening_id": "INTEGER REFERENCES job_openings(id)",
+    },
+    "jobs": {
+        "worker_id": "VARCHAR",
+        "lease_expires_at": "DATETIME",
+    },
+}
+
+def ensure_columns(conn) -> None:
+    """Add columns and indexes missing from tables created by older versions"""
+    inspector = inspect(conn)
+    for table_name, columns in ADDED_COLUMNS.items():
+        if not inspector.has_table(table_name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table_name)}
+        for column_name, ddl in columns.items():
+            if column_name not in existing:
+                conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {ddl}"))
+    # create_all() skips indexes of tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+def migrate_inline_texts(conn, chunk_size: int = 500) -> int:
+    """Move texts stored on ``analyses`` rows by older versions into ``documents``.
+    
+    The old table is renamed aside, recreated with document references and
+    copied over in id order, keeping analysis ids. The rename and every
+    ``chunk_size`` rows are committed separately, so an interrupted run
+    resumes from the last copied id. Returns the rows moved.
+    """
+    from app.services.document_store import content_hash, document_row
+    
+    inspector = inspect(conn)
+    if inspector.has_table("analyses_legacy"):
+        legacy_columns = {column["name"] for column in inspector.get_columns("analyses_legacy")}
+    elif inspector.has_table("analyses"):
+        legacy_columns = {column["name"] for column in inspector.get_columns("analyses")}
+        if "resume_text" not in legacy_columns:
+            return 0
+        # Index names are per schema, so the old ones must go before create_all
+        for index in inspector.get_indexes("analyses"):
+            conn.execute(text(f"DROP INDEX {index['name']}"))
+        conn.execute(text("ALTER TABLE analyses RENAME TO analyses_legacy"))
+    else:
+        return 0
+    Base.metadata.create_all(conn)
+    conn.commit()
+    
+    analyses = Analysis.__table__
+    copied = [c.name for c in analyses.columns if c.name in legacy_columns]
+    # Read the old rows with the current column types (JSON, DateTime)
+    legacy = Table(
+        "analyses_legacy", MetaData(),
+        *[Column(name, analyses.c[name].type) for name in copied],
+        Column("resume_text", Text),
+        Column("job_description", Text),
+    )
+    last_id = conn.execute(select(func.coalesce(func.max(analyses.c.id), 0))).scalar_one()
+    moved = 0
+    while True:
+        rows = conn.execute(
+            select(legacy).where(legacy.c.id > last_id).order_by(legacy.c.id).limit(chunk_size)
+        ).mappings().all()
+        if not rows:
+            break
+        bodies = {}
+        for row in rows:
+            for body in (row["resume_text"], row["job_description"]):
+                bodies[content_hash(body)] = body
+        document_ids = dict(conn.execute(
+            select(Document.content_hash, Document.id).where(Document.content_hash.in_(bodies))
+        ).all())
+        missing = [body for digest, body in bodies.items() if digest not in document_ids]
+        if missing:
+            conn.execute(insert(Document), [document_row(body) for body in missing])
+            document_ids.update(conn.execute(
+                select(Document.content_hash, Document.id)
+                .where(Document.content_hash.in_([content_hash(body) for body in missing]))
+            ).all())
+        conn.execute(insert(analyses), [
+            {
+                **{name: row[name] for name in copied},
+                "resume_document_id": document_ids[content_hash(row["resume_text"])],
+                "jd_document_id": document_ids[content_hash(row["job_description"])],
+            }
+            for row in rows
+        ])
+        conn.commit()
+        moved += len(rows)
+        last_id = rows[-1]["id"]
+    conn.execute(text("DROP TABLE analyses_legacy"))
+    conn.commit()
+    logger.info("Moved texts of %d analyses into documents", moved)
+    return moved
+
+async def init_db() -> None:
+    """Create missing tables and columns, and migrate older layouts"""
+    # Its own connection, as the migration commits as it goes
+    async with engine.connect() as conn:
+        await conn.run_sync(migrate_inline_texts)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(ensure_columns)
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
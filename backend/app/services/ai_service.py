@@ -1,75 +1,134 @@
+import asyncio
 import os
 import json
-import re
-from typing import Dict, List, Any
-from groq import Groq
+import logging
+import threading
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 from collections import Counter
 import numpy as np
 from app.core.config import settings
+from app.services.llm_client import LLMClient
+from app.services.llm_cache import LLMCache
+from app.services.fused_analysis import SECTIONS, SYSTEM_PROMPT as FUSED_SYSTEM_PROMPT, parse_fused_response
+from app.services.prompt_builder import PromptBuilder, estimate_tokens
+from app.services.single_flight import SingleFlight
+from app.services.scoring_engine import ScoringEngine, SCORING_CONFIG_VERSION, similarity_to_score
+from app.services.embeddings import SemanticScorer
+from app.services import skill_taxonomy
+from app.services.tokenizer import Tokenizer
+
+logger = logging.getLogger(__name__)
 
 class AIService:
     def __init__(self):
         try:
-            # Try to initialize Groq client with minimal configuration
+            # Async transport with pooled connections, retries and a concurrency cap
             if settings.groq_api_key and settings.groq_api_key != "gsk_your_actual_api_key_here":
-                self.client = Groq()
-                self.client.api_key = settings.groq_api_key
+                self.client = LLMClient.from_settings()
             else:
-                print("Warning: Groq API key not configured")
+                logger.warning("Groq API key not configured")
                 self.client = None
         except Exception as e:
-            print(f"Warning: Could not initialize Groq client: {e}")
+            logger.warning("Could not initialize Groq client: %s", e)
             self.client = None
         self.model = settings.groq_model
+        self.cache = LLMCache.from_settings() if settings.llm_cache_enabled else None
+        self.flight = SingleFlight() if settings.llm_single_flight else None
+        self.prompts = PromptBuilder.from_settings()
+        self.tokenizer = Tokenizer.from_settings()
+        # Fused replies whose section failed validation, by stage
+        self.fused_fallbacks: Counter = Counter()
+        self._semantic: Optional[SemanticScorer] = None
+        self._semantic_lock = threading.Lock()
+        # Skills matches answered by the local taxonomy vs the LLM
+        self.skills_match_methods: Counter = Counter()
     
-    def _preprocess_text(self, text: str) -> str:
-        """Preprocess text for analysis"""
-        # Convert to lowercase and remove special characters
-        text = re.sub(r'[^a-zA-Z0-9\s]', ' ', text.lower())
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
+    async def aclose(self) -> None:
+        """Release pooled upstream connections"""
+        if self.client:
+            await self.client.aclose()
     
-    def _calculate_similarity(self, text1: str, text2: str) -> float:
-        """Calculate simple text similarity using word overlap"""
-        # Preprocess texts
-        text1 = self._preprocess_text(text1)
-        text2 = self._preprocess_text(text2)
-        
-        # Get word sets
-        words1 = set(text1.split())
-        words2 = set(text2.split())
-        
+    @property
+    def tokenizer_version(self) -> str:
+        """Changes whenever tokenize() output does, so persisted indexes get rebuilt"""
+        return self.tokenizer.version
+    
+    def tokenize(self, text: str) -> List[str]:
+        """Split text into the terms used for matching and search"""
+        return self.tokenizer.tokens(text)
+    
+    def _word_set(self, text: str) -> set:
+        """Preprocess text into its set of words"""
+        return set(self.tokenize(text))
+    
+    def _jaccard(self, words1: set, words2: set) -> float:
+        """Jaccard similarity of two word sets"""
         if not words1 or not words2:
             return 0.0
         
-        # Calculate Jaccard similarity
         intersection = len(words1.intersection(words2))
         union = len(words1.union(words2))
         
         if union == 0:
             return 0.0
         
-        similarity = intersection / union
-        return similarity
+        return intersection / union
+    
+    def _calculate_similarity(self, text1: str, text2: str) -> float:
+        """Calculate simple text similarity using word overlap"""
+        return self._jaccard(self._word_set(text1), self._word_set(text2))
     
-    async def _call_groq(self, messages: List[Dict[str, str]]) -> str:
-        """Make a call to Groq API"""
+    async def _fetch(self, key: str, messages: List[Dict[str, str]], temperature: float) -> str:
+        """Call Groq and store the completion in the cache"""
+        response = await self.client.chat(messages, temperature=temperature, max_tokens=2000)
+        if self.cache:
+            await self.cache.set(key, response)
+        return response
+    
+    async def _call_groq(self, messages: List[Dict[str, str]], temperature: float = 0.1) -> str:
+        """Make a call to Groq API, serving repeated prompts from the cache"""
         if not self.client:
             return "Groq client not available"
         
+        key = LLMCache.make_key(self.model, messages, temperature)
+        if self.cache:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return cached
+        
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.1,
-                max_tokens=2000
-            )
-            return response.choices[0].message.content
+            # Identical requests already in flight share one upstream call
+            if self.flight:
+                return await self.flight.do(key, lambda: self._fetch(key, messages, temperature))
+            return await self._fetch(key, messages, temperature)
         except Exception as e:
-            print(f"Error calling Groq API: {e}")
+            logger.error("Error calling Groq API: %s", e)
             return "Error processing request"
     
+    def _messages(self, stage: str, system_prompt: str, user_content: str, uncompacted_content: str) -> List[Dict[str, str]]:
+        """Chat messages for a stage, counting their prompt tokens"""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ]
+        self.prompts.record(stage, messages, estimate_tokens(system_prompt) + estimate_tokens(uncompacted_content))
+        return messages
+    
+    def _match_messages(self, stage: str, system_prompt: str, resume_text: str, job_description: str, jd_requirements: Optional[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Messages for resume-vs-JD comparisons"""
+        # Parsed requirements are much shorter than the full JD text
+        if jd_requirements and "error" not in jd_requirements:
+            label, job_text, structured = "Job Requirements", json.dumps(jd_requirements), True
+        else:
+            label, job_text, structured = "Job Description", job_description, False
+        resume_part, job_part = self.prompts.pair(stage, resume_text, job_text, structured)
+        return self._messages(
+            stage,
+            system_prompt,
+            f"Resume: {resume_part}\n\n{label}: {job_part}",
+            f"Resume: {resume_text}\n\n{label}: {job_text}",
+        )
+    
     async def extract_resume_info(self, resume_text: str) -> Dict[str, Any]:
         """Extract key information from resume text"""
         system_prompt = """
@@ -84,10 +143,12 @@ class AIService:
         Return the information in a structured JSON format.
         """
         
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Parse this resume:\n\n{resume_text}"}
-        ]
+        messages = self._messages(
+            "resume_info",
+            system_prompt,
+            f"Parse this resume:\n\n{self.prompts.resume('resume_info', resume_text)}",
+            f"Parse this resume:\n\n{resume_text}",
+        )
         
         response = await self._call_groq(messages)
         try:
@@ -95,27 +156,66 @@ class AIService:
         except:
             return {"error": "Failed to parse response", "raw_response": response}
     
+    def _fallback_summary(self, resume_text: str) -> str:
+        """Summary used when Groq is not available"""
+        words = resume_text.split()
+        if len(words) > 50:
+            return " ".join(words[:50]) + "..."
+        return resume_text[:200] + "..." if len(resume_text) > 200 else resume_text
+    
+    def _summary_messages(self, resume_text: str) -> List[Dict[str, str]]:
+        system_prompt = """
+        Create a professional summary of this resume in 2-3 sentences. 
+        Focus on the candidate's key strengths, experience level, and most relevant skills.
+        Make it suitable for quick review by hiring managers.
+        """
+        
+        return self._messages(
+            "summary",
+            system_prompt,
+            f"Summarize this resume:\n\n{self.prompts.resume('summary', resume_text)}",
+            f"Summarize this resume:\n\n{resume_text}",
+        )
+    
     async def generate_resume_summary(self, resume_text: str) -> str:
         """Generate a concise summary of the resume"""
         if not self.client:
             # Fallback summary when Groq is not available
-            words = resume_text.split()
-            if len(words) > 50:
-                return " ".join(words[:50]) + "..."
-            return resume_text[:200] + "..." if len(resume_text) > 200 else resume_text
+            return self._fallback_summary(resume_text)
         
-        system_prompt = """
-        Create a professional summary of this resume in 2-3 sentences. 
-        Focus on the candidate's key strengths, experience level, and most relevant skills.
-        Make it suitable for quick review by hiring managers.
+        return await self._call_groq(self._summary_messages(resume_text))
+    
+    async def stream_resume_summary(self, resume_text: str) -> AsyncIterator[str]:
+        """Yield the resume summary as it is generated.
+        
+        Cached summaries are yielded whole. Streamed calls bypass single-flight
+        (a stream cannot be shared) but still populate the cache.
         """
+        if not self.client:
+            yield self._fallback_summary(resume_text)
+            return
         
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Summarize this resume:\n\n{resume_text}"}
-        ]
+        messages = self._summary_messages(resume_text)
+        key = LLMCache.make_key(self.model, messages, 0.1)
+        if self.cache:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
         
-        return await self._call_groq(messages)
+        parts = []
+        try:
+            async for delta in self.client.stream_chat(messages, temperature=0.1, max_tokens=2000):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            logger.error("Error streaming from Groq API: %s", e)
+            if not parts:
+                yield "Error processing request"
+            return
+        
+        if self.cache:
+            await self.cache.set(key, "".join(parts))
     
     async def analyze_jd_requirements(self, job_description: str) -> Dict[str, Any]:
         """Analyze job description to extract requirements"""
@@ -139,10 +239,12 @@ class AIService:
         Return the information in a structured JSON format.
         """
         
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Analyze this job description:\n\n{job_description}"}
-        ]
+        messages = self._messages(
+            "jd_requirements",
+            system_prompt,
+            f"Analyze this job description:\n\n{self.prompts.job_description('jd_requirements', job_description)}",
+            f"Analyze this job description:\n\n{job_description}",
+        )
         
         response = await self._call_groq(messages)
         try:
@@ -150,45 +252,107 @@ class AIService:
         except:
             return {"error": "Failed to parse response", "raw_response": response}
     
+    @property
+    def scorer_version(self) -> str:
+        """Identifies everything a matching score depends on besides the texts"""
+        if settings.scorer == "semantic":
+            version = f"{self.semantic_scorer().version}/bands-v{SCORING_CONFIG_VERSION}"
+        else:
+            version = f"jaccard-bands-v{SCORING_CONFIG_VERSION}/{self.tokenizer_version}"
+        if settings.scoring_jitter:
+            # Jittered scores are not reproducible, so they never match a stored version
+            version += "/jitter"
+        return version
+    
+    def _score_from_similarity(self, similarity: float) -> float:
+        """Map a 0-1 similarity onto the 0-100 matching score scale"""
+        final_score = float(similarity_to_score(similarity))
+        
+        if settings.scoring_jitter:
+            # Legacy mode: small random variation (±2 points)
+            adjustment = np.random.uniform(-2.0, 2.0)
+            final_score = max(0.0, min(100.0, final_score + adjustment))
+        
+        return round(final_score, 2)
+    
+    def _scoring_engine(self) -> ScoringEngine:
+        # A fresh engine per call keeps the vocabulary from growing forever
+        return ScoringEngine(self.tokenize, self.tokenizer.ids)
+    
+    def semantic_scorer(self) -> SemanticScorer:
+        """Embedding scorer, loaded on first use"""
+        # Scoring runs in worker threads, which must share one scorer and store
+        with self._semantic_lock:
+            if self._semantic is None:
+                self._semantic = SemanticScorer.from_settings()
+        return self._semantic
+    
+    def embedding_stats(self) -> Optional[Dict[str, Any]]:
+        if self._semantic is None or self._semantic.store is None:
+            return None
+        return {"embedder": self._semantic.embedder.name, **self._semantic.store.stats()}
+    
+    def _similarity(self, resume_texts: List[str], job_descriptions: List[str], metric: str) -> np.ndarray:
+        """M x N 0-1 similarities under a scoring metric"""
+        if metric == "semantic":
+            scorer = self.semantic_scorer()
+            return scorer.to_unit(scorer.similarity(resume_texts, job_descriptions))
+        return self._scoring_engine().similarity(resume_texts, job_descriptions, metric)
+    
     async def calculate_matching_score(self, resume_text: str, job_description: str) -> float:
         """Calculate matching score between resume and job description"""
         try:
-            # Calculate similarity using word overlap
-            similarity = self._calculate_similarity(resume_text, job_description)
-            
-            # Debug: Print the raw similarity value
-            print(f"Raw similarity: {similarity}")
-            
-            # Ensure similarity is between 0 and 1
-            similarity = max(0.0, min(1.0, similarity))
-            
-            # Convert to percentage with reasonable scaling
-            # Most real-world matches fall between 10-80%
-            if similarity < 0.01:  # Very low similarity
-                base_score = 10.0
-            elif similarity < 0.1:  # Low similarity
-                base_score = 20.0 + (similarity * 100)
-            elif similarity < 0.3:  # Moderate similarity
-                base_score = 30.0 + (similarity * 100)
-            elif similarity < 0.5:  # Good similarity
-                base_score = 50.0 + (similarity * 50)
-            else:  # High similarity
-                base_score = 70.0 + (similarity * 30)
-            
-            # Cap at 100%
-            final_score = min(100.0, base_score)
-            
-            # Add small random variation (±2 points)
-            adjustment = np.random.uniform(-2.0, 2.0)
-            final_score = max(0.0, min(100.0, final_score + adjustment))
+            if settings.scorer == "semantic":
+                # Embedding is CPU-bound; keep it off the event loop
+                matrix = await asyncio.to_thread(self._similarity, [resume_text], [job_description], "semantic")
+                similarity = float(matrix[0, 0])
+            else:
+                # Calculate similarity using word overlap
+                similarity = self._calculate_similarity(resume_text, job_description)
             
-            print(f"Final score: {final_score}")
-            return round(final_score, 2)
+            final_score = self._score_from_similarity(similarity)
+            logger.debug("Matching score", extra={"similarity": similarity, "score": final_score})
+            return final_score
             
         except Exception as e:
-            print(f"Error calculating matching score: {e}")
+            logger.exception("Error calculating matching score: %s", e)
             return 50.0  # Default score
     
+    async def calculate_matching_scores(self, resume_texts: List[str], job_descriptions: List[str]) -> List[float]:
+        """Score resume/JD pairs, preprocessing each distinct text only once.
+        
+        Either list may have a single element, in which case it is paired
+        with every element of the other list. The CPU work runs in a worker
+        thread so a large batch does not stall the event loop.
+        """
+        return await asyncio.to_thread(self.score_pairs, resume_texts, job_descriptions)
+    
+    def score_pairs(self, resume_texts: List[str], job_descriptions: List[str]) -> List[float]:
+        """Synchronous ``calculate_matching_scores``, safe to run in a worker thread"""
+        if len(resume_texts) == 1:
+            resume_texts = resume_texts * len(job_descriptions)
+        if len(job_descriptions) == 1:
+            job_descriptions = job_descriptions * len(resume_texts)
+        if len(resume_texts) != len(job_descriptions):
+            raise ValueError("resume_texts and job_descriptions must pair up")
+        
+        # Score the distinct texts as a matrix, then pick out the pairs
+        resume_index = {text: i for i, text in enumerate(dict.fromkeys(resume_texts))}
+        jd_index = {text: j for j, text in enumerate(dict.fromkeys(job_descriptions))}
+        similarity = self._similarity(list(resume_index), list(jd_index), settings.scorer)
+        return [
+            self._score_from_similarity(similarity[resume_index[r], jd_index[j]])
+            for r, j in zip(resume_texts, job_descriptions)
+        ]
+    
+    def top_matches(self, resume_texts: List[str], job_descriptions: List[str], k: int = 10, metric: str = "jaccard") -> List[List[Tuple[int, float]]]:
+        """Top-k resumes per JD as (resume index, matching score) pairs"""
+        similarity = self._similarity(resume_texts, job_descriptions, metric)
+        return [
+            [(i, round(float(score), 2)) for i, score in matches]
+            for matches in ScoringEngine.top_k(similarity_to_score(similarity), k)
+        ]
+    
     async def generate_interview_insights(self, resume_text: str, job_description: str, matching_score: float) -> Dict[str, Any]:
         """Generate interview insights and discussion areas"""
         if not self.client:
@@ -236,18 +400,24 @@ class AIService:
         Return as structured JSON with clear sections.
         """
         
-        prompt = f"""
-        Resume: {resume_text[:1000]}...
-        Job Description: {job_description[:1000]}...
-        Matching Score: {matching_score:.2f}
+        if self.prompts.enabled:
+            resume_part, jd_part = self.prompts.pair("insights", resume_text, job_description)
+        else:
+            resume_part, jd_part = f"{resume_text[:1000]}...", f"{job_description[:1000]}..."
+        prompt = """
+        Resume: {}
+        Job Description: {}
+        Matching Score: {:.2f}
         
         Generate interview insights based on this information.
         """
         
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompt}
-        ]
+        messages = self._messages(
+            "insights",
+            system_prompt,
+            prompt.format(resume_part, jd_part, matching_score),
+            prompt.format(resume_text, job_description, matching_score),
+        )
         
         response = await self._call_groq(messages)
         try:
@@ -255,8 +425,41 @@ class AIService:
         except:
             return {"error": "Failed to parse response", "raw_response": response}
     
-    async def analyze_skills_match(self, resume_text: str, job_description: str) -> Dict[str, Any]:
+    async def analyze_fused(self, resume_text: str, job_description: str, matching_score: float, jd_requirements: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Summary, skills, experience and insights from one structured-JSON call.
+        
+        Returns the sections that passed schema validation, keyed by stage
+        name; callers run the per-stage analysis for any that are missing.
+        """
+        if not self.client:
+            return {}
+        
+        messages = self._match_messages("fused", FUSED_SYSTEM_PROMPT, resume_text, job_description, jd_requirements)
+        messages[-1]["content"] += f"\n\nMatching Score: {matching_score:.2f}"
+        sections = parse_fused_response(await self._call_groq(messages))
+        for stage in ["summary"] + [stage for _, stage, _ in SECTIONS]:
+            if stage not in sections:
+                self.fused_fallbacks[stage] += 1
+        return sections
+    
+    def taxonomy_skills_match(self, resume_text: str, job_description: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Local skills match and whether it is confident enough to skip the LLM"""
+        if not settings.skill_taxonomy_match:
+            return None, False
+        result = skill_taxonomy.match_skills(resume_text, job_description)
+        confident = (
+            result["required_skill_count"] >= settings.skill_taxonomy_min_skills
+            and result["taxonomy_confidence"] >= settings.skill_taxonomy_min_confidence
+        )
+        return result, confident
+    
+    async def analyze_skills_match(self, resume_text: str, job_description: str, jd_requirements: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze skills matching between resume and job description"""
+        local, confident = self.taxonomy_skills_match(resume_text, job_description)
+        if local is not None and (confident or not self.client):
+            self.skills_match_methods["taxonomy"] += 1
+            return local
+        self.skills_match_methods["llm"] += 1
         if not self.client:
             # Fallback skills analysis when Groq is not available
             return {
@@ -278,10 +481,7 @@ class AIService:
         Return as structured JSON with skill categories and confidence levels.
         """
         
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Resume: {resume_text}\n\nJob Description: {job_description}"}
-        ]
+        messages = self._match_messages("skills", system_prompt, resume_text, job_description, jd_requirements)
         
         response = await self._call_groq(messages)
         try:
@@ -289,7 +489,7 @@ class AIService:
         except:
             return {"error": "Failed to parse response", "raw_response": response}
     
-    async def analyze_experience_match(self, resume_text: str, job_description: str) -> Dict[str, Any]:
+    async def analyze_experience_match(self, resume_text: str, job_description: str, jd_requirements: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze experience level matching"""
         if not self.client:
             # Fallback experience analysis when Groq is not available
@@ -313,10 +513,7 @@ class AIService:
         Return as structured JSON with detailed analysis.
         """
         
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Resume: {resume_text}\n\nJob Description: {job_description}"}
-        ]
+        messages = self._match_messages("experience", system_prompt, resume_text, job_description, jd_requirements)
         
         response = await self._call_groq(messages)
         try:
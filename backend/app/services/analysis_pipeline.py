@@ -0,0 +1,112 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.services.ai_service import AIService
+from app.services.job_openings import has_skill_lists
+from app.services.skill_taxonomy import match_requirements
+from app.services.stage_scheduler import StageResults, StageScheduler
+
+DEFAULT_SCORE = 50.0
+
+
+def _error_result(reason: str) -> Dict[str, Any]:
+    return {"error": "Stage unavailable", "reason": reason}
+
+
+def build_analysis_scheduler(
+    ai_service: AIService,
+    resume_text: str,
+    job_description: str,
+    matching_score: Optional[float] = None,
+    jd_requirements: Optional[Dict[str, Any]] = None,
+    on_summary_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> StageScheduler:
+    """Build the stage graph for a single resume/JD analysis.
+
+    The score is computed locally and is the only dependency of the insights
+    stage; summary, skills and experience run alongside it. Callers can pass a
+    precomputed score and the parsed requirements of a job opening shared by
+    many pairs; with those the skills match is computed locally.
+    With ``on_summary_delta`` the summary is streamed token by token.
+
+    In ``fused`` analysis mode a single LLM call, made once the score is
+    known, produces all four LLM-backed sections; a stage only makes its own
+    call when its section of the fused reply is missing or invalid.
+    """
+    scheduler = StageScheduler(
+        default_timeout=settings.stage_timeout,
+        policy=settings.stage_failure_policy,
+    )
+
+    async def score(_: Dict[str, Any]) -> float:
+        if matching_score is not None:
+            return matching_score
+        return await ai_service.calculate_matching_score(resume_text, job_description)
+
+    fused = settings.analysis_mode == "fused"
+    section_deps = ["fused"] if fused else []
+
+    async def combined(deps: Dict[str, Any]) -> Dict[str, Any]:
+        return await ai_service.analyze_fused(resume_text, job_description, deps["score"], jd_requirements)
+
+    def fused_section(deps: Dict[str, Any], stage: str) -> Any:
+        return (deps.get("fused") or {}).get(stage)
+
+    async def summary(deps: Dict[str, Any]) -> str:
+        value = fused_section(deps, "summary")
+        if value is not None:
+            if on_summary_delta is not None:
+                await on_summary_delta(value)
+            return value
+        if on_summary_delta is None:
+            return await ai_service.generate_resume_summary(resume_text)
+        parts = []
+        async for delta in ai_service.stream_resume_summary(resume_text):
+            parts.append(delta)
+            await on_summary_delta(delta)
+        return "".join(parts)
+
+    async def skills(deps: Dict[str, Any]) -> Dict[str, Any]:
+        if settings.local_skills_match and has_skill_lists(jd_requirements):
+            return match_requirements(jd_requirements, resume_text)
+        if fused_section(deps, "skills") is not None:
+            return fused_section(deps, "skills")
+        return await ai_service.analyze_skills_match(resume_text, job_description, jd_requirements)
+
+    async def experience(deps: Dict[str, Any]) -> Dict[str, Any]:
+        if fused_section(deps, "experience") is not None:
+            return fused_section(deps, "experience")
+        return await ai_service.analyze_experience_match(
+            resume_text, job_description, jd_requirements
+        )
+
+    async def insights(deps: Dict[str, Any]) -> Dict[str, Any]:
+        if fused_section(deps, "insights") is not None:
+            return fused_section(deps, "insights")
+        return await ai_service.generate_interview_insights(
+            resume_text, job_description, deps["score"]
+        )
+
+    scheduler.add("score", score, fallback=DEFAULT_SCORE)
+    if fused:
+        # Sections missing from a failed fused call fall back to their own calls
+        scheduler.add("fused", combined, depends_on=["score"], fallback={})
+    scheduler.add("summary", summary, depends_on=section_deps, fallback=lambda reason: "Summary unavailable")
+    scheduler.add("skills", skills, depends_on=section_deps, fallback=_error_result)
+    scheduler.add("experience", experience, depends_on=section_deps, fallback=_error_result)
+    scheduler.add("insights", insights, depends_on=["score"] + section_deps, fallback=_error_result)
+    return scheduler
+
+
+async def run_analysis(
+    ai_service: AIService,
+    resume_text: str,
+    job_description: str,
+    matching_score: Optional[float] = None,
+    jd_requirements: Optional[Dict[str, Any]] = None,
+) -> StageResults:
+    """Run all analysis stages for a resume/JD pair"""
+    scheduler = build_analysis_scheduler(
+        ai_service, resume_text, job_description, matching_score, jd_requirements
+    )
+    return await scheduler.run()
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.database import Analysis, Document
+
+try:
+    import zstandard
+except ImportError:  # zlib is always available
+    zstandard = None
+
+CODECS = ("zstd", "zlib", "none")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress(text: str, codec: Optional[str] = None) -> Tuple[str, bytes]:
+    """Encode a document body, returning the codec actually used"""
+    codec = codec or settings.document_compression
+    if codec not in CODECS:
+        raise ValueError(f"Unknown document codec: {codec}")
+    raw = text.encode("utf-8")
+    if codec == "zstd" and zstandard is None:
+        codec = "zlib"
+    if codec == "zstd":
+        body = zstandard.ZstdCompressor(level=3).compress(raw)
+    elif codec == "zlib":
+        body = zlib.compress(raw, 6)
+    else:
+        return "none", raw
+    # Very short texts can grow when compressed
+    if len(body) >= len(raw):
+        return "none", raw
+    return codec, body
+
+
+def decompress(codec: str, body: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Document is zstd-compressed but the zstandard package is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(body)
+    elif codec == "zlib":
+        raw = zlib.decompress(body)
+    else:
+        raw = body
+    return raw.decode("utf-8")
+
+
+def document_row(text: str) -> Dict[str, object]:
+    """Column values for a new ``documents`` row"""
+    codec, body = compress(text)
+    return {
+        "content_hash": content_hash(text),
+        "codec": codec,
+        "body": body,
+        "size": len(text.encode("utf-8")),
+        "stored_size": len(body),
+    }
+
+
+def _insert_ignoring_duplicates(dialect: str):
+    # Concurrent requests may store the same text; the unique hash wins once
+    if dialect == "postgresql":
+        return postgresql_insert(Document).on_conflict_do_nothing(index_elements=["content_hash"])
+    if dialect == "sqlite":
+        return sqlite_insert(Document).on_conflict_do_nothing(index_elements=["content_hash"])
+    raise RuntimeError(f"Unsupported database dialect: {dialect}")
+
+
+async def intern_documents(db: AsyncSession, texts: Sequence[str]) -> List[int]:
+    """Store each distinct text once and return document ids in input order"""
+    hashes = [content_hash(text) for text in texts]
+    distinct = dict(zip(hashes, texts))
+
+    known = dict((await db.execute(
+        select(Document.content_hash, Document.id).where(Document.content_hash.in_(distinct))
+    )).all())
+    missing = [text for digest, text in distinct.items() if digest not in known]
+    if missing:
+        await db.execute(
+            _insert_ignoring_duplicates(db.bind.dialect.name),
+            [document_row(text) for text in missing],
+        )
+        known.update((await db.execute(
+            select(Document.content_hash, Document.id)
+            .where(Document.content_hash.in_([content_hash(text) for text in missing]))
+        )).all())
+    return [known[digest] for digest in hashes]
+
+
+async def load_texts(db: AsyncSession, document_ids: Iterable[int]) -> Dict[int, str]:
+    """Decompressed bodies for the given document ids"""
+    ids = set(document_ids)
+    if not ids:
+        return {}
+    rows = await db.execute(select(Document.id, Document.codec, Document.body).where(Document.id.in_(ids)))
+    return {row.id: decompress(row.codec, row.body) for row in rows}
+
+
+async def storage_report(db: AsyncSession) -> Dict[str, object]:
+    """Bytes the documents table saves over storing texts on every analysis"""
+    documents, unique_bytes, stored_bytes = (await db.execute(
+        select(func.count(), func.coalesce(func.sum(Document.size), 0), func.coalesce(func.sum(Document.stored_size), 0))
+    )).one()
+    resume = Document.__table__.alias("resume")
+    jd = Document.__table__.alias("jd")
+    analyses, inline_bytes = (await db.execute(
+        select(func.count(), func.coalesce(func.sum(resume.c.size + jd.c.size), 0))
+        .select_from(Analysis)
+        .join(resume, resume.c.id == Analysis.resume_document_id)
+        .join(jd, jd.c.id == Analysis.jd_document_id)
+    )).one()
+    codecs = dict((await db.execute(select(Document.codec, func.count()).group_by(Document.codec))).all())
+    return {
+        "analyses": analyses,
+        "documents": documents,
+        "codecs": codecs,
+        "inline_bytes": inline_bytes,  # what the per-analysis text columns held
+        "unique_bytes": unique_bytes,
+        "stored_bytes": stored_bytes,
+        "bytes_saved": inline_bytes - stored_bytes,
+        "dedup_ratio": round(inline_bytes / unique_bytes, 2) if unique_bytes else None,
+        "compression_ratio": round(unique_bytes / stored_bytes, 2) if stored_bytes else None,
+    }
+
+
+if __name__ == "__main__":
+    # python -m app.services.document_store: migrate if needed and print the report
+    import asyncio
+
+    from app.models.database import SessionLocal, engine, init_db
+
+    async def main() -> None:
+        await init_db()
+        async with SessionLocal() as db:
+            print(json.dumps(await storage_report(db), indent=2))
+        await engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,258 @@
+import logging
+import os
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.document_store import content_hash
+from app.services.file_lock import file_lock
+from app.services.prompt_builder import split_sections
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever embeddings or the cosine-to-score mapping change
+SEMANTIC_VERSION = 1
+
+# Spellings that share no character n-grams with the canonical name
+ALIASES = {
+    "k8s": "kubernetes", "postgres": "postgresql", "psql": "postgresql", "js": "javascript",
+    "ts": "typescript", "py": "python", "golang": "go", "tf": "terraform", "gcp": "google cloud",
+    "aws": "amazon web services", "ml": "machine learning", "dl": "deep learning", "nlp": "natural language processing",
+    "ci": "continuous integration", "cd": "continuous delivery", "k8": "kubernetes", "mongo": "mongodb",
+    "node": "nodejs", "node.js": "nodejs", "react.js": "react", "reactjs": "react", "vue.js": "vue",
+}
+WORD = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+# Sections that carry the match signal; others (company blurb, benefits) are left out
+FOCUS_SECTIONS = {
+    "resume": {"header", "summary", "skills", "experience", "projects", "certifications", "education", "other"},
+    "jd": {"header", "summary", "requirements", "preferred", "responsibilities"},
+}
+
+# Cosine similarities of hashed n-gram vectors rarely leave this range;
+# it is stretched linearly onto 0-100
+COSINE_FLOOR = 0.15
+COSINE_CEILING = 0.75
+
+
+def focus_text(text: str, side: str) -> str:
+    """The sections of a resume or JD worth embedding"""
+    keep = FOCUS_SECTIONS[side]
+    sections = [lines for name, _, lines in split_sections(text) if name in keep]
+    return "\n".join(line for lines in sections for line in lines) if sections else text
+
+
+class HashingEmbedder:
+    """Hashed word and character n-gram vectors; needs no model download.
+
+    Words are lower-cased and canonicalised through ALIASES, then every word
+    and every character n-gram of it is hashed into a signed bucket, so
+    "postgres" and "postgresql" share most of their features.
+    """
+
+    def __init__(self, dim: int = 512, ngram_range: tuple = (3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.name = f"hashing-{dim}-{ngram_range[0]}{ngram_range[1]}"
+
+    def _features(self, text: str) -> List[str]:
+        features = []
+        low, high = self.ngram_range
+        for word in WORD.findall(text.lower()):
+            word = ALIASES.get(word.rstrip("."), word.rstrip("."))
+            for part in word.split():
+                features.append(part)
+                padded = f" {part} "
+                for n in range(low, min(high, len(padded)) + 1):
+                    features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(feature.encode("utf-8")) for feature in self._features(text)), dtype=np.uint32
+            )
+            if not len(hashes):
+                continue
+            # Low bits pick the bucket, the top bit the sign
+            signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+            np.add.at(vectors[row], (hashes % self.dim).astype(np.int64), signs)
+            # Sub-linear term frequency, as in TF-IDF
+            np.copysign(np.log1p(np.abs(vectors[row])), vectors[row], out=vectors[row])
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class SentenceTransformerEmbedder:
+    """A small local sentence-transformers model run on the CPU"""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = "st-" + re.sub(r"[^A-Za-z0-9._-]", "_", model_name)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return self.model.encode(list(texts), batch_size=32, normalize_embeddings=True).astype(np.float32)
+
+
+def make_embedder(model_name: str = "", dim: int = 512):
+    """The configured model when sentence-transformers is installed, else the hashing embedder"""
+    if model_name:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except Exception as e:
+            logger.warning("Embedding model %s unavailable (%s), using hashed n-grams", model_name, e)
+    return HashingEmbedder(dim)
+
+
+class EmbeddingStore:
+    """Append-only float32 vectors on disk, read through a memory map.
+
+    ``vectors.f32`` holds one row per document and ``keys.txt`` the content
+    hash of each row in the same order. Several processes may share a store:
+    writers append under a file lock and first pick up the rows the others
+    appended, so a key's row number is the same in every process. A row whose
+    key line is missing (a crash between the two writes) is ignored and later
+    overwritten.
+    """
+
+    def __init__(self, directory: str, dim: int):
+        self.directory = directory
+        self.dim = dim
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.keys_path = os.path.join(directory, "keys.txt")
+        self.lock_path = os.path.join(directory, "lock")
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._rows = 0
+        self._keys_size = 0  # bytes of keys.txt already read
+        self._map: Optional[np.memmap] = None
+        os.makedirs(directory, exist_ok=True)
+        with file_lock(self.lock_path):
+            self._refresh()
+            self._repair()
+
+    def _refresh(self) -> None:
+        """Read rows appended since the last call, by this or another process"""
+        if not os.path.exists(self.keys_path):
+            return
+        row_bytes = self.dim * 4
+        stored_rows = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+        with open(self.keys_path, "rb") as f:
+            f.seek(self._keys_size)
+            tail = f.read()
+        for line in tail.splitlines(keepends=True):
+            if not line.endswith(b"\n") or self._rows >= stored_rows:
+                break
+            key = line.strip().decode("ascii")
+            if key:
+                self._index[key] = self._rows
+                self._rows += 1
+            self._keys_size += len(line)
+
+    def _repair(self) -> None:
+        """Drop partial writes past the last complete row; needs the exclusive file lock"""
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) != self._rows * self.dim * 4:
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(self._rows * self.dim * 4)
+        if os.path.exists(self.keys_path) and os.path.getsize(self.keys_path) != self._keys_size:
+            with open(self.keys_path, "ab") as f:
+                f.truncate(self._keys_size)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def _matrix(self) -> np.ndarray:
+        if self._map is None or len(self._map) != self._rows:
+            self._map = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._rows, self.dim))
+        return self._map
+
+    def get(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        with self._lock:
+            if any(key not in self._index for key in keys):
+                # Another process may have embedded it already
+                with file_lock(self.lock_path, shared=True):
+                    self._refresh()
+            rows = [(key, self._index[key]) for key in keys if key in self._index]
+            if not rows:
+                return {}
+            vectors = np.asarray(self._matrix()[[row for _, row in rows]])
+        return {key: vectors[n] for n, (key, _) in enumerate(rows)}
+
+    def add(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        with self._lock, file_lock(self.lock_path):
+            self._refresh()
+            new = [(key, vector) for key, vector in zip(keys, vectors) if key not in self._index]
+            if not new:
+                return
+            self._repair()
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray([vector for _, vector in new], dtype=np.float32).tobytes())
+            lines = "".join(f"{key}\n" for key, _ in new)
+            with open(self.keys_path, "a", encoding="ascii") as f:
+                f.write(lines)
+            for key, _ in new:
+                self._index[key] = self._rows
+                self._rows += 1
+            self._keys_size += len(lines)
+
+    def stats(self) -> Dict[str, int]:
+        return {"documents": self._rows, "dim": self.dim, "bytes": self._rows * self.dim * 4}
+
+
+class SemanticScorer:
+    """Cosine similarity of document embeddings, cached per content hash"""
+
+    def __init__(self, embedder, store: Optional[EmbeddingStore] = None, chunk_rows: int = 4096):
+        self.embedder = embedder
+        self.store = store
+        self.chunk_rows = chunk_rows
+
+    @classmethod
+    def from_settings(cls) -> "SemanticScorer":
+        embedder = make_embedder(settings.embedding_model, settings.embedding_dim)
+        store = None
+        if settings.embedding_store_dir:
+            store = EmbeddingStore(os.path.join(settings.embedding_store_dir, embedder.name), embedder.dim)
+        return cls(embedder, store)
+
+    @property
+    def version(self) -> str:
+        return f"semantic-{self.embedder.name}-v{SEMANTIC_VERSION}"
+
+    def embed(self, texts: Sequence[str], side: str) -> np.ndarray:
+        """Unit vectors for texts, embedding only those not already stored"""
+        keys = [f"{side}:{content_hash(text)}" for text in texts]
+        known = self.store.get(list(dict.fromkeys(keys))) if self.store is not None else {}
+        missing = list(dict.fromkeys(key for key in keys if key not in known))
+        if missing:
+            text_of = dict(zip(keys, texts))
+            vectors = self.embedder.embed([focus_text(text_of[key], side) for key in missing])
+            known.update(zip(missing, vectors))
+            if self.store is not None:
+                self.store.add(missing, vectors)
+        if not keys:
+            return np.zeros((0, self.embedder.dim), dtype=np.float32)
+        return np.stack([known[key] for key in keys])
+
+    def similarity(self, resume_texts: Sequence[str], job_descriptions: Sequence[str]) -> np.ndarray:
+        """M x N cosine similarities, multiplied in row chunks to bound memory"""
+        resumes = self.embed(resume_texts, "resume")
+        jds = self.embed(job_descriptions, "jd")
+        result = np.empty((len(resumes), len(jds)), dtype=np.float32)
+        for start in range(0, len(resumes), self.chunk_rows):
+            np.matmul(resumes[start:start + self.chunk_rows], jds.T, out=result[start:start + self.chunk_rows])
+        return result
+
+    @staticmethod
+    def to_unit(similarity: np.ndarray) -> np.ndarray:
+        """Stretch cosine similarities onto 0-1 for the score bands"""
+        return np.clip((similarity - COSINE_FLOOR) / (COSINE_CEILING - COSINE_FLOOR), 0.0, 1.0)
@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.services.document_store import compress, decompress
+
+
+class ExtractionCache:
+    """On-disk cache of extracted file text, keyed by file content.
+
+    Keys hash the SHA-256 of the uploaded bytes together with the extractor
+    backends and versions for the file type, so upgrading a parser misses
+    instead of serving stale text. Entries are compressed and the cache is
+    bounded by total stored bytes; the least recently used entries are
+    evicted first.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = 256 * 1024 * 1024, codec: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.codec = codec
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS extraction_cache ("
+            "key TEXT PRIMARY KEY, codec TEXT NOT NULL, body BLOB NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_extraction_cache_last_used ON extraction_cache (last_used)")
+        self._db.commit()
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM extraction_cache").fetchone()[0]
+
+    @classmethod
+    def from_settings(cls) -> "ExtractionCache":
+        return cls(
+            db_path=settings.extraction_cache_path,
+            max_bytes=settings.extraction_cache_max_bytes,
+            codec=settings.document_compression,
+        )
+
+    @staticmethod
+    def make_key(sha256: str, extractor: str) -> str:
+        return hashlib.sha256(f"{sha256}:{extractor}".encode("utf-8")).hexdigest()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT codec, body FROM extraction_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE extraction_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return decompress(row[0], row[1])
+
+    def _set(self, key: str, text: str) -> None:
+        codec, body = compress(text, self.codec)
+        with self._lock:
+            old = self._db.execute("SELECT size FROM extraction_cache WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO extraction_cache (key, codec, body, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, codec, body, len(body), time.time()),
+            )
+            self._bytes += len(body) - (old[0] if old else 0)
+            while self._bytes > self.max_bytes:
+                victims = self._db.execute(
+                    "SELECT key, size FROM extraction_cache ORDER BY last_used LIMIT 64"
+                ).fetchall()
+                if not victims:
+                    break
+                for victim, size in victims:
+                    self._db.execute("DELETE FROM extraction_cache WHERE key = ?", (victim,))
+                    self._bytes -= size
+                    self.evictions += 1
+                    if self._bytes <= self.max_bytes:
+                        break
+            self._db.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        text = await asyncio.to_thread(self._get, key)
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return text
+
+    async def set(self, key: str, text: str) -> None:
+        self.writes += 1
+        await asyncio.to_thread(self._set, key, text)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,247 @@
+import importlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PDF_NOT_EXTRACTED = "PDF content could not be extracted. Please ensure the PDF contains selectable text."
+PDF_FAILED = "PDF processing failed. Please ensure the PDF is not corrupted and contains selectable text."
+
+# (first page, stop page) of a PDF, zero-based and half-open
+PageRange = Tuple[int, int]
+
+
+class ExtractionError(Exception):
+    """Raised when a file yields no usable text"""
+
+
+class Extractor:
+    """A text extraction backend for one or more file formats.
+
+    Subclasses name the modules they need in ``requires``; the registry
+    skips backends whose modules are not installed. ``version`` must change
+    whenever the extracted text could change, since it keys cached results.
+    """
+
+    name = "base"
+    version = "1"
+    extensions: Tuple[str, ...] = ()
+    requires: Tuple[str, ...] = ()
+
+    def available(self) -> bool:
+        for module in self.requires:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                return False
+        return True
+
+    def page_count(self, path: str) -> Optional[int]:
+        """Number of pages for paged formats, None otherwise"""
+        return None
+
+    def extract(self, path: str, pages: Optional[PageRange] = None) -> str:
+        raise NotImplementedError
+
+
+class PyMuPDFExtractor(Extractor):
+    name = "pymupdf"
+    extensions = (".pdf",)
+    requires = ("pymupdf",)
+
+    def page_count(self, path: str) -> int:
+        import pymupdf
+
+        with pymupdf.open(path) as doc:
+            return doc.page_count
+
+    def extract(self, path: str, pages: Optional[PageRange] = None) -> str:
+        import pymupdf
+
+        with pymupdf.open(path) as doc:
+            start, stop = pages or (0, doc.page_count)
+            return "\n".join(doc[i].get_text() for i in range(start, min(stop, doc.page_count)))
+
+
+class PdfiumExtractor(Extractor):
+    name = "pypdfium2"
+    extensions = (".pdf",)
+    requires = ("pypdfium2",)
+
+    def page_count(self, path: str) -> int:
+        import pypdfium2
+
+        doc = pypdfium2.PdfDocument(path)
+        try:
+            return len(doc)
+        finally:
+            doc.close()
+
+    def extract(self, path: str, pages: Optional[PageRange] = None) -> str:
+        import pypdfium2
+
+        doc = pypdfium2.PdfDocument(path)
+        try:
+            start, stop = pages or (0, len(doc))
+            texts = []
+            for i in range(start, min(stop, len(doc))):
+                page = doc[i]
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+            return "\n".join(texts)
+        finally:
+            doc.close()
+
+
+class PyPDF2Extractor(Extractor):
+    name = "pypdf2"
+    extensions = (".pdf",)
+    requires = ("PyPDF2",)
+
+    def page_count(self, path: str) -> int:
+        import PyPDF2
+
+        return len(PyPDF2.PdfReader(path).pages)
+
+    def extract(self, path: str, pages: Optional[PageRange] = None) -> str:
+        import PyPDF2
+
+        reader = PyPDF2.PdfReader(path)
+        start, stop = pages or (0, len(reader.pages))
+        return "\n".join(reader.pages[i].extract_text() or "" for i in range(start, min(stop, len(reader.pages))))
+
+
+class DocxExtractor(Extractor):
+    """Body paragraphs and tables in document order, then headers, footers and text boxes"""
+
+    name = "python-docx"
+    version = "2"
+    extensions = (".docx", ".doc")
+    requires = ("docx",)
+
+    def extract(self, path: str, pages: Optional[PageRange] = None) -> str:
+        from docx import Document
+        from docx.oxml.ns import qn
+
+        doc = Document(path)
+        lines: List[str] = []
+
+        def add_table(table) -> None:
+            for row in table.rows:
+                cells = []
+                for cell in row.cells:
+                    # Merged cells repeat the same cell object across the row
+                    text = cell.text.strip()
+                    if text and (not cells or cells[-1] != text):
+                        cells.append(text)
+                    for nested in cell.tables:
+                        add_table(nested)
+                if cells:
+                    lines.append(" | ".join(cells))
+
+        paragraph_tag, table_tag = qn("w:p"), qn("w:tbl")
+        paragraphs = {p._p: p for p in doc.paragraphs}
+        tables = {t._tbl: t for t in doc.tables}
+        for child in doc.element.body.iterchildren():
+            if child.tag == paragraph_tag and child in paragraphs:
+                lines.append(paragraphs[child].text)
+            elif child.tag == table_tag and child in tables:
+                add_table(tables[child])
+
+        seen_parts = set()
+        for section in doc.sections:
+            for part in (section.header, section.footer):
+                if part.is_linked_to_previous or id(part.part) in seen_parts:
+                    continue
+                seen_parts.add(id(part.part))
+                lines.extend(p.text for p in part.paragraphs)
+                for table in part.tables:
+                    add_table(table)
+
+        # Text boxes (shapes) hold their own paragraphs outside the body flow
+        for box in doc.element.body.iter(qn("w:txbxContent")):
+            for p in box.iter(paragraph_tag):
+                lines.append("".join(t.text or "" for t in p.iter(qn("w:t"))))
+
+        return "\n".join(line for line in lines if line.strip())
+
+
+class TxtExtractor(Extractor):
+    name = "text"
+    extensions = (".txt",)
+
+    def extract(self, path: str, pages: Optional[PageRange] = None) -> str:
+        with open(path, "rb") as f:
+            data = f.read()
+        try:
+            return data.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise ExtractionError(f"Error reading TXT file: {str(e)}")
+
+
+class ExtractorRegistry:
+    """Ordered extraction backends per file extension, fastest first"""
+
+    def __init__(self):
+        self._backends: Dict[str, List[Extractor]] = {}
+        self._available: Dict[str, bool] = {}
+
+    def register(self, extractor: Extractor, priority: Optional[int] = None) -> None:
+        for extension in extractor.extensions:
+            backends = self._backends.setdefault(extension, [])
+            backends.insert(len(backends) if priority is None else priority, extractor)
+
+    def backends(self, extension: str) -> List[Extractor]:
+        """Installed backends for an extension, honouring the configured order"""
+        result = []
+        for extractor in self._backends.get(extension, []):
+            if extractor.name not in self._available:
+                self._available[extractor.name] = extractor.available()
+            if self._available[extractor.name]:
+                result.append(extractor)
+        preferred = [name.strip() for name in settings.pdf_extractors.split(",") if name.strip()]
+        if extension == ".pdf" and preferred:
+            result.sort(key=lambda e: preferred.index(e.name) if e.name in preferred else len(preferred))
+        return result
+
+    def fingerprint(self, extension: str) -> str:
+        """Backends and versions that would handle an extension, for cache keys"""
+        return ",".join(f"{e.name}@{e.version}" for e in self.backends(extension))
+
+    @property
+    def extensions(self) -> List[str]:
+        return list(self._backends)
+
+    def page_count(self, path: str, extension: str) -> Optional[int]:
+        for extractor in self.backends(extension):
+            try:
+                return extractor.page_count(path)
+            except Exception:
+                continue
+        return None
+
+    def extract(self, path: str, extension: str, pages: Optional[PageRange] = None) -> Tuple[str, str]:
+        """Text from the first backend that succeeds, and that backend's name@version"""
+        errors = []
+        for extractor in self.backends(extension):
+            try:
+                return extractor.extract(path, pages), f"{extractor.name}@{extractor.version}"
+            except ExtractionError:
+                raise
+            except Exception as e:
+                logger.warning("%s failed on %s: %s", extractor.name, path, e)
+                errors.append(e)
+        if extension == ".pdf":
+            raise ExtractionError(PDF_FAILED)
+        if extension in (".docx", ".doc"):
+            raise ExtractionError(f"Error reading DOCX file: {str(errors[-1]) if errors else 'no backend installed'}")
+        raise ExtractionError("Unsupported file type")
+
+
+registry = ExtractorRegistry()
+for _extractor in (PyMuPDFExtractor(), PdfiumExtractor(), PyPDF2Extractor(), DocxExtractor(), TxtExtractor()):
+    registry.register(_extractor)
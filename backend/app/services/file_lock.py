@@ -0,0 +1,24 @@
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl  # Unix only
+except ImportError:
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: str, shared: bool = False) -> Iterator[None]:
+    """Hold an advisory flock(2) lock on ``path`` for the duration of the block.
+
+    Every call opens its own descriptor, so the lock excludes other threads
+    of this process as well as other processes. Without fcntl (Windows) it
+    does nothing, and callers must be the only writer.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        # Closing the file releases the lock
+        yield
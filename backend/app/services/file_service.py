@@ -1,154 +1,466 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import lzma
+import multiprocessing
 import os
-import PyPDF2
-from docx import Document
-from typing import Optional
+import shutil
+import signal
+import tempfile
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import aiofiles
 from fastapi import UploadFile, HTTPException
 from app.core.config import settings
+from app.core.metrics import EXTRACTION_DURATION
+from app.services.extraction_cache import ExtractionCache
+from app.services.extractors import PDF_NOT_EXTRACTED, ExtractionError, PageRange, registry
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionTimeout(BaseException):
+    """Raised by SIGALRM; a BaseException so parsers' broad excepts don't swallow it"""
+
+
+def _limit_worker(memory_limit: int) -> None:
+    """Process pool initializer: cap the address space of parser workers"""
+    if resource is not None and memory_limit > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _on_alarm(signum, frame):
+    raise ExtractionTimeout()
+
+
+def _with_timeout(timeout: float, func, *args):
+    # SIGALRM interrupts pure-Python parsing that runs past the timeout
+    use_alarm = timeout > 0 and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args)
+    except ExtractionTimeout:
+        raise ExtractionError(f"Text extraction timed out after {settings.extract_timeout}s")
+    except MemoryError:
+        raise ExtractionError("File needs too much memory to process")
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def parse_file(path: str, extension: str, pages: Optional[PageRange] = None, timeout: float = 0) -> str:
+    """Extract text (optionally a page range) from a file on disk; runs in a parser worker process"""
+    text, _ = _with_timeout(timeout, registry.extract, path, extension, pages)
+    return text
+
+
+def count_pages(path: str, extension: str, timeout: float = 0) -> Optional[int]:
+    return _with_timeout(timeout, registry.page_count, path, extension)
+
+
+def _ready() -> None:
+    """No-op run on a new parser worker to start it"""
+
+
+def _exit_codes(processes: list) -> list:
+    """Exit codes of pool workers, giving a broken pool a moment to reap them"""
+    for process in processes:
+        process.join(timeout=1.0)
+    return [process.exitcode for process in processes if process.exitcode is not None]
+
+
+class _Deadline:
+    """One time budget shared by all the parser tasks of a file, started by the first to run"""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires: Optional[float] = None
+
+    def remaining(self, now: float) -> float:
+        if self.expires is None:
+            self.expires = now + self.timeout
+        return self.expires - now
+
 
 class FileService:
+    # One single-worker pool per parser process, so a worker that hangs or
+    # dies is replaced without failing the files the others are parsing
+    _lanes: List[Optional[ProcessPoolExecutor]] = []
+    _idle: Optional["asyncio.LifoQueue[int]"] = None
+    _idle_loop: Optional[asyncio.AbstractEventLoop] = None
+    _cache: Optional[ExtractionCache] = None
+
     @staticmethod
     async def validate_file(file: UploadFile) -> bool:
         """Validate uploaded file"""
-        print(f"Validating file: {file.filename}, size: {file.size}")
-        
+        logger.debug("Validating file", extra={"upload": file.filename, "size": file.size})
+
         if not file:
             raise HTTPException(status_code=400, detail="No file uploaded")
-        
-        # Check file size
+
+        # Reject early when the client sent a size; save_upload enforces it either way
         if file.size and file.size > settings.max_file_size:
             raise HTTPException(
-                status_code=400, 
+                status_code=400,
                 detail=f"File size exceeds maximum allowed size of {settings.max_file_size} bytes"
             )
-        
+
         # Check file extension
         file_extension = os.path.splitext(file.filename)[1].lower()
-        print(f"File extension: {file_extension}, allowed types: {settings.allowed_file_types}")
-        
+
         if file_extension not in settings.allowed_file_types:
             raise HTTPException(
                 status_code=400,
                 detail=f"File type not allowed. Allowed types: {', '.join(settings.allowed_file_types)}"
             )
-        
+
         return True
-    
+
     @staticmethod
-    async def extract_text_from_pdf(file: UploadFile) -> str:
-        """Extract text from PDF file"""
+    async def save_upload(file: UploadFile, max_size: Optional[int] = None) -> Tuple[str, str]:
+        """Stream an upload to a temporary file in chunks, enforcing max_file_size.
+        
+        Returns the file path and the SHA-256 of its content.
+        """
+        max_size = max_size or settings.max_file_size
+        suffix = os.path.splitext(file.filename)[1].lower()
+        fd, path = tempfile.mkstemp(suffix=suffix, prefix="upload_", dir=settings.upload_tmp_dir or None)
+        os.close(fd)
+        digest = hashlib.sha256()
+        size = 0
         try:
-            print("Extracting text from PDF file")
-            
-            # Read the file content first
-            content = await file.read()
-            
-            # Try to create a BytesIO object for PyPDF2
-            import io
-            pdf_stream = io.BytesIO(content)
-            
+            async with aiofiles.open(path, "wb") as out:
+                while True:
+                    chunk = await file.read(settings.upload_chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_size:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"File size exceeds maximum allowed size of {max_size} bytes"
+                        )
+                    digest.update(chunk)
+                    await out.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path, digest.hexdigest()
+
+    @classmethod
+    def _get_pool(cls, lane: int) -> ProcessPoolExecutor:
+        if len(cls._lanes) < settings.extract_workers:
+            cls._lanes.extend([None] * (settings.extract_workers - len(cls._lanes)))
+        if cls._lanes[lane] is None:
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            cls._lanes[lane] = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_limit_worker,
+                initargs=(settings.extract_memory_limit,),
+            )
+        return cls._lanes[lane]
+
+    @classmethod
+    def _get_idle(cls) -> "asyncio.LifoQueue[int]":
+        # A task takes a lane for as long as it runs, so its timeout starts
+        # when it is parsed rather than when it is queued behind other files.
+        # Last in, first out: the most recently used worker is already started
+        loop = asyncio.get_running_loop()
+        if cls._idle is None or cls._idle_loop is not loop:
+            cls._idle = asyncio.LifoQueue()
+            for lane in reversed(range(settings.extract_workers)):
+                cls._idle.put_nowait(lane)
+            cls._idle_loop = loop
+        return cls._idle
+
+    @classmethod
+    def _reset_pool(cls, lane: int) -> None:
+        """Kill one lane's worker, e.g. one stuck in native code past its timeout"""
+        pool, cls._lanes[lane] = cls._lanes[lane], None
+        if pool is None:
+            return
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        for lane, pool in enumerate(cls._lanes):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+                cls._lanes[lane] = None
+        if cls._cache is not None:
+            cls._cache.close()
+            cls._cache = None
+
+    @classmethod
+    def cache(cls) -> Optional[ExtractionCache]:
+        if cls._cache is None and settings.extraction_cache_enabled and settings.extraction_cache_path:
+            cls._cache = ExtractionCache.from_settings()
+        return cls._cache
+
+    @classmethod
+    async def _run(cls, deadline: _Deadline, func, *args, **kwargs):
+        """Run a parser function in a worker process within the file's deadline and memory cap"""
+        loop = asyncio.get_running_loop()
+        timed_out = HTTPException(status_code=400, detail=f"Text extraction timed out after {deadline.timeout}s")
+        idle = cls._get_idle()
+        lane = await idle.get()
+        try:
+            started = lane < len(cls._lanes) and cls._lanes[lane] is not None
+            pool = cls._get_pool(lane)
+            processes = []
             try:
-                pdf_reader = PyPDF2.PdfReader(pdf_stream)
-                text = ""
-                for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                
-                if not text.strip():
-                    # If no text extracted, try alternative method
-                    print("No text extracted, trying alternative method")
-                    return "PDF content could not be extracted. Please ensure the PDF contains selectable text."
-                
-                print(f"Extracted {len(text)} characters from PDF")
-                return text.strip()
-                
-            except Exception as pdf_error:
-                print(f"PyPDF2 error: {pdf_error}")
-                # Try alternative PDF processing
-                try:
-                    import fitz  # PyMuPDF
-                    pdf_stream.seek(0)  # Reset stream position
-                    doc = fitz.open(stream=pdf_stream, filetype="pdf")
-                    text = ""
-                    for page in doc:
-                        text += page.get_text() + "\n"
-                    doc.close()
-                    
-                    if text.strip():
-                        print(f"Extracted {len(text)} characters using PyMuPDF")
-                        return text.strip()
-                    else:
-                        return "PDF content could not be extracted. Please ensure the PDF contains selectable text."
-                        
-                except ImportError:
-                    print("PyMuPDF not available")
-                    return "PDF processing failed. Please ensure the PDF is not corrupted and contains selectable text."
-                except Exception as alt_error:
-                    print(f"Alternative PDF processing failed: {alt_error}")
-                    return "PDF content could not be extracted. Please ensure the PDF contains selectable text."
-                    
-        except Exception as e:
-            print(f"Error extracting text from PDF: {e}")
-            return "Error processing PDF file. Please ensure the file is not corrupted."
-    
+                if not started:
+                    # Start the worker first, so process start-up is not billed to the file
+                    await loop.run_in_executor(pool, _ready)
+                remaining = deadline.remaining(loop.time())
+                if remaining <= 0:
+                    raise timed_out
+                future = loop.run_in_executor(pool, functools.partial(func, *args, timeout=remaining, **kwargs))
+                # The pool forgets its process once it breaks, so keep it to report how it died
+                processes = list(getattr(pool, "_processes", {}).values())
+                # The worker enforces the timeout itself; the grace period
+                # only catches parsers stuck in native code
+                return await asyncio.wait_for(future, timeout=remaining + 5.0)
+            except ExtractionError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except asyncio.TimeoutError:
+                cls._reset_pool(lane)
+                raise timed_out
+            except BrokenProcessPool as e:
+                # The worker died: out of memory, killed by a signal, or a crash in native code
+                exit_codes = await asyncio.to_thread(_exit_codes, processes)
+                logger.warning(
+                    "Parser worker died",
+                    extra={"error": str(e), "exit_codes": exit_codes, "memory_limit": settings.extract_memory_limit}
+                )
+                cls._reset_pool(lane)
+                raise HTTPException(status_code=400, detail="File could not be processed: the parser process stopped unexpectedly")
+        finally:
+            idle.put_nowait(lane)
+
+    @classmethod
+    async def extract_text_from_path(cls, path: str, extension: str) -> str:
+        """Extract text from a saved file in the parser pool"""
+        with EXTRACTION_DURATION.time(extension=extension):
+            return await cls._extract_text_from_path(path, extension)
+
+    @classmethod
+    async def _extract_text_from_path(cls, path: str, extension: str) -> str:
+        # Page counting and every page range share the file's one timeout
+        deadline = _Deadline(settings.extract_timeout)
+        chunk = settings.extract_page_chunk
+        page_count = None
+        if chunk and extension == ".pdf" and os.path.getsize(path) >= settings.extract_parallel_min_bytes:
+            page_count = await cls._run(deadline, count_pages, path, extension)
+
+        if page_count and page_count > chunk:
+            # Long documents are split into page ranges parsed by several workers
+            parts = await asyncio.gather(*[
+                cls._run(deadline, parse_file, path, extension, pages=(start, min(start + chunk, page_count)))
+                for start in range(0, page_count, chunk)
+            ])
+            text = "\n".join(parts)
+        else:
+            text = await cls._run(deadline, parse_file, path, extension)
+
+        text = text.strip()
+        if not text and extension == ".pdf":
+            raise HTTPException(status_code=400, detail=PDF_NOT_EXTRACTED)
+        return text
+
+    @classmethod
+    async def extract_text(cls, path: str, extension: str, sha256: str) -> str:
+        """Extract text from a saved file, reusing the text of identical earlier uploads"""
+        cache = cls.cache()
+        if cache is None:
+            return await cls.extract_text_from_path(path, extension)
+        key = cache.make_key(sha256, registry.fingerprint(extension))
+        text = await cache.get(key)
+        if text is None:
+            text = await cls.extract_text_from_path(path, extension)
+            await cache.set(key, text)
+        return text
+
     @staticmethod
-    async def extract_text_from_docx(file: UploadFile) -> str:
-        """Extract text from DOCX file"""
-        try:
-            print("Extracting text from DOCX file")
-            doc = Document(file.file)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            print(f"Extracted {len(text)} characters from DOCX")
-            return text.strip()
-        except Exception as e:
-            print(f"Error extracting text from DOCX: {e}")
+    async def extract_text_from_file(file: UploadFile) -> str:
+        """Extract text from uploaded file based on file type"""
+
+        await FileService.validate_file(file)
+        file_extension = os.path.splitext(file.filename)[1].lower()
+        if file_extension not in registry.extensions:
             raise HTTPException(
                 status_code=400,
-                detail=f"Error reading DOCX file: {str(e)}"
+                detail="Unsupported file type"
             )
-    
-    @staticmethod
-    async def extract_text_from_txt(file: UploadFile) -> str:
-        """Extract text from TXT file"""
+
+        path, digest = await FileService.save_upload(file)
         try:
-            print("Extracting text from TXT file")
-            content = await file.read()
-            text = content.decode('utf-8')
-            print(f"Extracted {len(text)} characters from TXT")
-            return text.strip()
-        except Exception as e:
-            print(f"Error extracting text from TXT: {e}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"Error reading TXT file: {str(e)}"
-            )
-    
+            text = await FileService.extract_text(path, file_extension, digest)
+        finally:
+            os.remove(path)
+        logger.debug("Extracted text", extra={"upload": file.filename, "chars": len(text)})
+        return text
+
     @staticmethod
-    async def extract_text_from_file(file: UploadFile) -> str:
-        """Extract text from uploaded file based on file type"""
-        print(f"Processing file: {file.filename}")
+    def _unpack_zip(zip_path: str, work_dir: str, max_files: int) -> List[Dict[str, Any]]:
+        """Copy archive members to work_dir, returning one entry per file member.
         
+        Members past ``max_files`` or ``bulk_max_unpacked_size`` in total, and
+        members that cannot be read, get an error. Sizes are enforced on the
+        decompressed bytes, not the sizes the archive claims, and members
+        never get their archive paths on disk.
+        """
+        entries = []
+        unpacked = 0
+        with zipfile.ZipFile(zip_path) as archive:
+            members = [
+                info for info in archive.infolist()
+                if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+            ]
+            for n, info in enumerate(members):
+                entry = {"filename": info.filename}
+                entries.append(entry)
+                extension = os.path.splitext(info.filename)[1].lower()
+                if n >= max_files:
+                    entry["error"] = f"Upload has more than {settings.bulk_max_files} files"
+                    continue
+                if extension not in registry.extensions or extension not in settings.allowed_file_types:
+                    entry["error"] = "File type not allowed"
+                    continue
+                if info.file_size > settings.max_file_size:
+                    entry["error"] = f"File size exceeds maximum allowed size of {settings.max_file_size} bytes"
+                    continue
+                budget = settings.bulk_max_unpacked_size - unpacked
+                too_large = f"Archive expands to more than {settings.bulk_max_unpacked_size} bytes"
+                if info.file_size > budget:
+                    entry["error"] = too_large
+                    continue
+                limit = min(settings.max_file_size, budget)
+                path = os.path.join(work_dir, f"member_{n}{extension}")
+                digest = hashlib.sha256()
+                size = 0
+                try:
+                    with archive.open(info) as source, open(path, "wb") as out:
+                        while True:
+                            chunk = source.read(settings.upload_chunk_size)
+                            if not chunk:
+                                break
+                            size += len(chunk)
+                            if size > limit:
+                                break
+                            digest.update(chunk)
+                            out.write(chunk)
+                except (RuntimeError, NotImplementedError, EOFError, OSError, zipfile.BadZipFile,
+                        zlib.error, lzma.LZMAError) as e:
+                    # Encrypted member, unsupported compression method or corrupt data
+                    if os.path.exists(path):
+                        os.remove(path)
+                    entry["error"] = f"Could not unpack file: {str(e)}"
+                    continue
+                if size > limit:
+                    os.remove(path)
+                    if limit < settings.max_file_size:
+                        entry["error"] = too_large
+                    else:
+                        entry["error"] = f"File size exceeds maximum allowed size of {settings.max_file_size} bytes"
+                    continue
+                unpacked += size
+                entry.update(path=path, sha256=digest.hexdigest())
+        return entries
+
+    @classmethod
+    async def ingest(cls, uploads: List[Tuple[str, str, str]]) -> AsyncIterator[Dict[str, Any]]:
+        """Extract text from many saved uploads, yielding one result per file.
+        
+        ``uploads`` holds (filename, path, sha256) triples from ``save_upload``;
+        zip archives are expanded. Files are parsed in parallel by the worker
+        pool and yielded as they finish; a file whose content was already seen
+        is reported as a duplicate without being parsed again. At most
+        ``bulk_max_files`` files are parsed per call, counting zip members
+        across all archives. The saved files are removed once done.
+        """
+        work_dir = tempfile.mkdtemp(prefix="ingest_", dir=settings.upload_tmp_dir or None)
+        tasks: List["asyncio.Future[Dict[str, Any]]"] = []
         try:
-            await FileService.validate_file(file)
-            
-            file_extension = os.path.splitext(file.filename)[1].lower()
-            
-            if file_extension == ".pdf":
-                result = await FileService.extract_text_from_pdf(file)
-                if result.startswith("Error") or result.startswith("PDF content could not be extracted"):
-                    raise HTTPException(status_code=400, detail=result)
-                return result
-            elif file_extension in [".docx", ".doc"]:
-                return await FileService.extract_text_from_docx(file)
-            elif file_extension == ".txt":
-                return await FileService.extract_text_from_txt(file)
-            else:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Unsupported file type"
-                )
-        except Exception as e:
-            print(f"Error in extract_text_from_file: {e}")
-            raise e
+            entries: List[Dict[str, Any]] = []
+            for filename, path, digest in uploads:
+                remaining = max(0, settings.bulk_max_files - len(entries))
+                if os.path.splitext(filename)[1].lower() != ".zip":
+                    if remaining:
+                        entries.append({"filename": filename, "path": path, "sha256": digest})
+                    else:
+                        entries.append({"filename": filename, "error": f"Upload has more than {settings.bulk_max_files} files"})
+                    continue
+                # A directory per archive, as member file names are only unique within one
+                archive_dir = tempfile.mkdtemp(dir=work_dir)
+                try:
+                    members = await asyncio.to_thread(cls._unpack_zip, path, archive_dir, remaining)
+                except zipfile.BadZipFile as e:
+                    entries.append({"filename": filename, "error": f"Invalid zip archive: {str(e)}"})
+                    continue
+                for member in members:
+                    member["filename"] = f"{filename}/{member['filename']}"
+                entries.extend(members)
+
+            async def parse(entry: Dict[str, Any]) -> Dict[str, Any]:
+                extension = os.path.splitext(entry["filename"])[1].lower()
+                try:
+                    text = await cls.extract_text(entry["path"], extension, entry["sha256"])
+                except HTTPException as e:
+                    return {"filename": entry["filename"], "status": "error", "sha256": entry["sha256"], "error": e.detail}
+                except Exception:
+                    # One bad file must not end the stream for the rest of the upload
+                    logger.exception("Text extraction failed", extra={"upload": entry["filename"]})
+                    return {"filename": entry["filename"], "status": "error", "sha256": entry["sha256"],
+                            "error": "Text extraction failed"}
+                return {
+                    "filename": entry["filename"],
+                    "status": "ok",
+                    "sha256": entry["sha256"],
+                    "characters": len(text),
+                    "resume_text": text,
+                }
+
+            seen: Dict[str, str] = {}
+            for entry in entries:
+                extension = os.path.splitext(entry["filename"])[1].lower()
+                if "error" not in entry and extension not in registry.extensions:
+                    entry["error"] = "File type not allowed"
+                if "error" in entry:
+                    yield {"filename": entry["filename"], "status": "error", "error": entry["error"]}
+                elif entry["sha256"] in seen:
+                    yield {
+                        "filename": entry["filename"],
+                        "status": "duplicate",
+                        "sha256": entry["sha256"],
+                        "duplicate_of": seen[entry["sha256"]],
+                    }
+                else:
+                    seen[entry["sha256"]] = entry["filename"]
+                    tasks.append(asyncio.ensure_future(parse(entry)))
+
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # Also reached when the client disconnects mid-stream
+            for task in tasks:
+                task.cancel()
+            for _, path, _ in uploads:
+                if os.path.exists(path):
+                    os.remove(path)
+            shutil.rmtree(work_dir, ignore_errors=True)
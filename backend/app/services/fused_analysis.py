@@ -0,0 +1,82 @@
+import json
+from typing import Any, Dict, List, Union
+
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+# Items may come back as plain strings or as objects with extra detail
+Items = List[Union[str, Dict[str, Any]]]
+
+
+class SkillsMatch(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    perfect_match: Items
+    partial_match: Items = []
+    missing_skills: Items
+    bonus_skills: Items = []
+    confidence_level: Any = None
+
+
+class ExperienceMatch(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    years_experience: Any = None
+    role_level: Any = None
+    overall_assessment: Any
+
+
+class InterviewInsights(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    discussion_topics: Items
+    candidate_strengths: Items = []
+    areas_for_improvement: Items = []
+    technical_questions: Items
+    behavioral_questions: Items = []
+    cultural_fit: Any = None
+
+
+# Response key, analysis stage it stands in for, and its schema
+SECTIONS = [
+    ("skills_match", "skills", SkillsMatch),
+    ("experience_match", "experience", ExperienceMatch),
+    ("interview_insights", "insights", InterviewInsights),
+]
+
+SYSTEM_PROMPT = """
+You are an expert recruiter. Compare the resume with the job description and return ONE JSON object with exactly these keys:
+
+"resume_summary": a professional 2-3 sentence summary of the resume (key strengths, experience level, most relevant skills)
+"skills_match": {"perfect_match": [...], "partial_match": [...], "missing_skills": [...], "bonus_skills": [...], "confidence_level": "High|Medium|Low"}
+"experience_match": {"years_experience": "...", "role_level": "...", "industry_relevance": "...", "project_complexity": "...", "leadership_experience": "...", "overall_assessment": "..."}
+"interview_insights": {"discussion_topics": [...], "candidate_strengths": [...], "areas_for_improvement": [...], "technical_questions": [...], "behavioral_questions": [...], "cultural_fit": "..."}
+
+Return only the JSON object, without commentary or markdown.
+"""
+
+
+def _json_object(response: str) -> Dict[str, Any]:
+    """The outermost JSON object in a reply, tolerating markdown fences and chatter"""
+    start, end = response.find("{"), response.rfind("}")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        value = json.loads(response[start:end + 1])
+    except ValueError:
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def parse_fused_response(response: str) -> Dict[str, Any]:
+    """Valid sections of a fused reply keyed by stage name; invalid ones are left out"""
+    data = _json_object(response)
+    sections: Dict[str, Any] = {}
+    summary = data.get("resume_summary")
+    if isinstance(summary, str) and summary.strip():
+        sections["summary"] = summary.strip()
+    for key, stage, schema in SECTIONS:
+        try:
+            sections[stage] = schema.model_validate(data.get(key)).model_dump()
+        except ValidationError:
+            continue
+    return sections
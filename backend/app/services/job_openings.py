@@ -0,0 +1,196 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import Document, JobOpening
+from app.services.document_store import content_hash, intern_documents
+from app.services.prompt_builder import split_sections
+from app.services.skill_taxonomy import NOT_SKILLS, extract
+
+# Bump whenever the stored requirements shape or parsing changes
+REQUIREMENTS_VERSION = "2"
+
+LEVELS = [
+    ("intern", ("intern", "internship")),
+    ("junior", ("junior", "entry level", "entry-level", "graduate")),
+    ("lead", ("lead", "principal", "staff", "head of", "architect")),
+    ("senior", ("senior", "sr.", "sr ")),
+    ("mid", ("mid-level", "mid level", "intermediate")),
+]
+YEARS = re.compile(r"(\d{1,2})\s*\+?\s*(?:-|to)?\s*(?:\d{1,2}\s*)?\+?\s*years?", re.IGNORECASE)
+# Capitalised or symbol-bearing terms such as React.js, PostgreSQL, C++, CI/CD
+TERM = re.compile(r"(?<![\w.+#/])(?:[A-Z][\w.+#/-]*[\w+#]|[A-Z]|\.NET|[a-z]+\.js)(?![\w+#])")
+
+
+def _flatten(value: Any) -> List[str]:
+    """Strings from an LLM list, possibly nested in dicts or lists"""
+    if isinstance(value, str):
+        return [value.strip()] if value.strip() else []
+    if isinstance(value, dict):
+        # {"skill": "Python", "level": ...} items name the skill; otherwise walk the values
+        for key in ("skill", "name"):
+            if isinstance(value.get(key), str):
+                return _flatten(value[key])
+        return [item for nested in value.values() for item in _flatten(nested)]
+    if isinstance(value, list):
+        return [item for nested in value for item in _flatten(nested)]
+    return []
+
+
+def _unique(items: Iterable[str]) -> List[str]:
+    seen = set()
+    result = []
+    for item in items:
+        key = item.lower()
+        if key not in seen:
+            seen.add(key)
+            result.append(item)
+    return result
+
+
+def _terms(lines: Iterable[str]) -> List[str]:
+    """Skill-like terms from requirement bullets"""
+    terms = []
+    for line in lines:
+        for match in TERM.findall(line):
+            # "JavaScript/TypeScript" names two skills, "CI/CD" one
+            parts = match.split("/")
+            for term in (parts if min(len(part) for part in parts) > 2 else [match]):
+                term = term.strip(".-")
+                if len(term) > 1 and term.lower() not in NOT_SKILLS:
+                    terms.append(term)
+    return _unique(terms)
+
+
+def _level(text: str) -> Optional[str]:
+    lowered = text.lower()
+    for level, markers in LEVELS:
+        if any(marker in lowered for marker in markers):
+            return level
+    return None
+
+
+def _min_years(text: str) -> Optional[int]:
+    years = [int(match) for match in YEARS.findall(text)]
+    return min(years) if years else None
+
+
+def parse_requirements_locally(job_description: str) -> Dict[str, Any]:
+    """Requirements from the JD's own sections, used when no LLM is available"""
+    sections = split_sections(job_description)
+    lines = {name: [] for name in ("header", "requirements", "preferred", "responsibilities")}
+    for name, _, body in sections:
+        if name in lines:
+            lines[name].extend(body)
+    header = " ".join(lines["header"][:2])
+    required_text = "\n".join(lines["requirements"]) or job_description
+    preferred = _terms(lines["preferred"])
+    if lines["requirements"]:
+        required = _terms(lines["requirements"])
+    else:
+        # No requirements heading: take the known skills named anywhere in the JD
+        asked = {skill.lower() for skill in preferred}
+        required = [skill for skill in extract(job_description) if skill.lower() not in asked]
+    return {
+        "required_skills": required,
+        "preferred_skills": preferred,
+        "min_years": _min_years(required_text),
+        "level": _level(header) or _level(required_text),
+        "responsibilities": lines["responsibilities"],
+        "source": "local",
+    }
+
+
+def normalize_requirements(parsed: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+    """Map an LLM requirements reply onto the stored shape, filling gaps locally"""
+    local = parse_requirements_locally(job_description)
+    if not parsed or "error" in parsed:
+        return local
+
+    used = set()
+
+    def pick(*keys: str) -> List[str]:
+        for key in keys:
+            for name, value in parsed.items():
+                if name.lower().replace(" ", "_") == key:
+                    items = _flatten(value)
+                    if items:
+                        used.add(name)
+                        return _unique(items)
+        return []
+
+    experience = " ".join(pick("experience_level", "required_experience", "experience", "years_of_experience"))
+    requirements = {
+        "required_skills": pick("required_skills", "skills", "technical_skills") or local["required_skills"],
+        "preferred_skills": pick("preferred_skills", "preferred_qualifications", "nice_to_have") or local["preferred_skills"],
+        "min_years": _min_years(experience) if _min_years(experience) is not None else local["min_years"],
+        "level": _level(experience) or local["level"],
+        "responsibilities": pick("key_responsibilities", "responsibilities") or local["responsibilities"],
+        "source": "llm",
+    }
+    # Keep whatever else the LLM extracted, such as domain knowledge
+    for key, value in parsed.items():
+        if key not in used:
+            requirements.setdefault(key, value)
+    return requirements
+
+
+def _title(job_description: str) -> Optional[str]:
+    """First line of the JD, which is usually the role title"""
+    for line in job_description.splitlines():
+        if line.strip():
+            return line.strip()[:255]
+    return None
+
+
+def has_skill_lists(requirements: Optional[Dict[str, Any]]) -> bool:
+    return bool(requirements and requirements.get("required_skills"))
+
+
+async def find_job_opening(db: AsyncSession, job_description: str) -> Optional[JobOpening]:
+    """The opening already parsed for this exact JD text, if any"""
+    return (await db.execute(
+        select(JobOpening)
+        .join(Document, Document.id == JobOpening.jd_document_id)
+        .where(Document.content_hash == content_hash(job_description))
+        .where(JobOpening.requirements_version == REQUIREMENTS_VERSION)
+    )).scalars().first()
+
+
+async def get_or_create_job_opening(db: AsyncSession, ai_service, job_description: str, title: Optional[str] = None) -> JobOpening:
+    """Parse a JD into requirements once per distinct text and version, and store it.
+
+    Commits so the parsed requirements are shared with concurrent requests.
+    The lookup's transaction is ended before the LLM call, so no pooled
+    connection is held while the JD is parsed.
+    """
+    opening = await find_job_opening(db, job_description)
+    await db.commit()
+    if opening is not None:
+        return opening
+
+    parsed = await ai_service.analyze_jd_requirements(job_description) if ai_service.client else {}
+    requirements = normalize_requirements(parsed, job_description)
+    (jd_document_id,) = await intern_documents(db, [job_description])
+    opening = (await db.execute(
+        select(JobOpening).where(JobOpening.jd_document_id == jd_document_id)
+    )).scalars().first()
+    if opening is None:
+        opening = JobOpening(jd_document_id=jd_document_id)
+        db.add(opening)
+    # Rows from an older parser version are re-parsed in place
+    opening.title = title or opening.title or _title(job_description)
+    opening.requirements = requirements
+    opening.requirements_version = REQUIREMENTS_VERSION
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request stored the same JD first
+        await db.rollback()
+        opening = await find_job_opening(db, job_description)
+        if opening is None:
+            raise
+    return opening
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_, select, update
+
+from app.core.config import settings
+from app.core.metrics import JOBS, JOBS_RUNNING
+from app.models.database import SessionLocal, Job
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between retries of a failing database operation, in seconds
+MAX_BACKOFF = 30.0
+
+# Runs a job payload and returns (analysis id, stage errors)
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Tuple[int, Optional[Dict[str, str]]]]]
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds the maximum number of waiting jobs"""
+
+
+class JobQueue:
+    """Persistent priority queue of analyses backed by the ``jobs`` table.
+
+    A bounded pool of worker tasks claims the highest-priority queued job
+    with a conditional UPDATE, so several worker processes can share one
+    database without running a job twice. A claimed job carries the claiming
+    process's id and a lease that is renewed while it runs; jobs whose lease
+    went stale (their process crashed or hung) are re-queued until they
+    exhaust their attempts. A clean stop hands running jobs back at once.
+    """
+
+    def __init__(
+        self,
+        handler: JobHandler,
+        workers: int = 2,
+        max_queued: int = 1000,
+        max_attempts: int = 3,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 60.0,
+    ):
+        self.handler = handler
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._next_reclaim = 0.0
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @classmethod
+    def from_settings(cls, handler: JobHandler) -> "JobQueue":
+        return cls(
+            handler,
+            workers=settings.job_workers,
+            max_queued=settings.job_queue_max,
+            max_attempts=settings.job_max_attempts,
+            poll_interval=settings.job_poll_interval,
+            lease_seconds=settings.job_lease_seconds,
+        )
+
+    async def submit(self, payload: Dict[str, Any], priority: int = 0) -> Job:
+        """Persist a new job, rejecting it if the queue is full"""
+        async with SessionLocal() as db:
+            queued = await db.scalar(select(func.count()).select_from(Job).where(Job.status == "queued"))
+            if queued >= self.max_queued:
+                raise QueueFullError(f"Job queue is full ({queued} jobs waiting)")
+            job = Job(id=uuid.uuid4().hex, status="queued", priority=priority, payload=payload)
+            db.add(job)
+            await db.commit()
+            await db.refresh(job)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        async with SessionLocal() as db:
+            return await db.get(Job, job_id)
+
+    def _lease(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    async def _requeue(self, condition) -> int:
+        """Put running jobs matching ``condition`` back in the queue, or fail them when out of attempts"""
+        released = {"worker_id": None, "lease_expires_at": None}
+        async with SessionLocal() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.status == "running", condition, Job.attempts >= self.max_attempts)
+                .values(status="failed", error="Exceeded maximum attempts", finished_at=datetime.utcnow(), **released)
+            )
+            requeued = (await db.execute(
+                update(Job).where(Job.status == "running", condition).values(status="queued", started_at=None, **released)
+            )).rowcount
+            await db.commit()
+        return requeued
+
+    async def _reclaim(self) -> None:
+        """Re-queue jobs whose process stopped renewing their lease"""
+        loop = asyncio.get_running_loop()
+        if loop.time() < self._next_reclaim:
+            return
+        # Rows claimed by versions without leases have none
+        stale = or_(Job.lease_expires_at.is_(None), Job.lease_expires_at < datetime.utcnow())
+        requeued = await self._requeue(stale)
+        self._next_reclaim = loop.time() + self.lease_seconds / 2
+        if requeued:
+            logger.info("Re-queued %d jobs with a stale lease", requeued)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        """Renew a running job's lease until cancelled"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with SessionLocal() as db:
+                    await db.execute(
+                        update(Job)
+                        .where(Job.id == job_id, Job.worker_id == self.worker_id, Job.status == "running")
+                        .values(lease_expires_at=self._lease())
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.warning("Could not renew lease of job %s: %s", job_id, e)
+
+    async def _retrying(self, what: str, func, *args: Any, **kwargs: Any) -> Any:
+        """Retry a database operation with backoff, so a locked database does not stop a worker"""
+        delay = self.poll_interval
+        while True:
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                logger.warning("Job queue %s failed, retrying in %.1fs: %s", what, delay, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_BACKOFF)
+
+    async def _claim(self) -> Optional[Job]:
+        async with SessionLocal() as db:
+            while True:
+                candidate = await db.scalar(
+                    select(Job.id)
+                    .where(Job.status == "queued")
+                    .order_by(Job.priority.desc(), Job.created_at)
+                    .limit(1)
+                )
+                if candidate is None:
+                    return None
+                # Only one worker wins the queued -> running transition
+                claimed = (await db.execute(
+                    update(Job)
+                    .where(Job.id == candidate, Job.status == "queued")
+                    .values(
+                        status="running", started_at=datetime.utcnow(), attempts=Job.attempts + 1,
+                        worker_id=self.worker_id, lease_expires_at=self._lease(),
+                    )
+                )).rowcount
+                await db.commit()
+                if claimed:
+                    return await db.get(Job, candidate)
+
+    async def _finish(self, job_id: str, **values: Any) -> None:
+        async with SessionLocal() as db:
+            # A job whose lease was taken over by another process is no longer ours to update
+            await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.worker_id == self.worker_id)
+                .values(finished_at=datetime.utcnow(), lease_expires_at=None, **values)
+            )
+            await db.commit()
+
+    async def _retry(self, job_id: str, error: str) -> None:
+        """Put a failed job back in the queue for another attempt"""
+        async with SessionLocal() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.worker_id == self.worker_id)
+                .values(status="queued", error=error, started_at=None, worker_id=None, lease_expires_at=None)
+            )
+            await db.commit()
+
+    async def _worker(self) -> None:
+        while True:
+            # At most every half lease, so busy workers still notice crashed peers
+            await self._retrying("reclaim", self._reclaim)
+            job = await self._retrying("claim", self._claim)
+            if job is None:
+                # Poll as well, to see jobs submitted by other processes
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heartbeat = asyncio.ensure_future(self._heartbeat(job.id))
+            try:
+                # Shutting down cancels the handler; stop() then hands the job back
+                with JOBS_RUNNING.track_inprogress():
+                    analysis_id, stage_errors = await self.handler(job.payload)
+            except Exception as e:
+                logger.warning("Job %s failed: %s", job.id, e, extra={"attempt": job.attempts})
+                if job.attempts >= self.max_attempts:
+                    JOBS.inc(status="failed")
+                    await self._retrying("finish", self._finish, job.id, status="failed", error=str(e))
+                else:
+                    JOBS.inc(status="retried")
+                    await self._retrying("retry", self._retry, job.id, str(e))
+            else:
+                JOBS.inc(status="succeeded")
+                await self._retrying(
+                    "finish", self._finish, job.id,
+                    status="succeeded", analysis_id=analysis_id, stage_errors=stage_errors, error=None,
+                )
+            finally:
+                heartbeat.cancel()
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        await self._retrying("reclaim", self._reclaim)
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            requeued = await self._requeue(Job.worker_id == self.worker_id)
+        except Exception as e:
+            logger.warning("Could not hand back running jobs, they are re-queued when their lease expires: %s", e)
+        else:
+            if requeued:
+                logger.info("Handed back %d running jobs", requeued)
@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+class LLMCache:
+    """Content-addressed cache for LLM completions.
+
+    Entries are keyed on a hash of (model, system prompt, user content,
+    temperature), so a prompt that only depends on the resume text (such as
+    the resume summary) is shared by every JD it is matched against. Lookups
+    go through an in-process LRU tier with a TTL, then a SQLite tier that
+    survives restarts; SQLite hits are promoted into memory.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 3600.0,
+        db_path: Optional[str] = None,
+        persistent_ttl: float = 7 * 24 * 3600.0,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persistent_ttl = persistent_ttl
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.writes = 0
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @classmethod
+    def from_settings(cls) -> "LLMCache":
+        return cls(
+            max_entries=settings.llm_cache_max_entries,
+            ttl=settings.llm_cache_ttl,
+            db_path=settings.llm_cache_path or None,
+            persistent_ttl=settings.llm_cache_persistent_ttl,
+        )
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], temperature: float) -> str:
+        """Hash the parts of a request that determine its completion"""
+        system = "\n".join(m["content"] for m in messages if m["role"] == "system")
+        user = "\n".join(m["content"] for m in messages if m["role"] != "system")
+        payload = json.dumps(
+            {"model": model, "system": system, "user": user, "temperature": temperature},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_set(self, key: str, value: str) -> None:
+        self._memory[key] = (time.time() + self.ttl, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _db_get(self, key: str) -> Optional[str]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] + self.persistent_ttl < time.time():
+            return None
+        return row[0]
+
+    def _db_set(self, key: str, value: str) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self._db.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self._memory_get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+        if self._db is not None:
+            value = await asyncio.to_thread(self._db_get, key)
+            if value is not None:
+                self.persistent_hits += 1
+                self._memory_set(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        self._memory_set(key, value)
+        self.writes += 1
+        if self._db is not None:
+            await asyncio.to_thread(self._db_set, key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.persistent_hits + self.misses
+        hits = self.memory_hits + self.persistent_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
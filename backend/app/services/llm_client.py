@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import random
+import time
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+import httpx
+from groq import (
+    AsyncGroq,
+    APIConnectionError,
+    APIStatusError,
+)
+
+from app.core.config import settings
+from app.core.metrics import LLM_DURATION, LLM_IN_FLIGHT, LLM_REQUESTS, LLM_RETRIES, LLM_TOKENS
+
+logger = logging.getLogger(__name__)
+
+
+def _record_usage(usage) -> None:
+    if usage is not None:
+        LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, kind="prompt")
+        LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, kind="completion")
+
+
+class LLMClient:
+    """Non-blocking chat-completions transport shared by a worker.
+
+    Wraps the async Groq client around a single pooled ``httpx.AsyncClient`` so
+    connections are reused across requests, caps the number of in-flight
+    upstream calls with a semaphore, and retries transient failures
+    (connection errors, timeouts, 429 and 5xx) with exponential backoff.
+    """
+
+    RETRYABLE_STATUS = {408, 409, 429}
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        timeout: float = 30.0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client: Optional[AsyncGroq] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set["asyncio.Future[None]"] = set()
+
+    @classmethod
+    def from_settings(cls) -> "LLMClient":
+        return cls(
+            api_key=settings.groq_api_key,
+            model=settings.groq_model,
+            base_url=settings.groq_base_url,
+            max_concurrency=settings.llm_max_concurrency,
+            max_retries=settings.max_retries,
+            timeout=settings.timeout,
+            backoff_base=settings.llm_backoff_base,
+            backoff_max=settings.llm_backoff_max,
+        )
+
+    def _ensure_client(self) -> AsyncGroq:
+        # Connection pools and semaphores belong to one event loop; rebuild
+        # them if we are called from a different loop (e.g. test clients)
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            if self._client is not None:
+                self._retire(self._client, self._loop)
+            http_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            # Retries are handled here so they share the concurrency limit
+            self._client = AsyncGroq(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=0,
+                timeout=self.timeout,
+                http_client=http_client,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client
+
+    def _retire(self, client: AsyncGroq, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Close a client left behind by another event loop, on that loop if it still runs"""
+        if loop is not None and loop.is_running():
+            closing = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.close(), loop))
+        else:
+            closing = asyncio.ensure_future(self._close_quietly(client))
+        self._closing.add(closing)
+        closing.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_quietly(client: AsyncGroq) -> None:
+        # Connections opened on a closed loop may fail to shut down cleanly;
+        # the pool is released either way
+        try:
+            await client.close()
+        except Exception as e:
+            logger.debug("Closing a client from a finished event loop failed: %s", e)
+
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, APIConnectionError):  # includes timeouts
+            return True
+        if isinstance(error, APIStatusError):
+            return error.status_code in self.RETRYABLE_STATUS or error.status_code >= 500
+        return False
+
+    def _backoff(self, attempt: int) -> float:
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> str:
+        """Send a chat-completions request and return the message content"""
+        client = self._ensure_client()
+        attempt = 0
+        started = time.perf_counter()
+        while True:
+            try:
+                async with self._semaphore:
+                    with LLM_IN_FLIGHT.track_inprogress():
+                        response = await client.chat.completions.create(
+                            model=self.model,
+                            messages=messages,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                        )
+                _record_usage(response.usage)
+                LLM_REQUESTS.inc(mode="chat", outcome="success")
+                LLM_DURATION.observe(time.perf_counter() - started, mode="chat")
+                return response.choices[0].message.content
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    LLM_REQUESTS.inc(mode="chat", outcome="error")
+                    LLM_DURATION.observe(time.perf_counter() - started, mode="chat")
+                    raise
+                delay = self._backoff(attempt)
+                attempt += 1
+                LLM_RETRIES.inc(mode="chat")
+                logger.warning("Groq call failed, retrying", extra={
+                    "error": str(e), "attempt": attempt, "max_retries": self.max_retries, "delay": round(delay, 2),
+                })
+                await asyncio.sleep(delay)
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+    ) -> AsyncIterator[str]:
+        """Yield the message content as it is generated.
+
+        Failures before the first token are retried like ``chat``; once
+        tokens have been yielded an error is raised to the caller.
+        """
+        client = self._ensure_client()
+        attempt = 0
+        began = time.perf_counter()
+        while True:
+            started = False
+            try:
+                async with self._semaphore:
+                    with LLM_IN_FLIGHT.track_inprogress():
+                        stream = await client.chat.completions.create(
+                            model=self.model,
+                            messages=messages,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            stream=True,
+                        )
+                        async for chunk in stream:
+                            # Groq reports usage on the last chunk
+                            _record_usage(getattr(getattr(chunk, "x_groq", None), "usage", None))
+                            if not chunk.choices:
+                                continue
+                            delta = chunk.choices[0].delta.content
+                            if delta:
+                                started = True
+                                yield delta
+                LLM_REQUESTS.inc(mode="stream", outcome="success")
+                LLM_DURATION.observe(time.perf_counter() - began, mode="stream")
+                return
+            except Exception as e:
+                if started or attempt >= self.max_retries or not self._is_retryable(e):
+                    LLM_REQUESTS.inc(mode="stream", outcome="error")
+                    LLM_DURATION.observe(time.perf_counter() - began, mode="stream")
+                    raise
+                delay = self._backoff(attempt)
+                attempt += 1
+                LLM_RETRIES.inc(mode="stream")
+                logger.warning("Groq stream failed, retrying", extra={
+                    "error": str(e), "attempt": attempt, "max_retries": self.max_retries, "delay": round(delay, 2),
+                })
+                await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
@@ -0,0 +1,232 @@
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+# Section headings seen in resumes and job descriptions, by canonical name
+SECTION_ALIASES = {
+    "summary": ["summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me", "job description", "overview", "the role", "role overview"],
+    "skills": ["skills", "technical skills", "core competencies", "competencies", "technologies",
+               "tech stack", "tools", "key skills"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history"],
+    "education": ["education", "academic background", "education and training"],
+    "projects": ["projects", "personal projects", "key projects"],
+    "certifications": ["certifications", "certificates", "licenses", "licenses and certifications"],
+    "requirements": ["requirements", "required skills", "required qualifications", "minimum qualifications",
+                     "qualifications", "must have", "what you'll need", "what you will need", "what we're looking for",
+                     "who you are"],
+    "preferred": ["preferred skills", "preferred qualifications", "nice to have", "bonus points", "pluses"],
+    "responsibilities": ["responsibilities", "key responsibilities", "duties", "what you'll do",
+                         "what you will do", "your role"],
+    "about": ["about us", "about the company", "who we are", "our company", "company overview"],
+    "benefits": ["benefits", "perks", "what we offer", "compensation", "compensation and benefits"],
+}
+HEADINGS = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+# Lines that carry no signal for matching
+BOILERPLATE = re.compile(
+    r"equal opportunity|do not discriminate|without regard to|references available|"
+    r"^page \d+( of \d+)?$|^curriculum vitae$|^resume$",
+    re.IGNORECASE,
+)
+
+# Sections most worth the budget for each stage, best first; unlisted sections come last
+STAGE_PRIORITIES = {
+    "resume_info": {"resume": ["header", "skills", "experience", "education", "projects", "certifications", "summary"]},
+    "summary": {"resume": ["summary", "header", "experience", "skills", "education", "certifications", "projects"]},
+    "jd_requirements": {"jd": ["requirements", "preferred", "responsibilities", "summary", "education", "header"]},
+    "skills": {
+        "resume": ["skills", "projects", "experience", "certifications", "summary"],
+        "jd": ["requirements", "preferred", "responsibilities", "header"],
+    },
+    "experience": {
+        "resume": ["experience", "summary", "header", "projects", "education"],
+        "jd": ["requirements", "header", "responsibilities", "summary"],
+    },
+    "insights": {
+        "resume": ["summary", "skills", "experience", "projects"],
+        "jd": ["header", "requirements", "responsibilities", "preferred"],
+    },
+    "fused": {
+        "resume": ["summary", "skills", "experience", "header", "projects", "certifications", "education"],
+        "jd": ["requirements", "header", "preferred", "responsibilities", "summary"],
+    },
+}
+LOW_VALUE_SECTIONS = {"about", "benefits"}
+
+Section = Tuple[str, str, List[str]]  # (canonical name, heading line, body lines)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate Llama token count (about four characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def _heading(line: str, allow_unknown: bool) -> Optional[Tuple[str, str]]:
+    """(section name, inline remainder) when a line opens a section"""
+    if line[:1] in "•-–":
+        return None  # bullets are content, even "• Tools"
+    cleaned = line.strip().strip("#*•-=_ ").strip()
+    name, _, rest = cleaned.partition(":")
+    key = re.sub(r"\s+", " ", name).lower().replace("’", "'")
+    if key in HEADINGS and len(key) <= 40:
+        return HEADINGS[key], rest.strip()
+    if allow_unknown and not rest and cleaned.isupper() and 0 < len(cleaned.split()) <= 4 and len(cleaned) <= 40:
+        return "other", ""
+    return None
+
+
+@lru_cache(maxsize=256)
+def _split(text: str) -> Tuple[Section, ...]:
+    sections: List[Section] = [("header", "", [])]
+    seen = set()
+    for raw in text.splitlines():
+        line = re.sub(r"[ \t]+", " ", raw).strip()
+        if not line or BOILERPLATE.search(line):
+            continue
+        # An all-caps first line is the candidate's name, not a heading
+        heading = _heading(line, allow_unknown=len(sections) > 1 or bool(sections[0][2]))
+        if heading:
+            name, rest = heading
+            heading_line = line[: len(line) - len(rest)].strip() if rest else line
+            sections.append((name, heading_line, [rest] if rest else []))
+            continue
+        # PDF page headers/footers and pasted duplicates repeat verbatim
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        sections[-1][2].append(line)
+    return tuple(section for section in sections if section[2])
+
+
+def split_sections(text: str) -> List[Section]:
+    """Split a document into (section, heading, lines) with boilerplate and repeated lines removed"""
+    return list(_split(text))
+
+
+def _render(heading: str, lines: Sequence[str]) -> str:
+    return "\n".join(([heading] if heading else []) + list(lines))
+
+
+def _truncate(heading: str, lines: Sequence[str], budget: int) -> str:
+    """Whole lines of a section that fit the budget, cutting the first one at a word if needed"""
+    kept: List[str] = [heading] if heading else []
+    used = estimate_tokens(heading) + 1 if heading else 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            if len(kept) <= 1:
+                words = line[: max(0, (budget - used) * 4)].rsplit(" ", 1)[0]
+                if words:
+                    kept.append(words + " ...")
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept) if len(kept) > (1 if heading else 0) else ""
+
+
+def pack(text: str, budget: int, priorities: Sequence[str]) -> str:
+    """The most relevant sections of a document that fit a token budget, in document order"""
+    sections = split_sections(text)
+    rank = {name: i for i, name in enumerate(priorities)}
+
+    def order(i: int) -> Tuple[int, int]:
+        name = sections[i][0]
+        return (rank.get(name, len(priorities) + (name in LOW_VALUE_SECTIONS)), i)
+
+    chosen: Dict[int, str] = {}
+    remaining = budget
+    for i in sorted(range(len(sections)), key=order):
+        name, heading, lines = sections[i]
+        rendered = _render(heading, lines)
+        cost = estimate_tokens(rendered) + 1
+        if cost <= remaining:
+            chosen[i] = rendered
+            remaining -= cost
+        elif remaining >= 32:
+            partial = _truncate(heading, lines, remaining)
+            if partial:
+                chosen[i] = partial
+                remaining -= estimate_tokens(partial) + 1
+    return "\n\n".join(chosen[i] for i in sorted(chosen))
+
+
+class PromptBuilder:
+    """Fits resume and JD text into per-stage token budgets and counts prompt tokens.
+
+    Documents are split into sections, stripped of boilerplate and repeated
+    lines, and the sections most relevant to a stage are packed into its
+    budget. With compaction disabled the texts are passed through unchanged.
+    """
+
+    def __init__(self, enabled: bool = True, budgets: Optional[Dict[str, int]] = None):
+        self.enabled = enabled
+        self.budgets = budgets or {}
+        self._stats: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+
+    @classmethod
+    def from_settings(cls) -> "PromptBuilder":
+        return cls(
+            enabled=settings.prompt_compaction,
+            budgets={
+                "resume_info": settings.prompt_budget_resume_info,
+                "summary": settings.prompt_budget_summary,
+                "jd_requirements": settings.prompt_budget_jd_requirements,
+                "skills": settings.prompt_budget_skills,
+                "experience": settings.prompt_budget_experience,
+                "insights": settings.prompt_budget_insights,
+                "fused": settings.prompt_budget_fused,
+            },
+        )
+
+    def resume(self, stage: str, resume_text: str) -> str:
+        if not self.enabled:
+            return resume_text
+        return pack(resume_text, self.budgets[stage], STAGE_PRIORITIES[stage]["resume"])
+
+    def job_description(self, stage: str, job_description: str) -> str:
+        if not self.enabled:
+            return job_description
+        return pack(job_description, self.budgets[stage], STAGE_PRIORITIES[stage]["jd"])
+
+    def pair(self, stage: str, resume_text: str, job_text: str, job_is_structured: bool = False) -> Tuple[str, str]:
+        """Resume and JD text for a comparison, sharing the stage budget.
+
+        The JD gets at most 40% of the budget unless the resume needs less;
+        structured (already parsed) requirements are kept whole.
+        """
+        if not self.enabled:
+            return resume_text, job_text
+        budget = self.budgets[stage]
+        priorities = STAGE_PRIORITIES[stage]
+        if job_is_structured:
+            job_budget = estimate_tokens(job_text)
+        else:
+            resume_tokens = estimate_tokens(pack(resume_text, budget, priorities["resume"]))
+            job_text = pack(job_text, max(budget * 2 // 5, budget - resume_tokens), priorities["jd"])
+            job_budget = estimate_tokens(job_text)
+        return pack(resume_text, max(budget - job_budget, budget // 2), priorities["resume"]), job_text
+
+    def record(self, stage: str, messages: List[Dict[str, str]], uncompacted_tokens: int) -> None:
+        """Count the prompt tokens a stage sent and what it would have sent uncompacted"""
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        entry = self._stats.setdefault(stage, {"calls": 0, "prompt_tokens": 0, "uncompacted_tokens": 0})
+        entry["calls"] += 1
+        entry["prompt_tokens"] += prompt_tokens
+        entry["uncompacted_tokens"] += max(uncompacted_tokens, prompt_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        stages = {}
+        for stage, entry in self._stats.items():
+            stages[stage] = {
+                **entry,
+                "avg_prompt_tokens": round(entry["prompt_tokens"] / entry["calls"], 1),
+                "saved_ratio": round(1 - entry["prompt_tokens"] / entry["uncompacted_tokens"], 4)
+                if entry["uncompacted_tokens"] else 0.0,
+            }
+        return {"enabled": self.enabled, "budgets": self.budgets, "stages": stages}
@@ -0,0 +1,145 @@
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+Tokenizer = Callable[[str], Iterable[str]]
+# Interned term id arrays for a batch of documents, from one vocabulary
+TermIds = Callable[[Sequence[str]], List[np.ndarray]]
+
+
+# Versioned scoring config. Stored scores carry this version, so any change
+# to the bands must bump SCORING_CONFIG_VERSION.
+SCORING_CONFIG_VERSION = 1
+
+# (upper similarity bound, base score, slope); the last band is open-ended
+SCORE_BANDS = (
+    (0.01, 10.0, 0.0),
+    (0.1, 20.0, 100.0),
+    (0.3, 30.0, 100.0),
+    (0.5, 50.0, 50.0),
+    (None, 70.0, 30.0),
+)
+
+
+def similarity_to_score(similarity: np.ndarray) -> np.ndarray:
+    """Map 0-1 similarities onto the 0-100 matching score scale.
+
+    Most real-world matches fall between 10-80%, so the bands stretch the
+    low end of the similarity range.
+    """
+    similarity = np.clip(np.asarray(similarity, dtype=np.float64), 0.0, 1.0)
+    *bands, (_, last_base, last_slope) = SCORE_BANDS
+    score = np.select(
+        [similarity < upper for upper, _, _ in bands],
+        [base + similarity * slope for _, base, slope in bands],
+        default=last_base + similarity * last_slope,
+    )
+    return np.minimum(score, 100.0)
+
+
+class ScoringEngine:
+    """Score resume x JD matrices with sparse term vectors.
+
+    Each document is tokenized once into a row of term counts over a
+    vocabulary shared by both sides, so an M x N comparison costs two sparse
+    matrix products instead of M * N Python set operations. With
+    ``term_ids`` the rows come straight from a memoizing tokenizer's
+    interned ids instead of a vocabulary built per engine.
+    """
+
+    def __init__(self, tokenize: Tokenizer, term_ids: Optional[TermIds] = None):
+        self.tokenize = tokenize
+        self.term_ids = term_ids
+        self.vocabulary: Dict[str, int] = {}
+        self.columns = 0
+
+    def _term_counts(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        vocabulary = self.vocabulary
+        ids = [vocabulary.setdefault(term, len(vocabulary)) for term in self.tokenize(text)]
+        return np.unique(np.asarray(ids, dtype=np.int64), return_counts=True)
+
+    def vectorize(self, texts: Sequence[str]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Tokenize documents into (term ids, counts) pairs"""
+        if self.term_ids is None:
+            rows = [self._term_counts(text) for text in texts]
+            self.columns = len(self.vocabulary)
+            return rows
+        rows = [np.unique(ids.astype(np.int64), return_counts=True) for ids in self.term_ids(texts)]
+        self.columns = max([self.columns] + [int(ids[-1]) + 1 for ids, _ in rows if len(ids)])
+        return rows
+
+    def _vectorize_pair(self, resume_texts: Sequence[str], job_descriptions: Sequence[str]):
+        # One batch, so both sides share a vocabulary
+        rows = self.vectorize(list(resume_texts) + list(job_descriptions))
+        return rows[:len(resume_texts)], rows[len(resume_texts):]
+
+    def _matrix(self, rows: List[Tuple[np.ndarray, np.ndarray]], binary: bool) -> sparse.csr_matrix:
+        # Built after both sides are tokenized so every matrix has the full
+        # vocabulary as its column count
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(ids) for ids, _ in rows])
+        indices = np.concatenate([ids for ids, _ in rows]) if rows else np.empty(0, np.int64)
+        if binary:
+            data = np.ones(len(indices), dtype=np.float64)
+        else:
+            data = np.concatenate([counts for _, counts in rows]).astype(np.float64) if rows else np.empty(0)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), self.columns))
+
+    def jaccard(self, resume_texts: Sequence[str], job_descriptions: Sequence[str]) -> np.ndarray:
+        """M x N matrix of word-set Jaccard similarities"""
+        resume_rows, jd_rows = self._vectorize_pair(resume_texts, job_descriptions)
+        resumes = self._matrix(resume_rows, binary=True)
+        jds = self._matrix(jd_rows, binary=True)
+
+        intersection = (resumes @ jds.T).toarray()
+        resume_sizes = np.diff(resumes.indptr)[:, None]
+        jd_sizes = np.diff(jds.indptr)[None, :]
+        union = resume_sizes + jd_sizes - intersection
+        with np.errstate(divide="ignore", invalid="ignore"):
+            similarity = np.where(union > 0, intersection / union, 0.0)
+        # Matches the per-pair definition: empty documents score zero
+        similarity[(resume_sizes == 0) | (jd_sizes == 0)] = 0.0
+        return similarity
+
+    def tfidf_cosine(self, resume_texts: Sequence[str], job_descriptions: Sequence[str]) -> np.ndarray:
+        """M x N matrix of TF-IDF cosine similarities"""
+        resume_rows, jd_rows = self._vectorize_pair(resume_texts, job_descriptions)
+        resumes = self._matrix(resume_rows, binary=False)
+        jds = self._matrix(jd_rows, binary=False)
+
+        # Smoothed IDF over both sides of the comparison
+        n_docs = resumes.shape[0] + jds.shape[0]
+        df = np.bincount(np.concatenate([resumes.indices, jds.indices]), minlength=self.columns)
+        idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+
+        def normalize(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+            weighted = matrix.multiply(idf[None, :]).tocsr()
+            norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+            norms[norms == 0] = 1.0
+            return sparse.diags(1.0 / norms) @ weighted
+
+        return (normalize(resumes) @ normalize(jds).T).toarray()
+
+    def similarity(self, resume_texts: Sequence[str], job_descriptions: Sequence[str], metric: str = "jaccard") -> np.ndarray:
+        if metric == "jaccard":
+            return self.jaccard(resume_texts, job_descriptions)
+        if metric == "tfidf":
+            return self.tfidf_cosine(resume_texts, job_descriptions)
+        raise ValueError(f"Unknown similarity metric: {metric}")
+
+    @staticmethod
+    def top_k(matrix: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        """Best k rows (resumes) for every column (JD), highest first"""
+        m = matrix.shape[0]
+        k = min(k, m)
+        if k <= 0:
+            return [[] for _ in range(matrix.shape[1])]
+        # argpartition finds the top k in O(M); only those k get sorted
+        top = np.argpartition(-matrix, k - 1, axis=0)[:k]
+        results = []
+        for j in range(matrix.shape[1]):
+            rows = top[:, j]
+            rows = rows[np.lexsort((rows, -matrix[rows, j]))]
+            results.append([(int(i), float(matrix[i, j])) for i in rows])
+        return results
@@ -0,0 +1,386 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import socket
+import threading
+import uuid
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.file_lock import file_lock
+
+Tokenizer = Callable[[str], Iterable[str]]
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+class _MemorySegment:
+    """Mutable in-memory postings for recently added documents"""
+
+    def __init__(self):
+        self.terms: Dict[str, Tuple[List[int], List[int]]] = {}
+        self.doc_ids: List[int] = []
+        self.doc_lens: List[int] = []
+        self.doc_hashes: List[bytes] = []
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.doc_ids)
+
+    def add(self, doc_id: int, doc_hash: bytes, terms: Counter) -> None:
+        position = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        self.doc_lens.append(sum(terms.values()))
+        self.doc_hashes.append(doc_hash)
+        for term, tf in terms.items():
+            positions, freqs = self.terms.setdefault(term, ([], []))
+            positions.append(position)
+            freqs.append(tf)
+
+    def df(self, term: str) -> int:
+        entry = self.terms.get(term)
+        return len(entry[0]) if entry else 0
+
+    def postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        entry = self.terms.get(term)
+        if not entry:
+            return None
+        return np.asarray(entry[0], dtype=np.int64), np.asarray(entry[1], dtype=np.float32)
+
+    def lens(self) -> np.ndarray:
+        return np.asarray(self.doc_lens, dtype=np.float32)
+
+    def without(self, hashes: set) -> "_MemorySegment":
+        """A copy leaving out the documents whose hash is in ``hashes``"""
+        keep = [position for position, doc_hash in enumerate(self.doc_hashes) if doc_hash not in hashes]
+        if len(keep) == self.n_docs:
+            return self
+        renumber = {old: new for new, old in enumerate(keep)}
+        segment = _MemorySegment()
+        segment.doc_ids = [self.doc_ids[position] for position in keep]
+        segment.doc_lens = [self.doc_lens[position] for position in keep]
+        segment.doc_hashes = [self.doc_hashes[position] for position in keep]
+        for term, (positions, freqs) in self.terms.items():
+            kept = [(renumber[p], tf) for p, tf in zip(positions, freqs) if p in renumber]
+            if kept:
+                segment.terms[term] = ([p for p, _ in kept], [tf for _, tf in kept])
+        return segment
+
+
+class _DiskSegment:
+    """Immutable segment whose arrays are memory-mapped from disk"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.terms: Dict[str, Tuple[int, int]] = {}
+        self.max_doc_id = 0
+        if path is None:
+            self.postings_array = np.empty(0, dtype=np.int32)
+            self.freqs = np.empty(0, dtype=np.uint16)
+            self.doc_ids = np.empty(0, dtype=np.int64)
+            self.doc_lens = np.empty(0, dtype=np.int32)
+            self.doc_hashes = np.empty(0, dtype="S20")
+            return
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.terms = {term: tuple(span) for term, span in meta["terms"].items()}
+        self.max_doc_id = meta["max_doc_id"]
+        self.postings_array = np.load(os.path.join(path, "postings.npy"), mmap_mode="r")
+        self.freqs = np.load(os.path.join(path, "freqs.npy"), mmap_mode="r")
+        self.doc_ids = np.load(os.path.join(path, "doc_ids.npy"), mmap_mode="r")
+        self.doc_lens = np.load(os.path.join(path, "doc_lens.npy"), mmap_mode="r")
+        self.doc_hashes = np.load(os.path.join(path, "doc_hashes.npy"))
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.doc_ids)
+
+    def df(self, term: str) -> int:
+        span = self.terms.get(term)
+        return span[1] if span else 0
+
+    def postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        span = self.terms.get(term)
+        if not span:
+            return None
+        offset, length = span
+        return (
+            np.asarray(self.postings_array[offset:offset + length], dtype=np.int64),
+            np.asarray(self.freqs[offset:offset + length], dtype=np.float32),
+        )
+
+    def lens(self) -> np.ndarray:
+        return np.asarray(self.doc_lens, dtype=np.float32)
+
+    def hash_set(self) -> set:
+        return set(self.doc_hashes.tolist())
+
+
+class SearchIndex:
+    """Persistent BM25 inverted index over stored resumes.
+
+    New documents go into an in-memory segment and are searchable at once.
+    ``flush`` merges them into a new on-disk segment (postings, term
+    frequencies and document lengths as ``.npy`` files, opened with
+    ``mmap_mode="r"``) and switches the ``CURRENT`` pointer atomically, so
+    an interrupted flush never leaves a half-written index behind. Documents
+    are deduplicated by content hash; a resume analyzed many times is indexed
+    once under the first analysis id that contained it.
+
+    Every worker process keeps its own instance over a shared directory.
+    Segment names carry the writer's id, and a flush merges under an
+    exclusive lock on the directory. If another process flushed in the
+    meantime, its segment is the base of the merge, so no process's documents
+    are lost. Loading takes the lock shared, and superseded segments are
+    removed only under the exclusive lock; a process that already mapped one
+    keeps reading the unlinked files.
+    """
+
+    def __init__(
+        self,
+        index_dir: str,
+        tokenize: Tokenizer,
+        tokenizer_version: str,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.index_dir = index_dir
+        self.tokenize = tokenize
+        self.tokenizer_version = tokenizer_version
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._segment = _DiskSegment()
+        self._frozen: Optional[_MemorySegment] = None
+        self._delta = _MemorySegment()
+        self._hashes: set = set()
+        self._generation = 0
+        self.writer = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock_path = os.path.join(index_dir, "lock")
+        self._load()
+
+    # Persistence
+
+    def _current_path(self) -> Optional[str]:
+        pointer = os.path.join(self.index_dir, "CURRENT")
+        if not os.path.exists(pointer):
+            return None
+        with open(pointer) as f:
+            name = f.read().strip()
+        return os.path.join(self.index_dir, name) if name else None
+
+    def _read_current(self) -> Tuple[Optional[_DiskSegment], int]:
+        """The segment CURRENT points at, if compatible, and its generation; needs the directory lock"""
+        path = self._current_path()
+        if path is None or not os.path.isdir(path):
+            return None, 0
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        # Keep numbering segments past the existing ones even if we rebuild
+        generation = meta.get("generation", 0)
+        if meta.get("format") != FORMAT_VERSION or meta.get("tokenizer") != self.tokenizer_version:
+            # Written by an incompatible tokenizer; the caller rebuilds it
+            logger.warning("Search index at %s is stale, ignoring it", path)
+            return None, generation
+        return _DiskSegment(path), generation
+
+    def _load(self) -> None:
+        with file_lock(self._lock_path, shared=True):
+            segment, self._generation = self._read_current()
+        if segment is not None:
+            self._segment = segment
+            self._hashes = segment.hash_set()
+
+    @property
+    def n_docs(self) -> int:
+        frozen = self._frozen.n_docs if self._frozen else 0
+        return self._segment.n_docs + frozen + self._delta.n_docs
+
+    @property
+    def pending(self) -> int:
+        """Documents not yet written to disk"""
+        return self._delta.n_docs
+
+    @property
+    def max_doc_id(self) -> int:
+        ids = [self._segment.max_doc_id]
+        for segment in (self._frozen, self._delta):
+            if segment and segment.doc_ids:
+                ids.append(max(segment.doc_ids))
+        return max(ids)
+
+    # Updates
+
+    def add(self, doc_id: int, text: str) -> bool:
+        """Index a document; returns False if identical text is already indexed"""
+        doc_hash = hashlib.sha1(text.encode("utf-8")).digest()
+        terms = Counter(self.tokenize(text))
+        with self._lock:
+            if doc_hash in self._hashes:
+                return False
+            self._hashes.add(doc_hash)
+            self._delta.add(doc_id, doc_hash, terms)
+        return True
+
+    def add_many(self, docs: Iterable[Tuple[int, str]]) -> int:
+        return sum(self.add(doc_id, text) for doc_id, text in docs)
+
+    def flush(self) -> None:
+        """Merge in-memory documents into a new on-disk segment"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._delta.n_docs:
+                    return
+                frozen, self._frozen = self._delta, self._delta
+                self._delta = _MemorySegment()
+
+            with file_lock(self._lock_path):
+                base, generation = self._segment, self._generation
+                if self._current_path() != base.path:
+                    # Another process flushed since; build on its segment
+                    current, current_generation = self._read_current()
+                    base = current or base
+                    generation = max(generation, current_generation)
+                generation += 1
+                # Either side may have indexed the same text under its own id
+                merged = frozen.without(base.hash_set())
+                name = f"segment-{generation}-{self.writer}"
+                path = os.path.join(self.index_dir, name)
+                self._write_segment(path, generation, base, merged)
+
+                pointer = os.path.join(self.index_dir, "CURRENT")
+                with open(pointer + ".tmp", "w") as f:
+                    f.write(name)
+                os.replace(pointer + ".tmp", pointer)
+
+                segment = _DiskSegment(path)
+                with self._lock:
+                    if base is not self._segment:
+                        self._hashes |= base.hash_set()
+                    self._segment = segment
+                    self._frozen = None
+                    self._generation = generation
+                for entry in os.listdir(self.index_dir):
+                    if entry.startswith("segment-") and entry != name:
+                        shutil.rmtree(os.path.join(self.index_dir, entry), ignore_errors=True)
+
+    def _write_segment(self, path: str, generation: int, old: _DiskSegment, new: _MemorySegment) -> None:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        base = old.n_docs
+        terms: Dict[str, List[int]] = {}
+        postings_parts, freq_parts = [], []
+        offset = 0
+        for term in sorted(set(old.terms) | set(new.terms)):
+            length = 0
+            old_postings = old.postings(term)
+            if old_postings is not None:
+                postings_parts.append(old_postings[0])
+                freq_parts.append(old_postings[1])
+                length += len(old_postings[0])
+            new_postings = new.postings(term)
+            if new_postings is not None:
+                postings_parts.append(new_postings[0] + base)
+                freq_parts.append(new_postings[1])
+                length += len(new_postings[0])
+            terms[term] = [offset, length]
+            offset += length
+
+        def concat(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+
+        np.save(os.path.join(path, "postings.npy"), concat(postings_parts, np.int32))
+        np.save(os.path.join(path, "freqs.npy"), np.minimum(concat(freq_parts, np.float32), 65535).astype(np.uint16))
+        np.save(os.path.join(path, "doc_ids.npy"), np.concatenate([old.doc_ids, np.asarray(new.doc_ids, dtype=np.int64)]))
+        np.save(os.path.join(path, "doc_lens.npy"), np.concatenate([old.doc_lens, np.asarray(new.doc_lens, dtype=np.int32)]))
+        np.save(os.path.join(path, "doc_hashes.npy"), np.concatenate([old.doc_hashes, np.asarray(new.doc_hashes, dtype="S20")]))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({
+                "format": FORMAT_VERSION,
+                "tokenizer": self.tokenizer_version,
+                "generation": generation,
+                "max_doc_id": max([old.max_doc_id] + new.doc_ids),
+                "terms": terms,
+            }, f)
+
+    # Retrieval
+
+    def search(self, text: str, k: int = 10) -> List[Tuple[int, float]]:
+        """Top-k (doc id, BM25 score) for the terms of a query document"""
+        with self._lock:
+            segments = [s for s in (self._segment, self._frozen, self._delta) if s is not None]
+            # Snapshot sizes so concurrent adds don't change array shapes mid-query
+            sizes = [s.n_docs for s in segments]
+        total = sum(sizes)
+        if total == 0 or k <= 0:
+            return []
+
+        lens = np.concatenate([s.lens()[:n] for s, n in zip(segments, sizes)])
+        avgdl = float(lens.mean()) or 1.0
+        bases = np.cumsum([0] + sizes[:-1])
+        scores = np.zeros(total, dtype=np.float32)
+
+        for term in set(self.tokenize(text)):
+            df = sum(s.df(term) for s in segments)
+            if df == 0:
+                continue
+            idf = np.log(1.0 + (total - df + 0.5) / (df + 0.5))
+            for segment, base, size in zip(segments, bases, sizes):
+                postings = segment.postings(term)
+                if postings is None:
+                    continue
+                positions, tf = postings
+                keep = positions < size
+                positions, tf = positions[keep] + base, tf[keep]
+                norm = self.k1 * (1.0 - self.b + self.b * lens[positions] / avgdl)
+                scores[positions] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        doc_ids = np.concatenate([np.asarray(s.doc_ids[:n], dtype=np.int64) for s, n in zip(segments, sizes)])
+        return [(int(doc_ids[i]), float(scores[i])) for i in top]
+
+
+async def catch_up(index: SearchIndex, after: int) -> int:
+    """Index the resumes of analyses with an id above ``after``"""
+    from sqlalchemy import select
+    from app.models.database import SessionLocal, Analysis, Document
+    from app.services.document_store import decompress
+
+    added = 0
+    async with SessionLocal() as db:
+        rows = await db.stream(
+            select(Analysis.id, Document.codec, Document.body)
+            .join(Document, Document.id == Analysis.resume_document_id)
+            .where(Analysis.id > after)
+            .order_by(Analysis.id)
+            .execution_options(yield_per=1000)
+        )
+        async for partition in rows.partitions():
+            docs = [(row.id, decompress(row.codec, row.body)) for row in partition]
+            added += await asyncio.to_thread(index.add_many, docs)
+    return added
+
+
+async def open_search_index(tokenize: Tokenizer, tokenizer_version: str) -> SearchIndex:
+    """Load the persisted index and catch up with analyses saved since"""
+    from app.core.config import settings
+
+    os.makedirs(settings.search_index_dir, exist_ok=True)
+    index = await asyncio.to_thread(SearchIndex, settings.search_index_dir, tokenize, tokenizer_version)
+    added = await catch_up(index, index.max_doc_id)
+    await asyncio.to_thread(index.flush)
+    logger.info("Search index ready", extra={"documents": index.n_docs, "added_on_load": added})
+    return index
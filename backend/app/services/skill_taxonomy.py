@@ -0,0 +1,399 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.services.prompt_builder import split_sections
+
+# Bump whenever the taxonomy or the matching rules change
+TAXONOMY_VERSION = "2"
+
+# Words of requirement lines that are never skills on their own
+NOT_SKILLS = {
+    "strong", "experience", "knowledge", "understanding", "excellent", "proven", "ability", "familiarity",
+    "proficiency", "solid", "good", "deep", "hands", "working", "bachelor", "master", "degree", "years",
+    "we", "you", "our", "the", "a", "an", "or", "and", "must", "nice", "plus", "bonus", "preferred",
+    "backend", "frontend", "database", "software", "development", "cloud", "web", "modern", "senior",
+}
+
+# Related-skill groups: canonical skill -> aliases. A required skill the
+# resume lacks is a partial match when the resume has another skill of the
+# same group. Aliases are matched case-insensitively unless listed in
+# CASE_SENSITIVE; spaces also match hyphens and runs of whitespace.
+TAXONOMY: Dict[str, Dict[str, List[str]]] = {
+    "languages": {
+        "Python": ["python", "python3"],
+        "Java": ["java"],
+        "JavaScript": ["javascript", "js", "es6", "ecmascript"],
+        "TypeScript": ["typescript", "ts"],
+        "Go": ["golang", "Go"],
+        "Rust": ["Rust"],
+        "C++": ["c++", "cpp"],
+        "C#": ["c#", "csharp", "c sharp"],
+        "Ruby": ["ruby"],
+        "PHP": ["php"],
+        "Kotlin": ["kotlin"],
+        "Swift": ["Swift"],
+        "Scala": ["scala"],
+        "SQL": ["sql"],
+        "Bash": ["bash", "shell scripting"],
+    },
+    "frontend": {
+        "React": ["react", "react.js", "reactjs"],
+        "Angular": ["angular", "angularjs", "angular.js"],
+        "Vue": ["vue", "vue.js", "vuejs"],
+        "Next.js": ["next.js", "nextjs"],
+        "Redux": ["redux"],
+        "HTML": ["html", "html5"],
+        "CSS": ["css", "css3", "sass", "scss"],
+        "Tailwind CSS": ["tailwind", "tailwind css", "tailwindcss"],
+        "Bootstrap": ["bootstrap"],
+    },
+    "backend": {
+        "Node.js": ["node.js", "nodejs", "Node"],
+        "Express": ["Express", "express.js", "expressjs"],
+        "Django": ["django", "django rest framework"],
+        "Flask": ["flask"],
+        "FastAPI": ["fastapi"],
+        "Spring": ["Spring", "spring boot", "spring framework"],
+        "Ruby on Rails": ["rails", "ruby on rails"],
+        ".NET": [".net", "asp.net", "dotnet", ".net core"],
+        "GraphQL": ["graphql"],
+        "REST": ["REST", "restful", "rest api", "rest apis", "restful api", "restful apis"],
+        "gRPC": ["grpc"],
+        "Microservices": ["microservices", "microservice", "microservices-based"],
+        "WebSockets": ["websockets", "websocket", "socket.io"],
+    },
+    "sql_databases": {
+        "PostgreSQL": ["postgresql", "postgres", "psql"],
+        "MySQL": ["mysql", "mariadb"],
+        "SQL Server": ["sql server", "mssql"],
+        "Oracle Database": ["oracle database", "oracle db", "pl/sql"],
+        "SQLite": ["sqlite"],
+    },
+    "nosql_databases": {
+        "MongoDB": ["mongodb", "mongo"],
+        "Redis": ["redis"],
+        "Cassandra": ["cassandra"],
+        "DynamoDB": ["dynamodb"],
+        "Elasticsearch": ["elasticsearch", "elastic search", "opensearch"],
+    },
+    "cloud": {
+        "AWS": ["aws", "amazon web services"],
+        "Azure": ["azure", "microsoft azure"],
+        "GCP": ["gcp", "google cloud", "google cloud platform"],
+    },
+    "containers": {
+        "Docker": ["docker", "containerization"],
+        "Kubernetes": ["kubernetes", "k8s", "eks", "gke", "aks"],
+        "Helm": ["helm"],
+    },
+    "devops": {
+        "CI/CD": ["ci/cd", "ci cd", "continuous integration", "continuous delivery", "continuous deployment"],
+        "GitHub Actions": ["github actions"],
+        "Jenkins": ["jenkins"],
+        "DevOps": ["devops"],
+        "Linux": ["linux", "unix"],
+    },
+    "infrastructure_as_code": {
+        "Terraform": ["terraform"],
+        "Ansible": ["ansible"],
+        "CloudFormation": ["cloudformation"],
+        "Pulumi": ["pulumi"],
+    },
+    "version_control": {
+        "Git": ["git", "github", "gitlab", "bitbucket"],
+    },
+    "testing": {
+        "Jest": ["jest"],
+        "Cypress": ["cypress"],
+        "Selenium": ["selenium"],
+        "PyTest": ["pytest"],
+        "JUnit": ["junit"],
+        "Playwright": ["playwright"],
+    },
+    "data": {
+        "Spark": ["spark", "pyspark", "apache spark"],
+        "Kafka": ["kafka", "apache kafka"],
+        "Airflow": ["airflow", "apache airflow"],
+        "Hadoop": ["hadoop"],
+        "Snowflake": ["snowflake"],
+        "dbt": ["dbt"],
+        "Pandas": ["pandas"],
+        "NumPy": ["numpy"],
+        "Tableau": ["tableau"],
+        "Power BI": ["power bi", "powerbi"],
+    },
+    "machine_learning": {
+        "Machine Learning": ["machine learning", "ml"],
+        "Deep Learning": ["deep learning"],
+        "TensorFlow": ["tensorflow"],
+        "PyTorch": ["pytorch"],
+        "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+        "NLP": ["nlp", "natural language processing"],
+        "Computer Vision": ["computer vision"],
+    },
+    "messaging": {
+        "RabbitMQ": ["rabbitmq"],
+        "SQS": ["sqs"],
+    },
+    "methodologies": {
+        "Agile": ["agile", "scrum", "kanban"],
+        "TDD": ["tdd", "test-driven development", "test driven development"],
+    },
+    "tools": {
+        "Jira": ["jira"],
+        "Postman": ["postman"],
+        "Swagger": ["swagger", "openapi"],
+        "Figma": ["figma"],
+    },
+}
+# Aliases that are also ordinary English words ("go to", "rest assured",
+# "express interest") only match with this casing, and all but "REST" also
+# need another skill or a technical word in the same sentence or line
+CASE_SENSITIVE = {"Go", "Rust", "Swift", "Node", "Express", "Spring", "REST"}
+NEEDS_CONTEXT = CASE_SENSITIVE - {"REST"}
+TECH_CONTEXT = re.compile(
+    r"\b(?:programming|languages?|frameworks?|librar(?:y|ies)|developers?|development|engineer(?:s|ing)?"
+    r"|proficien\w*|experience (?:with|in)|written in|built (?:with|in)|stack)\b",
+    re.IGNORECASE,
+)
+
+# Capitalised words in requirement lines that are not skills, on top of NOT_SKILLS
+GENERIC_TERMS = {
+    "api", "apis", "ui", "ux", "it", "computer science", "engineering", "design", "equivalent", "team",
+    "architecture", "security", "performance", "communication", "teamwork", "testing", "frameworks",
+    "similar", "platforms", "tools", "best practices", "experience", "knowledge", "understanding",
+    "apache", "microsoft", "google", "amazon",
+}
+
+SKILL_GROUP = {skill: group for group, skills in TAXONOMY.items() for skill in skills}
+
+
+def _normalize(alias: str) -> str:
+    return re.sub(r"[\s\-]+", " ", alias.strip().lower())
+
+
+ALIASES = {_normalize(alias): skill for skills in TAXONOMY.values() for skill, aliases in skills.items()
+           for alias in [skill, *aliases] if alias not in CASE_SENSITIVE}
+CASE_SENSITIVE_ALIASES = {alias: skill for skills in TAXONOMY.values() for skill, aliases in skills.items()
+                          for alias in aliases if alias in CASE_SENSITIVE}
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """One regex for a set of words that never backtracks across shared prefixes.
+
+    The words are merged into a character trie and rendered as nested
+    groups, so matching at a position walks the trie once, like an
+    Aho-Corasick goto function.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: Dict[str, Any]) -> str:
+        terminal = "" in node
+        branches = [(r"[\s\-]+" if char == " " else re.escape(char)) + render(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Greedy: the longest alias wins, falling back to a shorter one at a word boundary
+            body = (body if len(branches) == 1 and len(branches[0]) == 1 else "(?:" + body + ")") + "?"
+        return body
+
+    return render(trie)
+
+
+# Skills do not start or end inside a word; "C++" and ".NET" carry their own symbols
+SKILL_PATTERN = re.compile(
+    r"(?<![\w+#.])(?=[\w.])(?:" + _trie_pattern(ALIASES)
+    + "".join("|(?-i:" + re.escape(alias) + ")" for alias in CASE_SENSITIVE_ALIASES)
+    + r")(?![\w+#]|\.\w)",
+    re.IGNORECASE,
+)
+TERM = re.compile(r"(?<![\w.+#/])(?:[A-Z][\w.+#/-]*[\w+#]|\.NET|[a-z]+\.js)(?![\w+#])")
+
+
+def canonical(skill: str) -> Optional[str]:
+    """The taxonomy name for a skill or alias, if it is known"""
+    return CASE_SENSITIVE_ALIASES.get(skill.strip()) or ALIASES.get(_normalize(skill))
+
+
+CLAUSE_END = re.compile(r"\n|[.!?;](?=\s)")
+
+
+def _clause(text: str, position: int) -> Tuple[int, int]:
+    """Bounds of the sentence or line around a position"""
+    start = 0
+    for boundary in CLAUSE_END.finditer(text, 0, position):
+        start = boundary.end()
+    end = CLAUSE_END.search(text, position)
+    return start, end.start() if end else len(text)
+
+
+def extract(text: str, context: bool = True) -> Dict[str, int]:
+    """Known skills mentioned in a text and how often, in a single scan.
+
+    With ``context`` an alias from NEEDS_CONTEXT only counts when its
+    sentence names another skill or has a technical word; pass False for text that is
+    known to be a skill name.
+    """
+    found: Dict[str, int] = {}
+    ambiguous, positions = [], []
+    for match in SKILL_PATTERN.finditer(text):
+        alias = match.group()
+        if context and alias in NEEDS_CONTEXT:
+            ambiguous.append(match)
+            continue
+        skill = ALIASES.get(alias.lower()) or CASE_SENSITIVE_ALIASES.get(alias) or ALIASES[_normalize(alias)]
+        found[skill] = found.get(skill, 0) + 1
+        positions.append(match.start())
+    for match in ambiguous:
+        start, end = _clause(text, match.start())
+        if TECH_CONTEXT.search(text, start, end) or any(start <= position < end for position in positions):
+            skill = CASE_SENSITIVE_ALIASES[match.group()]
+            found[skill] = found.get(skill, 0) + 1
+    return found
+
+
+@lru_cache(maxsize=256)
+def _requirement_lines(job_description: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """(required, preferred) lines of a JD; the whole JD is required when it has no such sections"""
+    required, preferred = [], []
+    for name, _, lines in split_sections(job_description):
+        if name == "requirements":
+            required.extend(lines)
+        elif name == "preferred":
+            preferred.extend(lines)
+    if not required and not preferred:
+        required = job_description.splitlines()
+    return tuple(required), tuple(preferred)
+
+
+def _requirements(lines: Sequence[str]) -> List[List[str]]:
+    """Skills each line asks for; "Node.js or Python" is one requirement met by either"""
+    requirements: List[List[str]] = []
+    for line in lines:
+        skills = list(extract(line))
+        if not skills:
+            continue
+        if len(skills) > 1 and re.search(r"\bor\b", line, re.IGNORECASE):
+            requirements.append(skills)
+        else:
+            requirements.extend([skill] for skill in skills)
+    return requirements
+
+
+def recognition(lines: Sequence[str]) -> Tuple[int, int]:
+    """(known skills, skill-like terms the taxonomy does not know) in requirement lines"""
+    known, unknown = set(), set()
+    for line in lines:
+        known.update(extract(line))
+        for match in TERM.findall(line):
+            for term in match.split("/") if "/" in match and canonical(match) is None else [match]:
+                term = term.strip(".-")
+                key = term.lower()
+                if len(term) < 2 or key in NOT_SKILLS or key in GENERIC_TERMS or canonical(term) is not None:
+                    continue
+                unknown.add(key)
+    return len(known), len(unknown)
+
+
+def _pattern(skill: str) -> re.Pattern:
+    words = [re.escape(word) for word in re.split(r"\s+", skill.lower().strip())]
+    body = r"\s+".join(words)
+    if body.endswith(r"\.js"):
+        body = body[:-4] + r"(?:\.?js)?"  # "React.js" also matches "React"
+    return re.compile(r"(?<![\w+#])" + body + r"(?![\w+#])")
+
+
+def _mentions(skill: str, resume: str) -> str:
+    """'full', 'partial' (some words of a multi-word skill) or '' for a skill the taxonomy does not know"""
+    if _pattern(skill).search(resume):
+        return "full"
+    words = [word for word in re.split(r"[\s/,]+", skill) if len(word) > 2 and word.lower() not in NOT_SKILLS]
+    if len(words) > 1 and any(_pattern(word).search(resume) for word in words):
+        return "partial"
+    return ""
+
+
+def _match(required: List[List[str]], preferred: List[List[str]], resume_text: str,
+           known: int, unknown: int) -> Dict[str, Any]:
+    """Skills match in the LLM reply's shape.
+
+    Each requirement is a list of options, any of which meets it. Options
+    are taxonomy skills, compared by alias and group, or terms the taxonomy
+    does not know, looked for literally in the resume.
+    """
+    resume_skills = extract(resume_text)
+    resume = resume_text.lower()
+    mentions: Dict[str, str] = {}
+
+    def has(option: str) -> bool:
+        if option in SKILL_GROUP:
+            return option in resume_skills
+        if option not in mentions:
+            mentions[option] = _mentions(option, resume)
+        return mentions[option] == "full"
+
+    result = {"perfect_match": [], "partial_match": [], "missing_skills": [], "bonus_skills": []}
+    asked = {option for options in required for option in options}
+    for options in required:
+        present = [option for option in options if has(option)]
+        if present:
+            result["perfect_match"].extend(option for option in present if option not in result["perfect_match"])
+            continue
+        groups = {SKILL_GROUP[option] for option in options if option in SKILL_GROUP}
+        related = [skill for skill in resume_skills if SKILL_GROUP[skill] in groups]
+        if related:
+            result["partial_match"].append(f"{options[0]} (related: {', '.join(related[:3])})")
+        elif any(mentions.get(option) == "partial" for option in options):
+            result["partial_match"].append(options[0])
+        else:
+            result["missing_skills"].append(" or ".join(options))
+
+    for options in preferred:
+        for option in options:
+            if option not in asked and option not in result["bonus_skills"] and has(option):
+                result["bonus_skills"].append(option)
+
+    met = len(required) - len(result["missing_skills"]) - 0.5 * len(result["partial_match"])
+    coverage = met / len(required) if required else 0.0
+    result["coverage"] = round(coverage, 4)
+    result["confidence_level"] = "High" if coverage >= 0.75 else "Medium" if coverage >= 0.4 else "Low"
+    result["taxonomy_confidence"] = round(known / (known + unknown), 4) if known + unknown else 0.0
+    result["required_skill_count"] = len(required)
+    result["method"] = "taxonomy"
+    return result
+
+
+def match_skills(resume_text: str, job_description: str) -> Dict[str, Any]:
+    """Skills match of a resume against the requirement lines of a JD, without an LLM call.
+
+    ``taxonomy_confidence`` is the share of skill-like terms in the JD's
+    requirement lines the taxonomy recognised; a low value means the JD
+    asks for skills this dictionary does not cover.
+    """
+    required_lines, preferred_lines = _requirement_lines(job_description)
+    known, unknown = recognition(required_lines + preferred_lines)
+    return _match(_requirements(required_lines), _requirements(preferred_lines), resume_text, known, unknown)
+
+
+def _options(skill: str) -> List[str]:
+    """Requirement options for one stored skill string; unknown skills are kept as written"""
+    name = canonical(skill)
+    if name is not None:
+        return [name]
+    return list(extract(skill, context=False)) or [skill]
+
+
+def match_requirements(requirements: Dict[str, Any], resume_text: str) -> Dict[str, Any]:
+    """Skills match of a resume against a job opening's stored skill lists, without an LLM call"""
+    required = [_options(skill) for skill in requirements.get("required_skills", [])]
+    preferred = [_options(skill) for skill in requirements.get("preferred_skills", [])]
+    known = sum(all(option in SKILL_GROUP for option in options) for options in required + preferred)
+    return _match(required, preferred, resume_text, known, len(required) + len(preferred) - known)
@@ -0,0 +1,189 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.core.metrics import ANALYSES_IN_FLIGHT, STAGE_DURATION
+
+StageFunc = Callable[[Dict[str, Any]], Awaitable[Any]]
+# Called with (stage name, value, failure reason or None) as each stage finishes
+StageCallback = Callable[[str, Any, Optional[str]], Awaitable[None]]
+
+
+class StageFailedError(Exception):
+    """Raised under the strict policy when a stage fails or times out"""
+
+    def __init__(self, stage: str, reason: str):
+        super().__init__(f"Stage '{stage}' failed: {reason}")
+        self.stage = stage
+        self.reason = reason
+
+
+class Stage:
+    """A single unit of work in a stage graph"""
+
+    def __init__(
+        self,
+        name: str,
+        func: StageFunc,
+        depends_on: Iterable[str] = (),
+        timeout: Optional[float] = None,
+        fallback: Any = None,
+    ):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.timeout = timeout
+        # Either a value or a callable taking the failure reason
+        self.fallback = fallback
+
+    def fallback_value(self, reason: str) -> Any:
+        if callable(self.fallback):
+            return self.fallback(reason)
+        return self.fallback
+
+
+class StageResults:
+    """Outcome of a scheduler run"""
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.durations: Dict[str, float] = {}
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.errors)
+
+    def __getitem__(self, name: str) -> Any:
+        return self.values[name]
+
+
+class StageScheduler:
+    """Run async stages as a dependency graph.
+
+    Every stage starts as soon as the stages it depends on have finished, so
+    independent stages overlap. Each stage receives a dict with the results of
+    its dependencies. With the ``partial`` policy a stage that raises or
+    exceeds its timeout is replaced by its fallback value and recorded in
+    ``StageResults.errors``; with the ``strict`` policy the run is aborted.
+    """
+
+    def __init__(self, default_timeout: Optional[float] = None, policy: str = "partial"):
+        if policy not in ("partial", "strict"):
+            raise ValueError(f"Unknown stage failure policy: {policy}")
+        self.default_timeout = default_timeout
+        self.policy = policy
+        self._stages: Dict[str, Stage] = {}
+
+    def add(
+        self,
+        name: str,
+        func: StageFunc,
+        depends_on: Iterable[str] = (),
+        timeout: Optional[float] = None,
+        fallback: Any = None,
+    ) -> "StageScheduler":
+        if name in self._stages:
+            raise ValueError(f"Stage '{name}' already registered")
+        self._stages[name] = Stage(name, func, depends_on, timeout, fallback)
+        return self
+
+    def _check_graph(self) -> None:
+        for stage in self._stages.values():
+            for dep in stage.depends_on:
+                if dep not in self._stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        # Detect cycles with a depth-first walk
+        visiting, done = set(), set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage graph has a cycle through '{name}'")
+            visiting.add(name)
+            for dep in self._stages[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self._stages:
+            visit(name)
+
+    async def _run_stage(
+        self,
+        stage: Stage,
+        tasks: Dict[str, "asyncio.Task[Any]"],
+        results: StageResults,
+        on_complete: Optional[StageCallback],
+    ) -> Any:
+        deps: Dict[str, Any] = {}
+        for dep in stage.depends_on:
+            deps[dep] = await tasks[dep]
+
+        timeout = stage.timeout if stage.timeout is not None else self.default_timeout
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            value = await asyncio.wait_for(stage.func(deps), timeout=timeout)
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            reason = f"timed out after {timeout}s"
+            value = self._handle_failure(stage, reason, results)
+        except Exception as e:
+            value = self._handle_failure(stage, str(e) or type(e).__name__, results)
+        finally:
+            results.durations[stage.name] = time.perf_counter() - started
+            STAGE_DURATION.observe(results.durations[stage.name], stage=stage.name, outcome=outcome)
+
+        results.values[stage.name] = value
+        if on_complete is not None:
+            await on_complete(stage.name, value, results.errors.get(stage.name))
+        return value
+
+    def _handle_failure(self, stage: Stage, reason: str, results: StageResults) -> Any:
+        results.errors[stage.name] = reason
+        if self.policy == "strict":
+            raise StageFailedError(stage.name, reason)
+        return stage.fallback_value(reason)
+
+    async def run(self, on_complete: Optional[StageCallback] = None) -> StageResults:
+        """Run all registered stages and collect their results.
+
+        ``on_complete`` is awaited as soon as each stage has a result, which
+        lets callers stream results before the whole graph is done.
+        """
+        self._check_graph()
+        results = StageResults()
+        tasks: Dict[str, "asyncio.Task[Any]"] = {}
+
+        # Create tasks in dependency order so every dependency task exists
+        # before a dependent stage awaits it
+        ordered: List[Stage] = []
+        seen = set()
+
+        def place(name: str) -> None:
+            if name in seen:
+                return
+            for dep in self._stages[name].depends_on:
+                place(dep)
+            seen.add(name)
+            ordered.append(self._stages[name])
+
+        for name in self._stages:
+            place(name)
+
+        for stage in ordered:
+            tasks[stage.name] = asyncio.ensure_future(self._run_stage(stage, tasks, results, on_complete))
+
+        try:
+            with ANALYSES_IN_FLIGHT.track_inprogress():
+                await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return results
@@ -0,0 +1,147 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.document_store import content_hash
+
+# Bump whenever tokens() output changes so persisted indexes and stored scores get rebuilt
+TOKENIZER_VERSION = "tokens-v1"
+
+# One pass over the lower-cased text. Tech names keep their symbols
+# ("c++", "c#", ".net", "node.js", "ci/cd"); everything else splits into
+# runs of letters and digits, as the old preprocessing did. Matches always
+# start where the previous one ended or after a separator, so no lookbehind
+# is needed.
+TOKEN = re.compile(
+    r"[a-z]{1,3}/[a-z]{1,3}(?![a-z0-9/])"  # ci/cd, pl/sql, tcp/ip
+    r"|[a-z][a-z0-9]*(?:[+#]+|\.(?:js|net|io)(?![a-z0-9]))?"  # c++, f#, react.js, asp.net, socket.io
+    r"|[0-9][a-z0-9]*"
+    r"|\.net(?![a-z0-9])"
+)
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each etc few for from further had has have having he her
+here hers herself him himself his how i if in into is it its itself just me more most my myself no nor not of
+off on once only or other our ours ourselves out over own per same she should so some such than that the their
+theirs them themselves then there these they this those through to too under until up upon us very via was we
+were what when where which while who whom why will with within without would you your yours yourself yourselves
+""".split())
+
+# Light suffix stripping, longest suffix first; (suffix, replacement, minimum stem length)
+SUFFIXES = (
+    ("ational", "ate", 3), ("ization", "ize", 3), ("ations", "ate", 3), ("ation", "ate", 3), ("ments", "", 4),
+    ("ment", "", 4), ("ness", "", 4), ("ities", "ity", 3), ("ies", "y", 3), ("ing", "", 4), ("ers", "er", 3),
+    ("ed", "", 4), ("ches", "ch", 3), ("shes", "sh", 3), ("xes", "x", 3), ("s", "", 3),
+)
+# Suffixes that are part of the word, not an inflection
+KEEP = frozenset({"kubernetes", "pandas", "jenkins", "redis", "aws", "postgres", "devops", "analytics", "ios",
+                  "windows", "express", "sass", "css", "js", "sas", "business", "status", "series", "access"})
+
+
+def stem(token: str) -> str:
+    """Strip one common English suffix; tech tokens and short words are left alone"""
+    if not token.isalpha() or token in KEEP or len(token) <= 4:
+        return token
+    for suffix, replacement, min_stem in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= min_stem:
+            if suffix == "s" and token.endswith(("ss", "us", "is")):
+                break
+            token = token[: len(token) - len(suffix)] + replacement
+            break
+    # "manage", "managed" and "manages" all become "manag"
+    return token[:-1] if token.endswith("e") and len(token) > 5 else token
+
+
+class Tokenizer:
+    """Normalizes and tokenizes documents, memoizing each document's tokens.
+
+    Terms are interned into integer ids shared by all documents; token id
+    arrays are cached per content hash, so a document is tokenized once no
+    matter how many pairs it is compared in. The vocabulary and the cache
+    are reset together when the vocabulary outgrows ``max_vocabulary``.
+    """
+
+    def __init__(self, stopwords: bool = True, stemming: bool = False,
+                 cache_size: int = 4096, max_vocabulary: int = 1_000_000):
+        self.stopwords = stopwords
+        self.stemming = stemming
+        self.cache_size = cache_size
+        self.max_vocabulary = max_vocabulary
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._stems: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls) -> "Tokenizer":
+        return cls(
+            stopwords=settings.tokenizer_stopwords,
+            stemming=settings.tokenizer_stemming,
+            cache_size=settings.tokenizer_cache_size,
+        )
+
+    @property
+    def version(self) -> str:
+        return TOKENIZER_VERSION + ("-stop" if self.stopwords else "") + ("-stem" if self.stemming else "")
+
+    def terms(self, text: str) -> List[str]:
+        """Normalized terms of a text, without memoization"""
+        tokens = TOKEN.findall(text.lower())
+        if self.stopwords:
+            tokens = [token for token in tokens if token not in STOPWORDS]
+        if self.stemming:
+            stems = self._stems
+            tokens = [stems.get(token) or stems.setdefault(token, stem(token)) for token in tokens]
+        return tokens
+
+    def _lookup(self, text: str) -> np.ndarray:
+        # Caller holds the lock
+        key = content_hash(text)
+        ids = self._cache.get(key)
+        if ids is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return ids
+        self.misses += 1
+        vocabulary, terms = self._ids, self._terms
+        tokens = self.terms(text)
+        for token in dict.fromkeys(tokens):
+            if token not in vocabulary:
+                vocabulary[token] = len(terms)
+                terms.append(token)
+        ids = np.array([vocabulary[token] for token in tokens], dtype=np.int32)
+        self._cache[key] = ids
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return ids
+
+    def _maybe_reset(self) -> None:
+        if len(self._terms) > self.max_vocabulary:
+            self._ids.clear()
+            self._terms.clear()
+            self._cache.clear()
+            self._stems.clear()
+
+    def ids(self, texts: Sequence[str]) -> List[np.ndarray]:
+        """Term id arrays for documents, all from the same vocabulary"""
+        with self._lock:
+            self._maybe_reset()
+            return [self._lookup(text) for text in texts]
+
+    def tokens(self, text: str) -> List[str]:
+        """Terms of a document, served from the memo when it was seen before"""
+        with self._lock:
+            self._maybe_reset()
+            terms = self._terms
+            return [terms[i] for i in self._lookup(text).tolist()]
+
+    def stats(self) -> Dict[str, int]:
+        return {"vocabulary": len(self._terms), "documents": len(self._cache), "hits": self.hits, "misses": self.misses}
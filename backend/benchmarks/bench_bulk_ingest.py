@@ -0,0 +1,119 @@
+"""Resume ingestion throughput: one-by-one uploads vs the bulk endpoint.
+
+Generates a corpus of synthetic PDF/DOCX/TXT resumes (a fraction of them
+byte-identical duplicates) and runs it through the app in-process:
+
+    python benchmarks/bench_bulk_ingest.py --files 300 --workers 4
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import make_document  # noqa: E402
+
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "txt": "text/plain",
+}
+
+
+def build_corpus(n: int, duplicate_rate: float, pages: int, seed: int = 7):
+    rng = random.Random(seed)
+    files = []
+    for i in range(n):
+        if files and rng.random() < duplicate_rate:
+            name, data = rng.choice(files)
+            files.append((f"copy_{i}_{name}", data))
+            continue
+        kind = rng.choice(["pdf", "pdf", "docx", "txt"])
+        files.append((f"resume_{i}.{kind}", make_document(rng, i, kind, pages)))
+    return files
+
+
+def zip_corpus(files) -> bytes:
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in files:
+            archive.writestr(f"resumes/{name}", data)
+    return out.getvalue()
+
+
+def content_type(name: str) -> str:
+    return CONTENT_TYPES[name.rsplit(".", 1)[1]]
+
+
+async def run(files, archive: bytes) -> dict:
+    import httpx
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    report = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Warm the parser pool so process start-up is not billed to one mode
+        await client.post("/api/upload-resume", files={"file": files[0][0:1] + (files[0][1], content_type(files[0][0]))})
+
+        started = time.perf_counter()
+        ok = 0
+        for name, data in files:
+            response = await client.post("/api/upload-resume", files={"file": (name, data, content_type(name))})
+            ok += response.status_code == 200
+        elapsed = time.perf_counter() - started
+        report["sequential_single_uploads"] = {"wall_time_s": round(elapsed, 3), "files_per_s": round(len(files) / elapsed, 1), "ok": ok}
+
+        for mode in ("bulk_multipart", "bulk_zip"):
+            if mode == "bulk_zip":
+                payload = [("files", ("corpus.zip", archive, "application/zip"))]
+            else:
+                payload = [("files", (name, data, content_type(name))) for name, data in files]
+            started = time.perf_counter()
+            statuses = {}
+            async with client.stream("POST", "/api/upload-resumes", files=payload) as response:
+                async for line in response.aiter_lines():
+                    if line:
+                        status = json.loads(line)["status"]
+                        statuses[status] = statuses.get(status, 0) + 1
+            elapsed = time.perf_counter() - started
+            report[mode] = {"wall_time_s": round(elapsed, 3), "files_per_s": round(len(files) / elapsed, 1), **statuses}
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--pages", type=int, default=2, help="pages per synthetic resume")
+    parser.add_argument("--duplicates", type=float, default=0.1, help="fraction of files that repeat an earlier one")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="parser processes")
+    args = parser.parse_args()
+
+    # The extraction cache would serve every mode after the first from disk
+    os.environ.update(EXTRACT_WORKERS=str(args.workers), BULK_MAX_FILES=str(max(args.files, 1000)), EXTRACTION_CACHE_ENABLED="false")
+    files = build_corpus(args.files, args.duplicates, args.pages)
+    archive = zip_corpus(files)
+
+    from app.services.file_service import FileService
+
+    report = {
+        "files": args.files,
+        "workers": args.workers,
+        "corpus_bytes": sum(len(data) for _, data in files),
+        "zip_bytes": len(archive),
+    }
+    try:
+        report.update(asyncio.run(run(files, archive)))
+    finally:
+        FileService.shutdown()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Compare analysis insert throughput of the old and new persistence setups.
+
+``sync_default`` is the previous setup: a synchronous SQLAlchemy engine on
+SQLite's default rollback journal, one session and commit per analysis, run
+from a thread pool the way FastAPI runs blocking work. ``async_wal`` is the
+current setup: the pooled async engine with WAL pragmas, one session and
+commit per analysis from concurrent tasks.
+
+    python benchmarks/bench_db_writes.py --rows 2000 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RESUME = "Senior Python engineer with 8 years of FastAPI and React experience. " * 20
+JOB_DESCRIPTION = "Looking for a Python backend engineer with FastAPI experience. " * 10
+
+ROW = {
+    "resume_document_id": 1,
+    "jd_document_id": 2,
+    "matching_score": 72.5,
+    "resume_summary": "Experienced backend engineer. " * 10,
+    "interview_insights": {"strengths": ["Python", "FastAPI"], "concerns": [], "questions": ["Q1", "Q2"]},
+    "skills_match": {"perfect_match": ["Python"], "missing_skills": ["Kubernetes"]},
+    "experience_match": {"experience_level_match": "Good"},
+    "scorer_version": "bench",
+}
+
+
+def bench_sync(path: str, rows: int, concurrency: int) -> float:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.models.database import Analysis, Base, Document
+    from app.services.document_store import document_row
+
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all([Document(**document_row(RESUME)), Document(**document_row(JOB_DESCRIPTION))])
+        db.commit()
+
+    def insert(_: int) -> None:
+        db = Session()
+        try:
+            db.add(Analysis(**ROW))
+            db.commit()
+        finally:
+            db.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(insert, range(rows)))
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return elapsed
+
+
+async def bench_async(rows: int, concurrency: int) -> float:
+    from app.models.database import Analysis, SessionLocal, engine, init_db
+    from app.services.document_store import intern_documents
+
+    await init_db()
+    async with SessionLocal() as db:
+        await intern_documents(db, [RESUME, JOB_DESCRIPTION])
+        await db.commit()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def insert() -> None:
+        async with semaphore:
+            async with SessionLocal() as db:
+                db.add(Analysis(**ROW))
+                await db.commit()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[insert() for _ in range(rows)])
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_db_writes_")
+    # Must be set before app.models.database creates its engine
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'async_wal.db')}"
+
+    report = {"rows": args.rows, "concurrency": args.concurrency}
+    for mode in ("sync_default", "async_wal"):
+        if mode == "sync_default":
+            elapsed = bench_sync(os.path.join(workdir, "sync_default.db"), args.rows, args.concurrency)
+        else:
+            elapsed = asyncio.run(bench_async(args.rows, args.concurrency))
+        report[mode] = {
+            "wall_time_s": round(elapsed, 3),
+            "rows_per_s": round(args.rows / elapsed, 1),
+        }
+    report["speedup"] = round(report["async_wal"]["rows_per_s"] / report["sync_default"]["rows_per_s"], 2)
+
+    for name in os.listdir(workdir):
+        os.remove(os.path.join(workdir, name))
+    os.rmdir(workdir)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
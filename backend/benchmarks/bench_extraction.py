@@ -0,0 +1,168 @@
+"""Text extraction speed and fidelity per backend.
+
+Runs every installed backend over ``sample_data/`` and synthetic resumes
+(short and long PDFs, a DOCX with a table, header and text box) and reports
+pages/sec plus word recall against the text the document was built from.
+Finally extracts a long PDF through the app's parser pool in one task and
+split into page ranges:
+
+    python benchmarks/bench_extraction.py --long-pages 200 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import make_docx, make_pdf, resume_lines  # noqa: E402
+
+SAMPLE_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "sample_data")
+TEXT_BOX = "Certifications: AWS Solutions Architect"
+
+
+def words(text: str) -> list:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def recall(expected: str, extracted: str) -> float:
+    """Share of the expected words, with multiplicity, found in the extracted text"""
+    found = {}
+    for word in words(extracted):
+        found[word] = found.get(word, 0) + 1
+    total = hits = 0
+    for word in words(expected):
+        total += 1
+        if found.get(word, 0) > 0:
+            found[word] -= 1
+            hits += 1
+    return round(hits / total, 4) if total else 1.0
+
+
+def add_text_box(data: bytes) -> bytes:
+    """Wrap a DOCX body paragraph in a text box the way Word stores shapes"""
+    import io
+    import zipfile
+
+    source, out = zipfile.ZipFile(io.BytesIO(data)), io.BytesIO()
+    box = (
+        '<w:p><w:r><mc:AlternateContent xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006">'
+        '<mc:Fallback><w:pict><v:shape xmlns:v="urn:schemas-microsoft-com:vml"><v:textbox><w:txbxContent>'
+        f'<w:p><w:r><w:t>{TEXT_BOX}</w:t></w:r></w:p>'
+        '</w:txbxContent></v:textbox></v:shape></w:pict></mc:Fallback></mc:AlternateContent></w:r></w:p>'
+    )
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            content = source.read(item.filename)
+            if item.filename == "word/document.xml":
+                content = content.replace(b"<w:sectPr", box.encode() + b"<w:sectPr", 1)
+            target.writestr(item, content)
+    return out.getvalue()
+
+
+def build_documents(workdir: str, long_pages: int):
+    """(label, path, extension, pages, expected text) for every benchmark document"""
+    rng = random.Random(11)
+    documents = []
+    if os.path.isdir(SAMPLE_DATA):
+        with open(os.path.join(SAMPLE_DATA, "sample_resume.txt"), encoding="utf-8") as f:
+            expected = f.read()
+        for name in ("sample_resume.pdf", "sample_resume.txt"):
+            documents.append((name, os.path.join(SAMPLE_DATA, name), os.path.splitext(name)[1], None, expected))
+
+    for pages in (1, 5, long_pages):
+        content = resume_lines(rng, pages, pages)
+        path = os.path.join(workdir, f"synthetic_{pages}p.pdf")
+        with open(path, "wb") as f:
+            f.write(make_pdf(content))
+        documents.append((f"synthetic_{pages}p.pdf", path, ".pdf", pages, "\n".join(line for page in content for line in page)))
+
+    lines = [line for page in resume_lines(rng, 0, 2) for line in page]
+    table = [["Skill", "Level", "Years"], ["Python", "Expert", "8"], ["Kubernetes", "Intermediate", "3"]]
+    header = "Jane Doe - Curriculum Vitae"
+    path = os.path.join(workdir, "synthetic_table.docx")
+    with open(path, "wb") as f:
+        f.write(add_text_box(make_docx(lines, table, header)))
+    expected = "\n".join(lines + [" ".join(row) for row in table] + [header, TEXT_BOX])
+    documents.append(("synthetic_table.docx", path, ".docx", None, expected))
+    return documents
+
+
+def bench_backends(documents, repeat: int) -> list:
+    from app.services.extractors import registry
+
+    results = []
+    for label, path, extension, pages, expected in documents:
+        for extractor in registry.backends(extension):
+            try:
+                pages = pages or extractor.page_count(path) or 1
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    text = extractor.extract(path)
+                elapsed = (time.perf_counter() - started) / repeat
+            except Exception as e:
+                results.append({"document": label, "backend": extractor.name, "error": str(e)})
+                continue
+            results.append({
+                "document": label,
+                "backend": extractor.name,
+                "pages": pages,
+                "ms": round(elapsed * 1000, 2),
+                "pages_per_s": round(pages / elapsed, 1),
+                "recall": recall(expected, text),
+            })
+    return results
+
+
+async def bench_parallel(path: str, pages: int) -> dict:
+    from app.core.config import settings
+    from app.services.file_service import FileService
+
+    # Warm the pool so process start-up is not billed to either mode
+    await FileService.extract_text_from_path(path, ".pdf")
+    report = {}
+    for mode, chunk in (("single_task", 0), ("page_parallel", settings.extract_page_chunk)):
+        settings.extract_page_chunk = chunk
+        started = time.perf_counter()
+        text = await FileService.extract_text_from_path(path, ".pdf")
+        elapsed = time.perf_counter() - started
+        report[mode] = {"wall_time_s": round(elapsed, 3), "pages_per_s": round(pages / elapsed, 1), "chars": len(text)}
+    report["speedup"] = round(report["single_task"]["wall_time_s"] / report["page_parallel"]["wall_time_s"], 2)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--long-pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="parser processes")
+    parser.add_argument("--chunk", type=int, default=16, help="pages per parallel task")
+    args = parser.parse_args()
+
+    os.environ.update(EXTRACT_WORKERS=str(args.workers), EXTRACT_PAGE_CHUNK=str(args.chunk), EXTRACT_PARALLEL_MIN_BYTES="0")
+    workdir = tempfile.mkdtemp(prefix="bench_extraction_")
+    documents = build_documents(workdir, args.long_pages)
+
+    from app.services.file_service import FileService
+
+    report = {"workers": args.workers, "chunk": args.chunk}
+    try:
+        report["backends"] = bench_backends(documents, args.repeat)
+        long_pdf = os.path.join(workdir, f"synthetic_{args.long_pages}p.pdf")
+        report["long_pdf"] = asyncio.run(bench_parallel(long_pdf, args.long_pages))
+    finally:
+        FileService.shutdown()
+        for name in os.listdir(workdir):
+            os.remove(os.path.join(workdir, name))
+        os.rmdir(workdir)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Latency and token usage of staged vs fused analysis.
+
+Runs /api/analyze-match in-process against the mock Groq server with the
+result cache and single-flight disabled, once per analysis mode. ``staged`` makes one LLM call
+per stage; ``fused`` makes one structured-JSON call and only falls back to
+per-stage calls for sections that fail validation (``--drop-rate`` makes the
+mock corrupt sections to exercise that path).
+
+Staged calls for one request run in parallel, so fused mode mostly pays off
+in tokens and in throughput once ``LLM_MAX_CONCURRENCY`` is the bottleneck:
+
+    python benchmarks/bench_fused_analysis.py --requests 40 --concurrency 8 --llm-concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_groq_server import MockGroqConfig, MockGroqServer  # noqa: E402
+
+SAMPLE_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "sample_data")
+DB_PATH = "bench_fused_analysis.db"
+
+
+def load_pair():
+    with open(os.path.join(SAMPLE_DATA, "sample_resume.txt"), encoding="utf-8") as f:
+        resume = f.read()
+    with open(os.path.join(SAMPLE_DATA, "sample_job_description.txt"), encoding="utf-8") as f:
+        job_description = f.read()
+    return resume, job_description
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3, help="upstream seconds per call")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="upstream seconds per completion token")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="chance of each fused section being malformed")
+    parser.add_argument("--concurrency", type=int, default=1, help="requests in flight")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="LLM_MAX_CONCURRENCY for the app")
+    args = parser.parse_args()
+
+    server = MockGroqServer(config=MockGroqConfig(
+        latency=args.latency, token_latency=args.token_latency, drop_rate=args.drop_rate
+    )).start()
+    os.environ.update(
+        GROQ_API_KEY="bench",
+        GROQ_BASE_URL=server.base_url,
+        LLM_CACHE_ENABLED="false",
+        LLM_SINGLE_FLIGHT="false",
+        LLM_MAX_CONCURRENCY=str(args.llm_concurrency),
+        DATABASE_URL=f"sqlite:///./{DB_PATH}",
+    )
+
+    import httpx
+    from app.api import routes
+    from app.core.config import settings
+    from app.models.database import engine, init_db
+    from main import app
+
+    resume, job_description = load_pair()
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "llm_concurrency": args.llm_concurrency,
+        "upstream_latency": args.latency,
+        "drop_rate": args.drop_rate,
+    }
+
+    async def run() -> None:
+        await init_db()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for mode in ("staged", "fused"):
+                settings.analysis_mode = mode
+                routes.ai_service.fused_fallbacks.clear()
+                calls, prompt_tokens, completion_tokens = server.requests, server.prompt_tokens, server.completion_tokens
+                latencies = []
+                semaphore = asyncio.Semaphore(args.concurrency)
+
+                async def request(i: int) -> None:
+                    payload = {"resume_text": f"{resume}\nReference {mode}-{i}", "job_description": job_description}
+                    async with semaphore:
+                        started = time.perf_counter()
+                        response = await client.post("/api/analyze-match", json=payload)
+                        latencies.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{mode} request failed: {response.text}")
+
+                started = time.perf_counter()
+                await asyncio.gather(*[request(i) for i in range(args.requests)])
+                elapsed = time.perf_counter() - started
+                report[mode] = {
+                    "requests_per_s": round(args.requests / elapsed, 2),
+                    "p50_ms": round(statistics.median(latencies) * 1000, 1),
+                    "mean_ms": round(statistics.mean(latencies) * 1000, 1),
+                    "upstream_calls_per_request": round((server.requests - calls) / args.requests, 2),
+                    "prompt_tokens_per_request": round((server.prompt_tokens - prompt_tokens) / args.requests, 1),
+                    "completion_tokens_per_request": round((server.completion_tokens - completion_tokens) / args.requests, 1),
+                    "section_fallbacks": dict(routes.ai_service.fused_fallbacks),
+                }
+        await engine.dispose()
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.stop()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(DB_PATH + suffix):
+                os.remove(DB_PATH + suffix)
+    report["latency_speedup"] = round(report["staged"]["mean_ms"] / report["fused"]["mean_ms"], 2)
+    report["throughput_speedup"] = round(report["fused"]["requests_per_s"] / report["staged"]["requests_per_s"], 2)
+    report["prompt_token_ratio"] = round(
+        report["fused"]["prompt_tokens_per_request"] / report["staged"]["prompt_tokens_per_request"], 2
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Per-call latency of the hot helpers behind the API.
+
+- ``similarity_cold`` / ``similarity_warm``: ``AIService._calculate_similarity``
+  on unseen documents, then again on the same pairs once the tokenizer memo
+  holds them.
+- ``extract.<kind>.<backend>``: each installed extractor backend, called
+  directly on a synthetic PDF, DOCX and TXT resume.
+- ``file_service.<kind>``: ``FileService.extract_text_from_path``, which adds
+  the parser process pool and timeout handling.
+
+Reports p50/p95/p99 per benchmark as JSON and, like ``load_test.py``,
+can save the report and check it against a baseline:
+
+    python benchmarks/bench_micro.py --output micro.json
+    python benchmarks/bench_micro.py --baseline micro.json --tolerance 0.3
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import make_document, resume_lines  # noqa: E402
+from report import emit, summarize  # noqa: E402
+
+
+def timed_calls(func, args_list) -> tuple:
+    """Latency of each call and the total wall time"""
+    latencies = []
+    began = time.perf_counter()
+    for args in args_list:
+        started = time.perf_counter()
+        func(*args)
+        latencies.append(time.perf_counter() - started)
+    return latencies, time.perf_counter() - began
+
+
+async def timed_awaits(func, args_list) -> tuple:
+    latencies = []
+    began = time.perf_counter()
+    for args in args_list:
+        started = time.perf_counter()
+        await func(*args)
+        latencies.append(time.perf_counter() - started)
+    return latencies, time.perf_counter() - began
+
+
+def bench_similarity(pairs: int, pages: int, seed: int) -> dict:
+    from app.services.ai_service import AIService
+
+    rng = random.Random(seed)
+    docs = ["\n".join(line for page in resume_lines(rng, n, pages) for line in page) for n in range(pairs * 2)]
+    args_list = [(docs[2 * i], docs[2 * i + 1]) for i in range(pairs)]
+    ai_service = AIService()
+    cold = summarize(*timed_calls(ai_service._calculate_similarity, args_list), unit="us")
+    warm = summarize(*timed_calls(ai_service._calculate_similarity, args_list), unit="us")
+    return {"similarity_cold": cold, "similarity_warm": warm}
+
+
+def bench_extraction(work_dir: str, repeat: int, pages: int, seed: int) -> dict:
+    from app.services.extractors import registry
+    from app.services.file_service import FileService
+
+    rng = random.Random(seed)
+    paths = {}
+    for kind in ("pdf", "docx", "txt"):
+        paths[kind] = os.path.join(work_dir, f"resume.{kind}")
+        with open(paths[kind], "wb") as f:
+            f.write(make_document(rng, 0, kind, pages))
+
+    report = {}
+    for kind, path in paths.items():
+        for extractor in registry.backends(f".{kind}"):
+            try:
+                report[f"extract.{kind}.{extractor.name}"] = summarize(*timed_calls(extractor.extract, [(path,)] * repeat))
+            except Exception as e:
+                report[f"extract.{kind}.{extractor.name}"] = {"error": str(e)}
+
+    async def through_pool() -> None:
+        # Warm the pool so process start-up and parser imports are not billed to the run
+        for kind, path in paths.items():
+            await FileService.extract_text_from_path(path, f".{kind}")
+        for kind, path in paths.items():
+            latencies = await timed_awaits(FileService.extract_text_from_path, [(path, f".{kind}")] * repeat)
+            report[f"file_service.{kind}"] = summarize(*latencies)
+
+    try:
+        asyncio.run(through_pool())
+    finally:
+        FileService.shutdown()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=2000, help="document pairs for the similarity benchmarks")
+    parser.add_argument("--repeat", type=int, default=50, help="calls per extraction benchmark")
+    parser.add_argument("--pages", type=int, default=2, help="pages per synthetic resume")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="", help="write the JSON report here")
+    parser.add_argument("--baseline", default="", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    report = {"pairs": args.pairs, "repeat": args.repeat, "pages": args.pages}
+    report.update(bench_similarity(args.pairs, args.pages, args.seed))
+    work_dir = tempfile.mkdtemp(prefix="bench_micro_")
+    try:
+        report.update(bench_extraction(work_dir, args.repeat, args.pages, args.seed))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    sys.exit(emit(report, args.output, args.baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare the sparse matrix scoring engine with the per-pair similarity loop.
+
+Generates a synthetic corpus of resumes and JDs and scores every pair:
+
+    python benchmarks/bench_scoring_engine.py --resumes 1000 --jds 100
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.ai_service import AIService  # noqa: E402
+from app.services.scoring_engine import ScoringEngine  # noqa: E402
+from app.services.tokenizer import Tokenizer  # noqa: E402
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "react", "angular", "django", "flask",
+    "fastapi", "postgresql", "mysql", "mongodb", "redis", "aws", "gcp", "azure", "docker",
+    "kubernetes", "terraform", "spark", "kafka", "airflow", "pandas", "numpy", "pytorch",
+    "tensorflow", "graphql", "rest", "microservices", "linux", "git", "jenkins", "golang",
+    "rust", "scala", "hadoop", "tableau", "excel", "salesforce", "figma",
+]
+FILLER = (
+    "experienced engineer team delivered built designed led improved scalable systems "
+    "customers product stakeholders agile projects performance reliability quality "
+    "developed implemented maintained collaborated mentored architecture services data"
+).split()
+
+
+def make_document(rng: random.Random, words: int) -> str:
+    skills = rng.sample(SKILLS, rng.randint(5, 15))
+    body = [rng.choice(FILLER) for _ in range(words)] + skills * 2
+    rng.shuffle(body)
+    return " ".join(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=1000)
+    parser.add_argument("--jds", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    resumes = [make_document(rng, 400) for _ in range(args.resumes)]
+    jds = [make_document(rng, 150) for _ in range(args.jds)]
+    ai_service = AIService()
+
+    started = time.perf_counter()
+    loop = np.empty((len(resumes), len(jds)))
+    for i, resume in enumerate(resumes):
+        for j, jd in enumerate(jds):
+            loop[i, j] = ai_service._calculate_similarity(resume, jd)
+    loop_time = time.perf_counter() - started
+
+    tokenizer = Tokenizer()  # cold memo per run
+    engine = ScoringEngine(tokenizer.tokens, tokenizer.ids)
+    started = time.perf_counter()
+    matrix = engine.jaccard(resumes, jds)
+    ScoringEngine.top_k(matrix, args.top_k)
+    jaccard_time = time.perf_counter() - started
+
+    tokenizer = Tokenizer()  # cold memo per run
+    engine = ScoringEngine(tokenizer.tokens, tokenizer.ids)
+    started = time.perf_counter()
+    ScoringEngine.top_k(engine.tfidf_cosine(resumes, jds), args.top_k)
+    tfidf_time = time.perf_counter() - started
+
+    pairs = len(resumes) * len(jds)
+    report = {
+        "resumes": len(resumes),
+        "jds": len(jds),
+        "pairs": pairs,
+        "per_pair_loop": {"seconds": round(loop_time, 4), "pairs_per_sec": round(pairs / loop_time)},
+        "matrix_jaccard_top_k": {"seconds": round(jaccard_time, 4), "pairs_per_sec": round(pairs / jaccard_time)},
+        "matrix_tfidf_top_k": {"seconds": round(tfidf_time, 4), "pairs_per_sec": round(pairs / tfidf_time)},
+        "speedup_jaccard": round(loop_time / jaccard_time, 1),
+        "max_abs_diff": float(np.abs(loop - matrix).max()),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Build the candidate search index over a synthetic corpus and time queries.
+
+    python benchmarks/bench_search_index.py --docs 100000 --queries 50
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.ai_service import AIService  # noqa: E402
+from app.services.search_index import SearchIndex  # noqa: E402
+from bench_scoring_engine import make_document  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ai_service = AIService()
+    with tempfile.TemporaryDirectory() as index_dir:
+        index = SearchIndex(index_dir, ai_service.tokenize, ai_service.tokenizer_version)
+
+        docs = [(i + 1, make_document(rng, 300) + f" candidate{i}") for i in range(args.docs)]
+        started = time.perf_counter()
+        index.add_many(docs)
+        add_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index.flush()
+        flush_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index = SearchIndex(index_dir, ai_service.tokenize, ai_service.tokenizer_version)
+        load_time = time.perf_counter() - started
+
+        queries = [make_document(rng, 150) for _ in range(args.queries)]
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query, args.top_k)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(index_dir) for f in files)
+
+    report = {
+        "documents": args.docs,
+        "index_bytes": size,
+        "add_seconds": round(add_time, 2),
+        "flush_seconds": round(flush_time, 2),
+        "load_seconds": round(load_time, 3),
+        "query_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 2),
+            "p95": round(float(np.percentile(latencies, 95)), 2),
+            "max": round(max(latencies), 2),
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
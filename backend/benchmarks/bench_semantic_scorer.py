@@ -0,0 +1,113 @@
+"""Throughput of the embedding scorer against the Jaccard matrix scorer.
+
+Scores every resume x JD pair of a synthetic corpus three ways:
+
+* ``jaccard``: the sparse word-set matrix used by the default scorer
+* ``semantic_cold``: embeds every document, then one dense matrix product
+* ``semantic_warm``: a fresh scorer reading the same vectors back from the
+  memory-mapped store, as after a restart
+
+Matrix products use every core the BLAS library is allowed; set
+``OMP_NUM_THREADS`` to compare thread counts:
+
+    python benchmarks/bench_semantic_scorer.py --resumes 2000 --jds 200
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import SKILLS, TITLES, resume_lines  # noqa: E402
+
+from app.services.ai_service import AIService  # noqa: E402
+from app.services.embeddings import EmbeddingStore, HashingEmbedder, SemanticScorer  # noqa: E402
+from app.services.scoring_engine import ScoringEngine  # noqa: E402
+
+# A JD and two resumes that differ only in how they spell the same skills
+SYNONYM_JD = "Backend Engineer\nRequirements:\n- Kubernetes and PostgreSQL in production\n- JavaScript and Node.js services"
+SYNONYM_RESUME = "Backend Engineer\nSkills: k8s, postgres, js, node\nExperience:\nRan services on k8s backed by postgres"
+UNRELATED_RESUME = "Pastry Chef\nSkills: baking, lamination, plating\nExperience:\nRan the dessert station of a bistro"
+
+
+def make_jd(rng: random.Random, n: int) -> str:
+    skills = rng.sample(SKILLS, 6)
+    return "\n".join([
+        f"{rng.choice(TITLES)} #{n}",
+        "About us:",
+        "We are a fast-growing company with a friendly culture.",
+        "Requirements:",
+        *[f"- {rng.randint(2, 6)}+ years with {skill}" for skill in skills[:4]],
+        "Nice to have:",
+        *[f"- {skill}" for skill in skills[4:]],
+        "Benefits:",
+        "Health insurance, remote work, learning budget.",
+    ])
+
+
+def rate(pairs: int, seconds: float) -> dict:
+    return {"seconds": round(seconds, 4), "pairs_per_sec": round(pairs / seconds)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--jds", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    resumes = ["\n".join(line for page in resume_lines(rng, n) for line in page) for n in range(args.resumes)]
+    jds = [make_jd(rng, n) for n in range(args.jds)]
+    pairs = len(resumes) * len(jds)
+    ai_service = AIService()
+    store_dir = tempfile.mkdtemp(prefix="embedding_store_")
+
+    try:
+        started = time.perf_counter()
+        ScoringEngine(ai_service.tokenize).jaccard(resumes, jds)
+        jaccard_time = time.perf_counter() - started
+
+        embedder = HashingEmbedder(args.dim)
+        scorer = SemanticScorer(embedder, EmbeddingStore(store_dir, args.dim))
+        started = time.perf_counter()
+        scorer.similarity(resumes, jds)
+        cold_time = time.perf_counter() - started
+
+        scorer = SemanticScorer(embedder, EmbeddingStore(store_dir, args.dim))
+        started = time.perf_counter()
+        warm = scorer.similarity(resumes, jds)
+        warm_time = time.perf_counter() - started
+
+        synonym = scorer.to_unit(scorer.similarity([SYNONYM_RESUME, UNRELATED_RESUME], [SYNONYM_JD]))[:, 0]
+        jaccard_synonym = ScoringEngine(ai_service.tokenize).jaccard([SYNONYM_RESUME, UNRELATED_RESUME], [SYNONYM_JD])[:, 0]
+        report = {
+            "resumes": len(resumes),
+            "jds": len(jds),
+            "pairs": pairs,
+            "cpu_count": os.cpu_count(),
+            "embedder": embedder.name,
+            "jaccard": rate(pairs, jaccard_time),
+            "semantic_cold": rate(pairs, cold_time),
+            "semantic_warm": rate(pairs, warm_time),
+            "store": scorer.store.stats(),
+            "mean_cosine": round(float(warm.mean()), 4),
+            "synonym_check": {
+                "semantic": {"synonyms": round(float(synonym[0]), 3), "unrelated": round(float(synonym[1]), 3)},
+                "jaccard": {"synonyms": round(float(jaccard_synonym[0]), 3), "unrelated": round(float(jaccard_synonym[1]), 3)},
+            },
+        }
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Fire N identical requests at the API and count upstream Groq calls.
+
+Runs the app in-process against the mock Groq server with the result cache
+disabled, once with single-flight coalescing and once without:
+
+    python benchmarks/bench_single_flight.py --requests 50 --latency 0.3
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_groq_server import MockGroqConfig, MockGroqServer  # noqa: E402
+
+
+async def fire(app, path: str, payload: dict, n: int) -> float:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[client.post(path, json=payload) for _ in range(n)])
+        elapsed = time.perf_counter() - started
+    failed = [r.status_code for r in responses if r.status_code != 200]
+    if failed:
+        raise RuntimeError(f"{len(failed)} requests failed: {failed[:5]}")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--endpoint", choices=["summarize-resume", "analyze-match"], default="summarize-resume")
+    args = parser.parse_args()
+
+    server = MockGroqServer(config=MockGroqConfig(latency=args.latency)).start()
+    os.environ.update(
+        GROQ_API_KEY="bench",
+        GROQ_BASE_URL=server.base_url,
+        LLM_CACHE_ENABLED="false",
+        LLM_MAX_CONCURRENCY=str(args.requests * 5),
+        DATABASE_URL="sqlite:///./bench_single_flight.db",
+    )
+
+    from app.api import routes
+    from app.models.database import engine, init_db
+    from app.services.single_flight import SingleFlight
+    from main import app
+
+    payload = {"resume_text": "Senior Python engineer with 8 years of FastAPI and React experience."}
+    if args.endpoint == "analyze-match":
+        payload["job_description"] = "Looking for a Python backend engineer with FastAPI experience."
+
+    report = {"endpoint": args.endpoint, "requests": args.requests, "upstream_latency": args.latency}
+    async def run() -> None:
+        await init_db()
+        for mode in ("without_single_flight", "with_single_flight"):
+            routes.ai_service.flight = SingleFlight() if mode == "with_single_flight" else None
+            before = server.requests
+            elapsed = await fire(app, f"/api/{args.endpoint}", payload, args.requests)
+            report[mode] = {
+                "upstream_calls": server.requests - before,
+                "wall_time_s": round(elapsed, 3),
+            }
+        await engine.dispose()
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.stop()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists("bench_single_flight.db" + suffix):
+                os.remove("bench_single_flight.db" + suffix)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
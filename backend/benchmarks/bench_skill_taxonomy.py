@@ -0,0 +1,169 @@
+"""Accuracy and latency of the local skill taxonomy against the LLM skills match.
+
+Scores the sample resume against the sample JD, a data engineering JD it
+fits poorly and a JD whose non-requirement lines use words that are also
+skill names ("Go to the office", "rest assured"). Each reply is compared
+with hand-labelled perfect/partial/missing/bonus skills. Labels are
+normalized by a small synonym table of this script, not by the taxonomy,
+so the taxonomy is not graded against itself. The LLM side runs only when
+``GROQ_API_KEY`` is set:
+
+    GROQ_API_KEY=gsk_... python benchmarks/bench_skill_taxonomy.py --llm-runs 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.services import skill_taxonomy  # noqa: E402
+from app.services.ai_service import AIService  # noqa: E402
+from app.services.job_openings import _flatten  # noqa: E402
+
+SAMPLE_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "sample_data")
+DATA_ENGINEER_JD = """Senior Data Engineer
+
+Requirements:
+- 4+ years with Python and SQL
+- Apache Spark and Kafka for streaming pipelines
+- Airflow or dbt for orchestration
+- Snowflake or Redshift data warehouses
+- Terraform for infrastructure
+
+Nice to have:
+- Kubernetes
+- Scala
+"""
+OFFICE_JD = """Backend Engineer
+
+Requirements:
+- 3+ years building services in Python
+- Experience with PostgreSQL
+- Go to the office twice a week
+- Rest assured, we keep meetings short
+- Please express interest by sending your resume
+- Spring and summer hackathons
+"""
+# Labelled by reading the JD and resume, not from matcher output. "ignore"
+# lists skills a reviewer could put either way; they are not scored.
+GOLD = {
+    "sample_job_description": {
+        "perfect_match": {"JavaScript", "TypeScript", "React", "Node.js", "Python", "PostgreSQL", "MongoDB",
+                          "RESTful APIs", "microservices", "Git"},
+        "partial_match": set(),
+        "missing_skills": set(),
+        "bonus_skills": {"AWS", "Docker", "CI/CD", "Jest", "agile", "WebSockets"},
+        "ignore": {"GCP", "Azure", "DevOps", "Cypress"},
+    },
+    "data_engineer": {
+        "perfect_match": {"Python", "SQL"},
+        "partial_match": set(),
+        "missing_skills": {"Apache Spark", "Kafka", "Airflow", "Snowflake", "Terraform"},
+        "bonus_skills": {"Kubernetes"},
+        "ignore": {"dbt", "Redshift", "Scala"},
+    },
+    "office_policy": {
+        "perfect_match": {"Python", "PostgreSQL"},
+        "partial_match": set(),
+        "missing_skills": set(),
+        "bonus_skills": set(),
+        "ignore": set(),
+    },
+}
+# Spellings a reply may use for the same skill, after _key()
+SYNONYMS = {
+    "reactjs": "react", "nodejs": "node", "node": "node", "postgres": "postgresql", "restfulapis": "rest",
+    "restfulapi": "rest", "restapis": "rest", "restful": "rest", "microservice": "microservices",
+    "apachespark": "spark", "pyspark": "spark", "apachekafka": "kafka", "apacheairflow": "airflow",
+    "amazonwebservices": "aws", "googlecloud": "gcp", "googlecloudplatform": "gcp", "k8s": "kubernetes",
+    "containerization": "docker", "websocket": "websockets", "scrum": "agile", "cicdpipelines": "cicd",
+    "golang": "go", "github": "git",
+}
+
+
+def _key(item: str) -> str:
+    return re.sub(r"[^a-z0-9+#]", "", item.lower())
+
+
+def _label(item: str) -> str:
+    """Comparable name of a reply item: the first skill named, without annotations"""
+    item = re.split(r"\s+\(|\s+or\s+", item.strip(), maxsplit=1)[0]
+    key = _key(item)
+    return SYNONYMS.get(key, key)
+
+
+def accuracy(result: dict, gold: dict) -> dict:
+    """Micro-averaged precision/recall/F1 over (category, skill) labels"""
+    categories = [category for category in gold if category != "ignore"]
+    ignored = {_label(skill) for skill in gold["ignore"]}
+    predicted = {
+        (category, _label(item)) for category in categories for item in _flatten(result.get(category, []))
+    }
+    predicted = {(category, label) for category, label in predicted if label not in ignored}
+    expected = {(category, _label(skill)) for category in categories for skill in gold[category]}
+    hits = len(predicted & expected)
+    precision = hits / len(predicted) if predicted else 1.0
+    recall = hits / len(expected) if expected else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": round(precision, 3), "recall": round(recall, 3), "f1": round(f1, 3)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=1000, help="taxonomy matches timed per pair")
+    parser.add_argument("--llm-runs", type=int, default=1, help="LLM calls timed per pair")
+    args = parser.parse_args()
+
+    with open(os.path.join(SAMPLE_DATA, "sample_resume.txt"), encoding="utf-8") as f:
+        resume = f.read()
+    with open(os.path.join(SAMPLE_DATA, "sample_job_description.txt"), encoding="utf-8") as f:
+        sample_jd = f.read()
+    pairs = {"sample_job_description": sample_jd, "data_engineer": DATA_ENGINEER_JD, "office_policy": OFFICE_JD}
+
+    settings.llm_cache_enabled = False
+    ai_service = AIService()
+    report = {"taxonomy_version": skill_taxonomy.TAXONOMY_VERSION, "pairs": {}}
+    for name, job_description in pairs.items():
+        result = skill_taxonomy.match_skills(resume, job_description)
+        started = time.perf_counter()
+        for _ in range(args.runs):
+            skill_taxonomy.match_skills(resume, job_description)
+        taxonomy_us = (time.perf_counter() - started) / args.runs * 1e6
+        _, confident = ai_service.taxonomy_skills_match(resume, job_description)
+        entry = {
+            "taxonomy": {
+                "latency_us": round(taxonomy_us, 1),
+                "accuracy": accuracy(result, GOLD[name]),
+                "taxonomy_confidence": result["taxonomy_confidence"],
+                "skips_llm": confident,
+                "result": {key: result[key] for key in ("perfect_match", "partial_match", "missing_skills", "bonus_skills")},
+            },
+            "llm": None,
+        }
+        if ai_service.client:
+            settings.skill_taxonomy_match = False
+            latencies = []
+            for _ in range(args.llm_runs):
+                started = time.perf_counter()
+                llm_result = asyncio.run(ai_service.analyze_skills_match(resume, job_description))
+                latencies.append(time.perf_counter() - started)
+            settings.skill_taxonomy_match = True
+            entry["llm"] = {
+                "latency_us": round(statistics.median(latencies) * 1e6, 1),
+                "accuracy": accuracy(llm_result, GOLD[name]),
+            }
+            entry["speedup"] = round(entry["llm"]["latency_us"] / taxonomy_us)
+        report["pairs"][name] = entry
+    if not ai_service.client:
+        report["llm_skipped"] = "GROQ_API_KEY not configured"
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
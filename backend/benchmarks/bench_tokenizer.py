@@ -0,0 +1,102 @@
+"""Micro-benchmark of the tokenizer against the old two-pass preprocessing.
+
+Times three ways of producing tokens for a synthetic corpus:
+
+* ``legacy``: lower-case, two ``re.sub`` passes and ``split()``, on every call
+* ``tokenizer_cold``: the single-pass tokenizer with an empty memo
+* ``tokenizer_warm``: the same documents again, served from the memo
+
+and the per-pair word-set Jaccard loop, which re-tokenized both documents
+for every pair before the memo:
+
+    python benchmarks/bench_tokenizer.py --docs 2000 --pairs 20000
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import resume_lines  # noqa: E402
+
+from app.services.tokenizer import Tokenizer  # noqa: E402
+
+TECH_TERMS = ["c++", "c#", "node.js", ".net", "ci/cd"]
+
+
+def legacy_tokenize(text: str) -> list:
+    """AIService._preprocess_text(text).split() before the tokenizer module"""
+    text = re.sub(r'[^a-zA-Z0-9\s]', ' ', text.lower())
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.split()
+
+
+def jaccard(words1: set, words2: set) -> float:
+    union = len(words1 | words2)
+    return len(words1 & words2) / union if union else 0.0
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--pairs", type=int, default=20000)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = ["\n".join(line for page in resume_lines(rng, n, args.pages) for line in page) for n in range(args.docs)]
+    pairs = [(rng.randrange(len(docs)), rng.randrange(len(docs))) for _ in range(args.pairs)]
+
+    legacy_time = timed(lambda: [legacy_tokenize(doc) for doc in docs])
+    tokenizer = Tokenizer(cache_size=len(docs))
+    cold_time = timed(lambda: [tokenizer.tokens(doc) for doc in docs])
+    warm_time = timed(lambda: [tokenizer.tokens(doc) for doc in docs])
+    stemming = Tokenizer(stemming=True, cache_size=len(docs))
+    stem_time = timed(lambda: [stemming.tokens(doc) for doc in docs])
+
+    legacy_pairs = timed(lambda: [
+        jaccard(set(legacy_tokenize(docs[i])), set(legacy_tokenize(docs[j]))) for i, j in pairs
+    ])
+    memo_pairs = timed(lambda: [
+        jaccard(set(a.tolist()), set(b.tolist())) for a, b in (tokenizer.ids([docs[i], docs[j]]) for i, j in pairs)
+    ])
+
+    sample = "Senior engineer: C++, C#, Node.js and .NET services, CI/CD pipelines."
+    report = {
+        "docs": len(docs),
+        "avg_doc_chars": round(sum(map(len, docs)) / len(docs)),
+        "us_per_doc": {
+            "legacy": round(legacy_time / len(docs) * 1e6, 1),
+            "tokenizer_cold": round(cold_time / len(docs) * 1e6, 1),
+            "tokenizer_cold_stemming": round(stem_time / len(docs) * 1e6, 1),
+            "tokenizer_warm": round(warm_time / len(docs) * 1e6, 1),
+        },
+        "pairwise_jaccard": {
+            "pairs": len(pairs),
+            "legacy_pairs_per_sec": round(len(pairs) / legacy_pairs),
+            "memo_pairs_per_sec": round(len(pairs) / memo_pairs),
+            "speedup": round(legacy_pairs / memo_pairs, 1),
+        },
+        "tech_terms_kept": {
+            "legacy": [term for term in TECH_TERMS if term in legacy_tokenize(sample)],
+            "tokenizer": [term for term in TECH_TERMS if term in Tokenizer().terms(sample)],
+        },
+        "tokenizer_stats": tokenizer.stats(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Synthetic resume documents (PDF, DOCX, TXT) for the extraction benchmarks"""
+import io
+import random
+from typing import List, Optional
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "React", "Node.js", "Django", "FastAPI",
+    "PostgreSQL", "MongoDB", "Docker", "Kubernetes", "AWS", "Azure", "GCP", "Terraform",
+    "Go", "Rust", "C++", "C#", "Kafka", "Spark", "Airflow", "TensorFlow", "PyTorch", "SQL",
+]
+TITLES = ["Software Engineer", "Data Engineer", "Backend Developer", "Full Stack Developer", "ML Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+
+
+def resume_lines(rng: random.Random, n: int, pages: int = 1) -> List[List[str]]:
+    """Text of one resume as a list of pages, each a list of lines"""
+    title = rng.choice(TITLES)
+    result = []
+    for page in range(pages):
+        lines = [f"Candidate {n} - {title}", f"Email: candidate{n}@example.com"] if page == 0 else []
+        lines.append("Skills: " + ", ".join(rng.sample(SKILLS, 8)))
+        for _ in range(4):
+            years = rng.randint(1, 6)
+            lines.append(f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)} ({years} years)")
+            lines.append(
+                f"Built services in {rng.choice(SKILLS)} and {rng.choice(SKILLS)}, "
+                f"improving throughput by {rng.randint(10, 90)}% for {rng.randint(2, 50)} teams."
+            )
+        result.append(lines)
+    return result
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Minimal PDF with one Helvetica text stream per page"""
+    objects = [b"", b""]  # catalog and page tree are filled in last
+    font_id = 3
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    page_ids = []
+    for lines in pages:
+        body = "BT /F1 10 Tf 14 TL 50 780 Td " + " ".join(f"({_pdf_escape(line)}) '" for line in lines) + " ET"
+        stream = body.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (font_id, content_id)
+        )
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, obj))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_docx(paragraphs: List[str], table: Optional[List[List[str]]] = None, header: Optional[str] = None) -> bytes:
+    from docx import Document
+
+    doc = Document()
+    if header:
+        doc.sections[0].header.paragraphs[0].text = header
+    for paragraph in paragraphs:
+        doc.add_paragraph(paragraph)
+    if table:
+        grid = doc.add_table(rows=len(table), cols=len(table[0]))
+        for r, row in enumerate(table):
+            for c, value in enumerate(row):
+                grid.cell(r, c).text = value
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def make_document(rng: random.Random, n: int, kind: str, pages: int = 1) -> bytes:
+    """One synthetic resume of the given kind: pdf, docx or txt"""
+    content = resume_lines(rng, n, pages)
+    if kind == "pdf":
+        return make_pdf(content)
+    lines = [line for page in content for line in page]
+    if kind == "docx":
+        return make_docx(lines)
+    return "\n".join(lines).encode("utf-8")
@@ -0,0 +1,229 @@
+"""Open-loop load test of the API at a target request rate.
+
+Sends a weighted mix of ``POST /api/analyze-match``, ``POST /api/upload-resume``
+and ``GET /api/analyses`` at ``--rps`` for ``--duration`` seconds. Requests
+are launched on schedule whether or not earlier ones have finished, and each
+latency is measured from its scheduled start, so a saturated server shows up
+as growing latency instead of a quietly lower request rate.
+
+By default the app runs in-process against the mock Groq server, with its
+database, caches and indexes in a temporary directory. Pass ``--url`` to load
+a running server instead; point that server at ``mock_groq_server.py`` to
+keep it off the real API. In-process the generator shares the app's event
+loop, so at high rates ``--url`` gives the more faithful numbers.
+
+Reports p50/p95/p99 latency and throughput per endpoint as JSON. ``--output``
+saves the report; ``--baseline`` compares it with a saved one and exits 1 on
+a regression beyond ``--tolerance``:
+
+    python benchmarks/load_test.py --rps 20 --duration 30 --output baseline.json
+    python benchmarks/load_test.py --rps 20 --duration 30 --baseline baseline.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import make_document  # noqa: E402
+from mock_groq_server import MockGroqConfig, MockGroqServer  # noqa: E402
+from report import emit, summarize  # noqa: E402
+
+SAMPLE_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "sample_data")
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "txt": "text/plain",
+}
+ENDPOINTS = ("analyze", "upload", "list")
+
+
+def load_pair():
+    with open(os.path.join(SAMPLE_DATA, "sample_resume.txt"), encoding="utf-8") as f:
+        resume = f.read()
+    with open(os.path.join(SAMPLE_DATA, "sample_job_description.txt"), encoding="utf-8") as f:
+        job_description = f.read()
+    return resume, job_description
+
+
+def parse_mix(mix: str) -> dict:
+    """``analyze=1,upload=1,list=2`` -> endpoint weights"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint {name!r} in --mix, expected one of {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+class LoadGenerator:
+    """Fires requests on a fixed schedule and records their outcome per endpoint"""
+
+    def __init__(self, client, resume: str, job_description: str, uploads: list, seed: int = 7):
+        self.client = client
+        self.resume = resume
+        self.job_description = job_description
+        self.uploads = uploads
+        self.rng = random.Random(seed)
+        self.latencies = {name: [] for name in ENDPOINTS}
+        self.statuses = {name: {} for name in ENDPOINTS}
+
+    async def send(self, endpoint: str, i: int):
+        if endpoint == "analyze":
+            # A unique resume per request so the LLM cache and single-flight cannot answer it
+            payload = {"resume_text": f"{self.resume}\nReference {i}", "job_description": self.job_description}
+            return await self.client.post("/api/analyze-match", json=payload)
+        if endpoint == "upload":
+            name, data = self.uploads[i % len(self.uploads)]
+            content_type = CONTENT_TYPES[name.rsplit(".", 1)[1]]
+            return await self.client.post("/api/upload-resume", files={"file": (name, data, content_type)})
+        return await self.client.get("/api/analyses", params={"limit": 20})
+
+    async def fire(self, endpoint: str, i: int, scheduled: float) -> None:
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        try:
+            status = str((await self.send(endpoint, i)).status_code)
+        except Exception as e:
+            status = type(e).__name__
+        self.latencies[endpoint].append(time.perf_counter() - scheduled)
+        self.statuses[endpoint][status] = self.statuses[endpoint].get(status, 0) + 1
+
+    async def run(self, weights: dict, rps: float, duration: float) -> dict:
+        names = list(weights)
+        total = int(rps * duration)
+        started = time.perf_counter()
+        tasks = [
+            asyncio.ensure_future(self.fire(endpoint, i, started + i / rps))
+            for i, endpoint in enumerate(self.rng.choices(names, list(weights.values()), k=total))
+        ]
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        endpoints = {}
+        for name in names:
+            statuses = self.statuses[name]
+            errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+            endpoints[name] = {**summarize(self.latencies[name], elapsed), "errors": errors, "status": statuses}
+        every = [latency for name in names for latency in self.latencies[name]]
+        return {
+            "requests": total,
+            "elapsed_s": round(elapsed, 2),
+            "overall": {**summarize(every, elapsed), "errors": sum(e["errors"] for e in endpoints.values())},
+            "endpoints": endpoints,
+        }
+
+
+def build_uploads(count: int, pages: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    kinds = ("pdf", "docx", "txt")
+    return [(f"resume_{i}.{kinds[i % 3]}", make_document(rng, i, kinds[i % 3], pages)) for i in range(count)]
+
+
+async def run_in_process(args, generator_args: tuple) -> dict:
+    import httpx
+    from app.models.database import engine, init_db
+    from main import app
+
+    await init_db()
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+            return await drive(client, args, generator_args)
+    finally:
+        await engine.dispose()
+
+
+async def run_remote(args, generator_args: tuple) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        return await drive(client, args, generator_args)
+
+
+async def drive(client, args, generator_args: tuple) -> dict:
+    generator = LoadGenerator(client, *generator_args, seed=args.seed)
+    # One of each first, so parser process and connection start-up are not billed to the run
+    for i, endpoint in enumerate(ENDPOINTS):
+        await generator.send(endpoint, -1 - i)
+    return await generator.run(args.weights, args.rps, args.duration)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=10.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--mix", default="analyze=1,upload=1,list=2", help="endpoint weights")
+    parser.add_argument("--url", default="", help="load a running server instead of the in-process app")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout with --url")
+    parser.add_argument("--latency", type=float, default=0.3, help="mock upstream seconds per call")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="mock upstream seconds per completion token")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock upstream calls answered with 503")
+    parser.add_argument("--tokens", type=int, default=64, help="completion tokens per plain-text mock reply")
+    parser.add_argument("--cache", action="store_true", help="keep the LLM and extraction caches on (cold at start)")
+    parser.add_argument("--uploads", type=int, default=30, help="distinct synthetic resumes to upload")
+    parser.add_argument("--pages", type=int, default=2, help="pages per synthetic resume")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="", help="write the JSON report here")
+    parser.add_argument("--baseline", default="", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+    args.weights = parse_mix(args.mix)
+
+    resume, job_description = load_pair()
+    generator_args = (resume, job_description, build_uploads(args.uploads, args.pages, args.seed))
+    report = {
+        "target_rps": args.rps,
+        "duration_s": args.duration,
+        "mix": args.weights,
+        "target": args.url or "in-process",
+    }
+
+    if args.url:
+        report.update(asyncio.run(run_remote(args, generator_args)))
+        sys.exit(emit(report, args.output, args.baseline, args.tolerance))
+
+    server = MockGroqServer(config=MockGroqConfig(
+        latency=args.latency, error_rate=args.error_rate, tokens=args.tokens, token_latency=args.token_latency
+    )).start()
+    work_dir = tempfile.mkdtemp(prefix="load_test_")
+    cache = "true" if args.cache else "false"
+    os.environ.update(
+        GROQ_API_KEY="load-test",
+        GROQ_BASE_URL=server.base_url,
+        DATABASE_URL=f"sqlite:///{os.path.join(work_dir, 'load_test.db')}",
+        LLM_CACHE_ENABLED=cache,
+        LLM_CACHE_PATH=os.path.join(work_dir, "llm_cache.db"),
+        EXTRACTION_CACHE_ENABLED=cache,
+        EXTRACTION_CACHE_PATH=os.path.join(work_dir, "extraction_cache.db"),
+        EMBEDDING_STORE_DIR=os.path.join(work_dir, "embedding_store"),
+        SEARCH_INDEX_DIR=os.path.join(work_dir, "search_index"),
+    )
+    from app.services.file_service import FileService
+
+    try:
+        report.update(asyncio.run(run_in_process(args, generator_args)))
+    finally:
+        FileService.shutdown()
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    report["upstream"] = {
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "calls": server.requests,
+        "errors": server.errors,
+        "completion_tokens": server.completion_tokens,
+    }
+    sys.exit(emit(report, args.output, args.baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
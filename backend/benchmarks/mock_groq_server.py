@@ -0,0 +1,238 @@
+"""Local stand-in for the Groq chat-completions API.
+
+Run it and point the backend at it to exercise the LLM transport without
+spending real quota:
+
+    python benchmarks/mock_groq_server.py --port 8900 --latency 0.5
+    GROQ_API_KEY=test GROQ_BASE_URL=http://127.0.0.1:8900 uvicorn main:app
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+CHAT_PATH = "/openai/v1/chat/completions"
+
+JSON_REPLY = {
+    "perfect_match": ["Python", "React"],
+    "partial_match": ["Django"],
+    "missing_skills": ["Kubernetes"],
+    "bonus_skills": ["AWS"],
+    "confidence_level": "Medium",
+}
+
+# Reply to the fused analysis prompt, which asks for all sections at once
+FUSED_REPLY = {
+    "resume_summary": "Backend engineer with strong Python and React experience.",
+    "skills_match": JSON_REPLY,
+    "experience_match": {
+        "years_experience": "5+ years vs 5+ required",
+        "role_level": "Senior",
+        "overall_assessment": "Meets the experience requirements",
+    },
+    "interview_insights": {
+        "discussion_topics": ["System design", "Team leadership"],
+        "candidate_strengths": ["Python", "React"],
+        "areas_for_improvement": ["Kubernetes"],
+        "technical_questions": ["How would you scale the API?"],
+        "behavioral_questions": ["Describe a conflict you resolved"],
+        "cultural_fit": "Good",
+    },
+}
+
+
+class MockGroqConfig:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        tokens: int = 64,
+        token_delay: float = 0.0,
+        token_latency: float = 0.0,
+        drop_rate: float = 0.0,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.tokens = tokens
+        self.token_delay = token_delay  # seconds between streamed chunks
+        self.token_latency = token_latency  # extra seconds per completion token of a non-streamed reply
+        self.drop_rate = drop_rate  # chance of each fused reply section being malformed
+
+
+class MockGroqServer:
+    """Threaded HTTP server that mimics ``POST /openai/v1/chat/completions``"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: Optional[MockGroqConfig] = None):
+        self.config = config or MockGroqConfig()
+        self.requests = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockGroqServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockGroqServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        messages = body.get("messages", [])
+        system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        prompt_chars = sum(len(m.get("content", "")) for m in messages)
+        if "resume_summary" in system:
+            reply = dict(FUSED_REPLY)
+            for key in list(reply):
+                if random.random() < self.config.drop_rate:
+                    reply[key] = "malformed"
+            content = json.dumps(reply)
+            completion_tokens = len(content) // 4
+        elif "json" in system.lower():
+            content = json.dumps(JSON_REPLY)
+            completion_tokens = len(content) // 4
+        else:
+            content = " ".join(["token"] * self.config.tokens)
+            completion_tokens = self.config.tokens
+        with self._lock:
+            self.prompt_tokens += prompt_chars // 4
+            self.completion_tokens += completion_tokens
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_chars // 4,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_chars // 4 + completion_tokens,
+            },
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, payload: Dict[str, Any]) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, completion: Dict[str, Any]) -> None:
+                # Server-sent events with chunked transfer encoding, one
+                # chunk per word of the reply
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                words = completion["choices"][0]["message"]["content"].split(" ")
+                for i, word in enumerate(words):
+                    chunk = {
+                        "id": completion["id"],
+                        "object": "chat.completion.chunk",
+                        "created": completion["created"],
+                        "model": completion["model"],
+                        "choices": [{
+                            "index": 0,
+                            "delta": {"content": word if i == 0 else " " + word},
+                            "finish_reason": None,
+                        }],
+                    }
+                    self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+                    if server.config.token_delay:
+                        time.sleep(server.config.token_delay)
+                self._write_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, text: str) -> None:
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.rstrip("/") != CHAT_PATH:
+                    self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+
+                with server._lock:
+                    server.requests += 1
+                if server.config.latency:
+                    time.sleep(server.config.latency)
+                if random.random() < server.config.error_rate:
+                    with server._lock:
+                        server.errors += 1
+                    self._send(503, {"error": {"message": "Mock upstream overloaded"}})
+                    return
+                completion = server._completion(body)
+                if body.get("stream"):
+                    self._send_stream(completion)
+                else:
+                    if server.config.token_latency:
+                        time.sleep(server.config.token_latency * completion["usage"]["completion_tokens"])
+                    self._send(200, completion)
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before replying")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--tokens", type=int, default=64, help="completion tokens per reply")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed chunks")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="seconds per completion token of a non-streamed reply")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="chance of each fused reply section being malformed")
+    args = parser.parse_args()
+
+    config = MockGroqConfig(args.latency, args.error_rate, args.tokens, args.token_delay, args.token_latency, args.drop_rate)
+    server = MockGroqServer(args.host, args.port, config)
+    print(f"Mock Groq server listening on {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Latency summaries and baseline comparison shared by the load and micro benchmarks.
+
+Reports are plain JSON. Keys ending in ``_ms`` or ``_us`` are latencies, so
+higher is worse; keys ending in ``_per_s`` are throughput, so lower is worse.
+``compare`` walks two reports and lists every such value that moved the wrong
+way by more than the tolerance; ``max_`` latencies are too noisy to compare.
+"""
+import json
+import math
+from typing import Any, Dict, List, Sequence
+
+SCALES = {"ms": 1e3, "us": 1e6}
+# Latency changes smaller than this (in seconds) are timer noise, whatever the ratio
+MIN_LATENCY_DELTA = 50e-6
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies: Sequence[float], elapsed: float, unit: str = "ms") -> Dict[str, float]:
+    """Count, throughput and latency percentiles of samples given in seconds"""
+    ordered = sorted(latencies)
+    scale = SCALES[unit]
+    digits = 3 if unit == "ms" else 1
+    summary = {"count": len(ordered), "throughput_per_s": round(len(ordered) / elapsed, 2) if elapsed else 0.0}
+    if ordered:
+        summary.update({
+            f"mean_{unit}": round(sum(ordered) / len(ordered) * scale, digits),
+            f"p50_{unit}": round(percentile(ordered, 50) * scale, digits),
+            f"p95_{unit}": round(percentile(ordered, 95) * scale, digits),
+            f"p99_{unit}": round(percentile(ordered, 99) * scale, digits),
+            f"max_{unit}": round(ordered[-1] * scale, digits),
+        })
+    return summary
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, path: str = "") -> List[str]:
+    """Regressions of ``current`` against ``baseline`` beyond ``tolerance`` (0.2 = 20%)"""
+    regressions = []
+    for key, old in baseline.items():
+        new = current.get(key)
+        name = f"{path}.{key}" if path else key
+        if isinstance(old, dict) and isinstance(new, dict):
+            regressions += compare(new, old, tolerance, name)
+        elif not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or old <= 0:
+            continue
+        elif (key.endswith(("_ms", "_us")) and not key.startswith("max_") and new > old * (1 + tolerance)
+              and (new - old) / SCALES[key[-2:]] >= MIN_LATENCY_DELTA):
+            regressions.append(f"{name}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+        elif key.endswith("_per_s") and new < old * (1 - tolerance):
+            regressions.append(f"{name}: {old} -> {new} ({(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def emit(report: Dict[str, Any], output: str = "", baseline: str = "", tolerance: float = 0.2) -> int:
+    """Print the report, optionally save it and check it against a baseline; returns the exit code"""
+    if baseline:
+        with open(baseline, encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), tolerance)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 1 if report.get("regressions") else 0
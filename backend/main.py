@@ -1,7 +1,16 @@
+import time
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
+from fastapi.responses import PlainTextResponse
+from app.api.routes import router, ai_service, flush_search_index, job_queue
 from app.core.config import settings
+from app.core.logs import configure_logging
+from app.core.metrics import HTTP_DURATION, HTTP_IN_FLIGHT, HTTP_REQUESTS, REGISTRY, cache_collector
+from app.models.database import init_db
+from app.services.file_service import FileService
+
+configure_logging()
 
 app = FastAPI(
     title="JD Profile Matching API",
@@ -16,11 +25,67 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+
+class MetricsMiddleware:
+    """Count and time HTTP requests, labelled by route template.
+
+    Labelling by the template (``/api/analyses/{analysis_id}``) rather than
+    the raw path keeps the number of series bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            with HTTP_IN_FLIGHT.track_inprogress():
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            HTTP_DURATION.observe(time.perf_counter() - started, method=scope["method"], route=template)
+            HTTP_REQUESTS.inc(method=scope["method"], route=template, status=str(status))
+
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    REGISTRY.add_collector(cache_collector(lambda: {
+        "llm": ai_service.cache.stats() if ai_service.cache else None,
+        "single_flight": {"hits": ai_service.flight.coalesced, "misses": ai_service.flight.calls} if ai_service.flight else None,
+        "extraction": FileService.cache().stats() if FileService.cache() else None,
+        "tokens": ai_service.tokenizer.stats(),
+    }))
+
 # Include API routes
 app.include_router(router, prefix="/api")
 
+@app.on_event("startup")
+async def startup():
+    await init_db()
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await job_queue.stop()
+    await ai_service.aclose()
+    await flush_search_index()
+    FileService.shutdown()
+
 @app.get("/")
 async def root():
     return {"message": "JD Profile Matching API is running!"}
@@ -29,6 +94,11 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "JD Profile Matching API"}
 
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
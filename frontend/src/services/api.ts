@@ -72,7 +72,7 @@ export const apiService = {
 
   // List recent analyses
   async listAnalyses(skip: number = 0, limit: number = 10): Promise<AnalysisResponse[]> {
-    const response = await api.get<AnalysisResponse[]>(`/analyses?skip=${skip}&limit=${limit}`);
+    const response = await api.get<AnalysisResponse[]>(`/analyses?skip=${skip}&limit=${limit}&fields=full`);
     return response.data;
   },
 